@@ -5,31 +5,77 @@ __author__ = "Anthony Pagan <Get-Tony@outlook.com>"
 
 import getpass
 import subprocess
-from typing import Optional, Union
+import sys
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
 
 import click
-from ansible.inventory.host import Host
 from src import constants as c
-from src.cron import manage_cron_jobs
+from src.cron import (
+    apply_cron_jobs,
+    manage_cron_jobs,
+    read_cron_manifest,
+)
+from src.daemon import forward_to_daemon, serve_commands
+from src.events import open_event_writer, parse_event_sink
+from src.export import (
+    REPORT_FORMATS,
+    iter_artifact_records,
+    write_report_records,
+)
+from src.facts import (
+    FACT_CACHE_TIMEOUT,
+    display_fact_status,
+    fact_cache_kwargs,
+    prune_fact_cache,
+)
+from src.index import (
+    list_artifact_paths,
+    open_index,
+    query_artifacts,
+    update_index,
+)
 from src.inventory import (
     display_groups,
     display_hosts,
-    get_group,
-    get_groups_for_host,
-    get_host,
-    get_hosts_for_group,
+    get_inventory_snapshot,
 )
 from src.lint import (
     is_ansible_lint_installed,
     lint_all_playbooks,
     lint_single_playbook,
 )
-from src.run import prepare_extra_vars, run_ansible_playbook
+from src.manifest import preflight_playbooks
+from src.metrics import serve_metrics, write_textfile
+from src.profiling import (
+    build_profile,
+    display_profile,
+    display_profile_comparison,
+)
+from src.query import (
+    InventoryIndex,
+    display_query_result,
+    query_inventory,
+    read_host_list,
+)
+from src.rerun import prepare_rerun, write_rerun_limit
+from src.resources import ResourceSampler, display_sampled_runs
+from src.retention import pack_artifacts, parse_size, prune_archives
+from src.summary import display_summary, load_run_matrix
+from src.tune import (
+    load_profile,
+    parse_forks,
+    profile_kwargs,
+    sample_hosts,
+    tuned_profile,
+    write_profile,
+)
 from src.utils import (
-    display_artifact_report,
-    find_artifacts,
+    find_playbooks,
+    get_artifact_playbook,
     get_playbook_path,
-    sort_and_limit_artifacts,
+    list_available_playbooks,
     validate_inventory_dir,
     validate_playbook,
     validate_project,
@@ -62,26 +108,325 @@ def cli() -> None:
     type=str,
     help="Pass additional variables as key-value pairs.",
 )
+@click.option(
+    "--shards",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Split the limited hosts across this many parallel runs.",
+)
+@click.option(
+    "--events",
+    default=None,
+    callback=parse_event_sink,
+    help="Stream compact run events, e.g. ndjson:events.ndjson or ndjson:-",
+)
+@click.option(
+    "--use-fact-cache",
+    is_flag=True,
+    help="Reuse facts from the ARK fact cache instead of gathering them.",
+)
+@click.option(
+    "--rerun-failed",
+    is_flag=True,
+    help="Only run on the failed or unreachable hosts of the last run.",
+)
+@click.option(
+    "--same-extra-vars",
+    is_flag=True,
+    help="With --rerun-failed, reuse the extra variables of the last run.",
+)
+@click.option(
+    "--profile",
+    "profile_name",
+    default=None,
+    help="Apply a fork and connection profile written by 'ark tune'.",
+)
+@click.option(
+    "--skip-syntax-check",
+    is_flag=True,
+    help="Do not syntax check the playbook before running it.",
+)
+@click.option(
+    "--sample-resources",
+    is_flag=True,
+    help="Record controller CPU, memory, threads, fds and processes.",
+)
 def run(
-    playbook_file: str, rotate_artifacts: int, limit: str, extra_vars: str
+    playbook_file: str,
+    rotate_artifacts: int,
+    limit: str,
+    extra_vars: str,
+    shards: int,
+    events: Optional[str],
+    use_fact_cache: bool,
+    rerun_failed: bool,
+    same_extra_vars: bool,
+    profile_name: Optional[str],
+    skip_syntax_check: bool,
+    sample_resources: bool,
 ) -> None:
     """Run an Project playbook."""
+    # ansible_runner is slow to import; only the run commands need it.
+    # pylint: disable=import-outside-toplevel
+    from src.run import (
+        merge_runner_kwargs,
+        prepare_extra_vars,
+        run_ansible_playbook,
+        run_sharded_playbook,
+    )
+
+    if same_extra_vars and not rerun_failed:
+        raise click.UsageError("--same-extra-vars needs --rerun-failed.")
+    if rerun_failed and limit:
+        raise click.UsageError("--rerun-failed sets the limit itself.")
+
     validate_project()
 
     playbook_path = get_playbook_path(playbook_file)
     if not playbook_path:
         return
+    if not skip_syntax_check and not preflight_playbooks([playbook_path]):
+        sys.exit(1)
 
     extra_vars_dict = prepare_extra_vars(extra_vars)
-    run_ansible_playbook(
-        playbook_path, rotate_artifacts, limit, extra_vars_dict
+    if rerun_failed:
+        hosts, run_extra_vars = prepare_rerun(
+            playbook_path.name,
+            same_extra_vars,
+            # Progress goes to stderr when stdout carries the event stream.
+            err=(events or "").partition(":")[2] == "-",
+        )
+        if not hosts:
+            return
+        # Sharding resolves the limit in process, where @file is not read.
+        limit = (
+            ",".join(hosts)
+            if shards > 1
+            else write_rerun_limit(playbook_path.name, hosts)
+        )
+        extra_vars_dict = {**run_extra_vars, **extra_vars_dict}
+
+    runner_options = merge_runner_kwargs(
+        profile_kwargs(load_profile(profile_name) if profile_name else None),
+        fact_cache_kwargs(use_fact_cache),
+    )
+    event_writer = open_event_writer(events) if events else None
+    sampler = ResourceSampler() if sample_resources else None
+    artifact_paths: List[Path] = []
+    if sampler:
+        sampler.start()
+    try:
+        if shards > 1:
+            outcomes = run_sharded_playbook(
+                playbook_path,
+                shards,
+                rotate_artifacts,
+                limit,
+                extra_vars_dict,
+                event_writer,
+                runner_options,
+            )
+            artifact_paths = [
+                c.ARTIFACTS_DIR / outcome.ident for outcome in outcomes
+            ]
+            if any(outcome.status != "successful" for outcome in outcomes):
+                sys.exit(1)
+            return
+
+        artifact_paths = [
+            run_ansible_playbook(
+                playbook_path,
+                rotate_artifacts,
+                limit,
+                extra_vars_dict,
+                event_writer,
+                runner_options,
+            )
+        ]
+    finally:
+        if event_writer:
+            event_writer.close()
+        if sampler:
+            sampler.stop()
+            for artifact_path in artifact_paths:
+                sampler.write(artifact_path)
+
+
+@cli.command("run-many")
+@click.argument("playbook_files", nargs=-1)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="YAML list of playbooks, with optional limit and extra_vars.",
+)
+@click.option(
+    "--max-parallel",
+    default=4,
+    type=click.IntRange(min=1),
+    help="Number of playbooks to run at the same time.",
+)
+@click.option(
+    "--rotate-artifacts",
+    default=7,
+    type=click.IntRange(1, 31),
+    help="Number of artifacts to keep.",
+)
+@click.option(
+    "--limit",
+    default="",
+    type=str,
+    help="Default limit for playbooks without their own.",
+)
+@click.option(
+    "--extra-vars",
+    default="",
+    type=str,
+    help="Default extra variables for playbooks without their own.",
+)
+@click.option(
+    "--skip-syntax-check",
+    is_flag=True,
+    help="Do not syntax check the playbooks before running them.",
+)
+def run_many(
+    playbook_files: tuple[str, ...],
+    manifest: Optional[Path],
+    max_parallel: int,
+    rotate_artifacts: int,
+    limit: str,
+    extra_vars: str,
+    skip_syntax_check: bool,
+) -> None:
+    """Run several Project playbooks concurrently."""
+    # pylint: disable=import-outside-toplevel
+    from src.run import (
+        display_run_outcomes,
+        make_run_job,
+        read_run_manifest,
+        run_playbooks_concurrently,
+    )
+
+    validate_project()
+
+    entries = [{"playbook": name} for name in playbook_files]
+    if manifest:
+        entries.extend(read_run_manifest(manifest))
+    if not entries:
+        list_available_playbooks("")
+        return
+
+    jobs = []
+    for entry in entries:
+        job = make_run_job(entry, limit, extra_vars)
+        if not job:
+            sys.exit(1)
+        jobs.append(job)
+    if not skip_syntax_check and not preflight_playbooks(
+        list(dict.fromkeys(job.playbook_path for job in jobs))
+    ):
+        sys.exit(1)
+
+    outcomes = run_playbooks_concurrently(jobs, max_parallel, rotate_artifacts)
+    display_run_outcomes(outcomes)
+    if any(outcome.status != "successful" for outcome in outcomes):
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument("pattern", default="all")
+@click.option(
+    "--sample",
+    default=20,
+    type=click.IntRange(min=1),
+    help="Number of matching hosts to probe.",
+)
+@click.option(
+    "--forks",
+    "forks_list",
+    default="5,10,25,50",
+    callback=parse_forks,
+    help="Comma separated fork counts to try.",
+)
+@click.option(
+    "--playbook",
+    "playbook_file",
+    default=None,
+    help="Probe with this project playbook instead of the ping module.",
+)
+@click.option(
+    "--name",
+    default="tuned",
+    help="Name to save the fastest settings under.",
+)
+@click.option(
+    "--rounds",
+    default=3,
+    type=click.IntRange(min=1),
+    help="Times to probe each setting; the median time is used.",
+)
+def tune(
+    pattern: str,
+    sample: int,
+    forks_list: List[int],
+    playbook_file: Optional[str],
+    name: str,
+    rounds: int,
+) -> None:
+    """
+    Find the fastest forks and pipelining settings and save them as a
+    profile for 'ark run --profile'.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.run import run_tune_trials
+
+    validate_project()
+    playbook_path = None
+    if playbook_file:
+        playbook_path = get_playbook_path(playbook_file)
+        if not playbook_path:
+            sys.exit(1)
+
+    index = InventoryIndex(get_inventory_snapshot())
+    hosts = sample_hosts(index.resolve(pattern), sample)
+    if not hosts:
+        raise click.ClickException(f"No hosts match '{pattern}'.")
+    # More forks than hosts cannot go any faster.
+    forks_list = sorted({min(forks, len(hosts)) for forks in forks_list})
+
+    click.echo(f"Probing {len(hosts)} hosts matching '{pattern}':")
+    trials = run_tune_trials(hosts, forks_list, playbook_path, rounds)
+    most_hosts = max(trial.hosts for trial in trials)
+    if not most_hosts:
+        raise click.ClickException("No host answered the probe.")
+    best = max(
+        (trial for trial in trials if trial.hosts == most_hosts),
+        key=lambda trial: trial.hosts_per_second,
+    )
+    write_profile(
+        name,
+        tuned_profile(
+            best.forks, best.pipelining, len(hosts), best.hosts_per_second
+        ),
+    )
+    click.echo(
+        f"Saved profile '{name}' to {c.PROFILES_FILE}: forks={best.forks}, "
+        f"pipelining={'on' if best.pipelining else 'off'} "
+        f"({best.hosts_per_second:.1f} hosts/s)."
     )
 
 
 # Lint command
 @cli.command()
 @click.argument("playbook_file", type=click.Path(exists=False), default="")
-def lint(playbook_file: str) -> None:
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of playbooks to lint concurrently.",
+)
+def lint(playbook_file: str, jobs: int) -> None:
     """Lint an Project playbooks using ansible-lint."""
     if not is_ansible_lint_installed():
         return
@@ -89,7 +434,7 @@ def lint(playbook_file: str) -> None:
     if playbook_file:
         lint_single_playbook(playbook_file)
     else:
-        lint_all_playbooks()
+        lint_all_playbooks(jobs)
 
 
 @cli.command()
@@ -104,13 +449,304 @@ def lint(playbook_file: str) -> None:
     default=None,
     help="Display the last x reports.",
 )
-def report(artifacts_dir: str, last: Optional[int]) -> None:
+@click.option(
+    "--playbook",
+    default=None,
+    help="Only display reports for this playbook.",
+)
+@click.option(
+    "--no-index",
+    is_flag=True,
+    help="Parse every artifact instead of using the artifact index.",
+)
+@click.option(
+    "--archive-dir",
+    default="archive",
+    help="Path to the packed artifacts directory.",
+)
+@click.option(
+    "--summary",
+    is_flag=True,
+    help="Summarize failure rates, drift and trends across the runs.",
+)
+@click.option(
+    "--top",
+    default=20,
+    type=click.IntRange(min=1),
+    help="Number of hosts to list in the summary.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    default="text",
+    type=click.Choice(REPORT_FORMATS),
+    help="Output format; json, ndjson and csv stream one artifact at a time.",
+)
+@click.option(
+    "--resources",
+    is_flag=True,
+    help="Show controller resources recorded by run --sample-resources.",
+)
+def report(
+    artifacts_dir: str,
+    last: Optional[int],
+    playbook: Optional[str],
+    no_index: bool,
+    archive_dir: str,
+    summary: bool,
+    top: int,
+    output_format: str,
+    resources: bool,
+) -> None:
     """Display Ansible run report(s)."""
-    artifact_folders = find_artifacts(artifacts_dir)
-    artifact_folders = sort_and_limit_artifacts(artifact_folders, last)
+    if summary and no_index:
+        raise click.UsageError("--summary reads the artifact index.")
+    if summary and output_format != "text":
+        raise click.UsageError("--summary is a text view of the runs.")
+    if resources and (summary or no_index or output_format != "text"):
+        raise click.UsageError(
+            "--resources is a text view of the artifact index."
+        )
+    if no_index:
+        write_report_records(
+            iter_artifact_records(artifacts_dir, archive_dir, last, playbook),
+            output_format,
+        )
+        return
+
+    if not Path(artifacts_dir).is_dir():
+        return
+
+    with closing(open_index(artifacts_dir)) as index:
+        update_index(index, artifacts_dir, archive_dir)
+        if summary:
+            display_summary(load_run_matrix(index, last, playbook), top)
+            return
+        if resources:
+            display_sampled_runs(index, artifacts_dir, last, playbook)
+            return
+        write_report_records(
+            query_artifacts(index, artifacts_dir, last, playbook),
+            output_format,
+        )
+
+
+@cli.command()
+@click.argument(
+    "artifact",
+    required=False,
+    type=click.Path(exists=True, path_type=Path),
+)
+@click.option(
+    "--last",
+    is_flag=True,
+    help="Profile the newest artifact instead of a given one.",
+)
+@click.option(
+    "--playbook",
+    default=None,
+    help="With --last, the newest artifact of this playbook.",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Compare the profile against another artifact.",
+)
+@click.option(
+    "--compare-previous",
+    is_flag=True,
+    help="Compare against the previous run of the same playbook.",
+)
+@click.option(
+    "--top",
+    "count",
+    default=10,
+    type=click.IntRange(min=1),
+    help="Number of tasks and hosts to list.",
+)
+@click.option(
+    "--artifacts-dir",
+    default="artifacts",
+    help="Path to the artifacts directory.",
+)
+@click.option(
+    "--archive-dir",
+    default="archive",
+    help="Path to the packed artifacts directory.",
+)
+def profile(
+    artifact: Optional[Path],
+    last: bool,
+    playbook: Optional[str],
+    compare: Optional[Path],
+    compare_previous: bool,
+    count: int,
+    artifacts_dir: str,
+    archive_dir: str,
+) -> None:
+    """Show per-task, per-host and per-play timings of a run."""
+    if not artifact and not last:
+        raise click.UsageError("Give an artifact folder or --last.")
+
+    runs: list[Path] = []
+    if last or compare_previous:
+        if artifact:
+            playbook = get_artifact_playbook(artifact)
+        with closing(open_index(artifacts_dir)) as index:
+            update_index(index, artifacts_dir, archive_dir)
+            runs = list(list_artifact_paths(index, artifacts_dir, playbook))
+        if not runs:
+            raise click.ClickException("No matching artifacts found.")
 
-    for artifact_path in artifact_folders:
-        display_artifact_report(artifact_path)
+    artifact_path = artifact or runs[0]
+    run_profile = build_profile(artifact_path)
+    display_profile(artifact_path, run_profile, count)
+
+    if compare_previous:
+        older = [
+            run
+            for run in runs
+            if run.resolve() != artifact_path.resolve()
+            and run.stat().st_mtime <= artifact_path.stat().st_mtime
+        ]
+        if not older:
+            raise click.ClickException("No previous run to compare with.")
+        compare = older[0]
+    if compare:
+        display_profile_comparison(
+            compare, build_profile(compare), artifact_path, run_profile, count
+        )
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default=str(c.SERVER_SOCKET),
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Path of the Unix socket to listen on.",
+)
+def serve(socket_path: Path) -> None:
+    """Keep ARK loaded and answer inv, report and run commands."""
+    serve_commands(cli, socket_path)
+
+
+@cli.command()
+@click.option(
+    "--textfile",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write a Prometheus textfile collector file, e.g. ark.prom.",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(1, 65535),
+    default=None,
+    help="Serve /metrics on this port instead.",
+)
+@click.option(
+    "--address",
+    default="127.0.0.1",
+    help="Address to serve /metrics on.",
+)
+@click.option(
+    "--artifacts-dir",
+    default="artifacts",
+    help="Path to the artifacts directory.",
+)
+@click.option(
+    "--archive-dir",
+    default="archive",
+    help="Path to the packed artifacts directory.",
+)
+def metrics(
+    textfile: Optional[Path],
+    port: Optional[int],
+    address: str,
+    artifacts_dir: str,
+    archive_dir: str,
+) -> None:
+    """Export the last run of each playbook as OpenMetrics gauges."""
+    if textfile is not None and port is None:
+        write_textfile(artifacts_dir, archive_dir, textfile)
+        return
+    if port is None or textfile is not None:
+        raise click.UsageError("Use exactly one of --textfile and --port.")
+    click.echo(f"Serving metrics on http://{address}:{port}/metrics")
+    serve_metrics(artifacts_dir, archive_dir, address, port)
+
+
+@click.group()
+def artifacts() -> None:
+    """Pack and prune run artifacts."""
+
+
+@artifacts.command()
+@click.option(
+    "--artifacts-dir",
+    default="artifacts",
+    help="Path to the artifacts directory.",
+)
+@click.option(
+    "--archive-dir",
+    default="archive",
+    help="Path to the packed artifacts directory.",
+)
+@click.option(
+    "--keep-unpacked",
+    default=1,
+    type=click.IntRange(min=0),
+    help="Number of newest finished runs to leave unpacked.",
+)
+def pack(artifacts_dir: str, archive_dir: str, keep_unpacked: int) -> None:
+    """
+    Pack finished artifact folders into one compressed archive each.
+    """
+    archives = pack_artifacts(artifacts_dir, archive_dir, keep_unpacked)
+    click.echo(f"Packed {len(archives)} artifacts into {archive_dir}.")
+
+
+@artifacts.command()
+@click.option(
+    "--archive-dir",
+    default="archive",
+    help="Path to the packed artifacts directory.",
+)
+@click.option(
+    "--max-size",
+    "max_bytes",
+    default=None,
+    callback=parse_size,
+    help="Total size to keep, e.g. 500M or 20G.",
+)
+@click.option(
+    "--max-age",
+    "max_age_days",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Remove archives older than this many days.",
+)
+@click.option(
+    "--max-count",
+    default=None,
+    type=click.IntRange(min=0),
+    help="Number of newest archives to keep.",
+)
+def prune(
+    archive_dir: str,
+    max_bytes: Optional[int],
+    max_age_days: Optional[float],
+    max_count: Optional[int],
+) -> None:
+    """
+    Remove the oldest packed artifacts beyond the given limits.
+    """
+    if max_bytes is None and max_age_days is None and max_count is None:
+        raise click.UsageError(
+            "Give at least one of --max-size, --max-age or --max-count."
+        )
+    prune_archives(archive_dir, max_bytes, max_age_days, max_count)
 
 
 @click.group()
@@ -120,38 +756,216 @@ def inv() -> None:
 
 @inv.command()
 @click.argument("target_host")
-def get_host_groups(target_host: str) -> None:
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Parse the inventory directly instead of using the cache.",
+)
+def get_host_groups(target_host: str, no_cache: bool) -> None:
     """
     Display all groups a host is a member of.
     """
     validate_inventory_dir()
-    host = get_host(target_host)
+    snapshot = get_inventory_snapshot(use_cache=not no_cache)
+    groups = snapshot["hosts"].get(target_host)
 
-    if not host:
+    if groups is None:
         click.echo(f"Host '{target_host}' not found in the inventory.")
         return
 
-    groups = get_groups_for_host(host)
     display_groups(target_host, groups)
 
 
 @inv.command()
 @click.argument("target_group")
-def get_group_hosts(target_group: str) -> None:
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Parse the inventory directly instead of using the cache.",
+)
+def get_group_hosts(target_group: str, no_cache: bool) -> None:
     """
     Display all hosts in a group.
     """
     validate_inventory_dir()
-    group = get_group(target_group)
+    snapshot = get_inventory_snapshot(use_cache=not no_cache)
+    hosts = snapshot["groups"].get(target_group)
 
-    if not group:
+    if hosts is None:
         click.echo(f"Group '{target_group}' not found in the inventory.")
         return
 
-    hosts: list[Union[Host, None]] = get_hosts_for_group(group)
     display_hosts(target_group, hosts)
 
 
+@inv.command()
+@click.argument("pattern", default="all")
+@click.option(
+    "--stdin",
+    "from_stdin",
+    is_flag=True,
+    help="Only consider the host names read from stdin, one per line.",
+)
+@click.option(
+    "--groups",
+    "with_groups",
+    is_flag=True,
+    help="Show the groups of each matching host.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    default="text",
+    type=click.Choice(["text", "json"]),
+    help="Output format.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Parse the inventory directly instead of using the cache.",
+)
+def query(
+    pattern: str,
+    from_stdin: bool,
+    with_groups: bool,
+    output_format: str,
+    no_cache: bool,
+) -> None:
+    """
+    Display the hosts matching an Ansible host pattern,
+    e.g. 'web:&prod:!maint' or '~db[0-9]+'.
+    """
+    validate_inventory_dir()
+    snapshot = get_inventory_snapshot(use_cache=not no_cache)
+    index = InventoryIndex(snapshot)
+    candidates = read_host_list(sys.stdin) if from_stdin else None
+    hosts, unknown = query_inventory(index, pattern, candidates)
+    display_query_result(index, hosts, unknown, output_format, with_groups)
+
+
+@inv.command()
+@click.argument("pattern", default="all")
+@click.option(
+    "--vars",
+    "with_vars",
+    is_flag=True,
+    help="Include the resolved inventory variables of each host.",
+)
+@click.option(
+    "--key",
+    "keys",
+    multiple=True,
+    help="Only output this variable; may be given several times.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    default="ndjson",
+    type=click.Choice(["ndjson", "json"]),
+    help="One JSON object per host, or a single JSON object.",
+)
+def dump(
+    pattern: str, with_vars: bool, keys: tuple[str, ...], output_format: str
+) -> None:
+    """
+    Export the hosts matching a pattern with their groups and variables.
+    """
+    # Loads Ansible's variable plugins; only this command needs them.
+    # pylint: disable=import-outside-toplevel
+    from src.hostvars import iter_host_vars, write_host_records
+
+    validate_inventory_dir()
+    records = iter_host_vars(pattern, with_vars, list(keys) or None)
+    write_host_records(records, output_format)
+
+
+@inv.command()
+def refresh() -> None:
+    """
+    Rebuild the inventory cache.
+    """
+    validate_inventory_dir()
+    snapshot = get_inventory_snapshot(refresh=True)
+    click.echo(
+        f"Inventory cache refreshed: {len(snapshot['hosts'])} hosts, "
+        f"{len(snapshot['groups'])} groups."
+    )
+
+
+@click.group()
+def facts() -> None:
+    """Manage the shared fact cache."""
+
+
+@facts.command()
+@click.argument("pattern", default="all")
+@click.option(
+    "--forks",
+    default=50,
+    type=click.IntRange(min=1),
+    help="Number of hosts to gather facts from at the same time.",
+)
+@click.option(
+    "--gather-subset",
+    default="all",
+    help="Fact subsets to gather, e.g. 'min,network'.",
+)
+def warm(pattern: str, forks: int, gather_subset: str) -> None:
+    """
+    Gather facts for the hosts matching a pattern into the fact cache.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.run import warm_fact_cache
+
+    validate_project()
+    if not warm_fact_cache(pattern, forks, gather_subset):
+        sys.exit(1)
+
+
+@facts.command()
+@click.argument("pattern", default="all")
+@click.option(
+    "--ttl",
+    default=FACT_CACHE_TIMEOUT,
+    type=click.IntRange(min=0),
+    help="Seconds after which cached facts are expired.",
+)
+@click.option(
+    "--hosts",
+    "show_hosts",
+    is_flag=True,
+    help="Show the cache age of every host.",
+)
+def status(pattern: str, ttl: int, show_hosts: bool) -> None:
+    """
+    Display fact cache age and coverage of the hosts matching a pattern.
+    """
+    validate_inventory_dir()
+    index = InventoryIndex(get_inventory_snapshot())
+    hosts = {host: index.host_groups[host] for host in index.resolve(pattern)}
+    display_fact_status(hosts, ttl, show_hosts)
+
+
+@facts.command("prune")
+@click.option(
+    "--ttl",
+    default=FACT_CACHE_TIMEOUT,
+    type=click.IntRange(min=0),
+    help="Remove cached facts older than this many seconds.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show what would be removed without removing it.",
+)
+def prune_facts(ttl: int, dry_run: bool) -> None:
+    """
+    Remove cached facts of expired hosts or hosts not in the inventory.
+    """
+    validate_inventory_dir()
+    prune_fact_cache(get_inventory_snapshot()["hosts"], ttl, dry_run)
+
+
 @click.group()
 def cron() -> None:
     """Manage cron jobs."""
@@ -214,6 +1028,41 @@ def delete(user: str, name: str) -> None:
     manage_cron_jobs(user, remove_jobs=[name], add_or_update_jobs=None)
 
 
+@cron.command("apply")
+@click.argument(
+    "manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--user",
+    default=getpass.getuser(),
+    help="The user for the cron jobs.",
+    required=True,
+)
+@click.option(
+    "--prune",
+    is_flag=True,
+    help="Remove ARK cron jobs that are not in the file.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show the changes without writing the crontab.",
+)
+def apply(manifest: Path, user: str, prune: bool, dry_run: bool) -> None:
+    """Make the user's ARK cron jobs match a YAML file."""
+    jobs = read_cron_manifest(manifest)
+    valid_playbooks = find_playbooks()
+    for job in jobs:
+        if job["job"] not in valid_playbooks:
+            raise click.BadParameter(
+                f"Invalid playbook for cron job {job['name']}: {job['job']}. "
+                "Valid playbooks in the project directory are: "
+                f"{', '.join(valid_playbooks)}"
+            )
+    apply_cron_jobs(user, jobs, prune, dry_run)
+
+
 @cron.command("list")
 @click.option(
     "--user",
@@ -239,8 +1088,13 @@ def list_cron_jobs(user: str) -> None:
             click.echo(line)
 
 
+cli.add_command(artifacts)
 cli.add_command(inv)
+cli.add_command(facts)
 cli.add_command(cron)
 
 if __name__ == "__main__":
+    daemon_exit_code = forward_to_daemon(sys.argv[1:])
+    if daemon_exit_code is not None:
+        sys.exit(daemon_exit_code)
     cli()
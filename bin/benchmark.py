@@ -0,0 +1,920 @@
+#!/usr/bin/env python3
+"""ARK benchmarks."""
+__author__ = "Anthony Pagan <Get-Tony@outlook.com>"
+
+import argparse
+import functools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+from check_inventory_dns import check_host, check_hosts_incremental
+from src import constants as c
+from src.cron import (
+    add_or_update_cron_jobs,
+    index_cron_list,
+    plan_cron_jobs,
+    remove_cron_jobs,
+)
+from src.dns_stub import StubDnsServer
+from src.export import select_artifacts
+from src.index import open_index, scan_artifacts, update_index
+from src.inventory import (
+    LOADED_SNAPSHOTS,
+    get_group,
+    get_groups_for_host,
+    get_host,
+    get_hosts_for_group,
+    get_inventory_snapshot,
+    resolve_hosts,
+)
+from src.metrics import MetricsCollector
+from src.query import InventoryIndex
+from src.resolver import check_hosts
+from src.utils import (
+    extract_artifact_recaps,
+    extract_host_stats,
+    extract_play_recaps,
+    find_artifacts,
+    sort_and_limit_artifacts,
+    tail_play_recaps,
+)
+
+Result = Dict[str, Any]
+
+ARK_SCRIPT = Path(__file__).parent / "ark.py"
+
+# Cheap real invocations, run in the startup fixture directory, that must
+# start without loading Ansible or ansible-runner.
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["cron", "list"],
+    ["cron", "apply", "cron.yml", "--dry-run"],
+    ["report", "--last", "1"],
+    ["profile", "--last"],
+    ["artifacts", "prune", "--max-count", "100"],
+    ["inv", "get-host-groups", "host00000.region_00"],
+]
+
+# Runs ark.py as a script with its caches in the fixture directory, as
+# use_fixture_dir does in-process, so the real caches are left alone.
+STARTUP_BOOTSTRAP = """
+import sys
+from pathlib import Path
+script, cache_dir = sys.argv[1:3]
+sys.argv = [script] + sys.argv[3:]
+sys.path.insert(0, str(Path(script).parent))
+from src import constants as c
+c.CACHE_DIR = Path(cache_dir)
+c.INVENTORY_CACHE_FILE = c.CACHE_DIR / "inventory.json"
+c.ARTIFACT_INDEX_DIR = c.CACHE_DIR / "artifact_index"
+with open(script, encoding="utf-8") as source:
+    code = compile(source.read(), script, "exec")
+exec(code, {"__name__": "__main__", "__file__": script})
+"""
+HEAVY_MODULES = ("ansible", "ansible_runner")
+
+# Benchmarks run by 'all', each with its own defaults.
+SUITE = ("recap", "artifacts", "inventory", "cron", "startup")
+
+INVENTORY_PATTERNS = [
+    "app_0001",
+    "region_01:&web_*",
+    "all:!region_02",
+    "~host0[0-9]{4}\\.region_03",
+    "app_0010[0:9]",
+]
+
+TASK_OUTPUT = (
+    "TASK [Gather all Facts] "
+    "********************************************************\n"
+    + "".join(f"ok: [host{number:05d}.example.com]\n" for number in range(64))
+    + "\n"
+)
+
+
+def measure(func: Callable[[], Any], trace_memory: bool = True) -> Result:
+    """Time a function and record its peak Python memory allocation.
+
+    tracemalloc slows allocation-heavy code such as Ansible's inventory
+    parser several times over; pass trace_memory=False to time it alone.
+    """
+    if not trace_memory:
+        started = time.perf_counter()
+        value = func()
+        return {
+            "seconds": round(time.perf_counter() - started, 4),
+            "value": value,
+        }
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 4),
+        "peak_mb": round(peak / 2**20, 2),
+        "value": value,
+    }
+
+
+def write_large_stdout(stdout_path: Path, size_mb: int, hosts: int) -> None:
+    """Write a synthetic ansible-playbook stdout of roughly size_mb."""
+    chunk = TASK_OUTPUT * max(1, 2**20 // len(TASK_OUTPUT))
+    with stdout_path.open("w", encoding="utf-8") as stdout_file:
+        stdout_file.write(
+            "PLAY [Common Tasks] ****************************\n\n"
+        )
+        for _ in range(size_mb):
+            stdout_file.write(chunk)
+        stdout_file.write(
+            "PLAY RECAP "
+            "*********************************************************\n"
+        )
+        for number in range(hosts):
+            stdout_file.write(
+                f"host{number:05d}.example.com : ok=12   changed=1    "
+                "unreachable=0    failed=0    skipped=3    rescued=0    "
+                "ignored=0   \n"
+            )
+
+
+def bench_recap(args: argparse.Namespace) -> Result:
+    """Compare tail-seek recap extraction with the full-read regex."""
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        stdout_path = Path(workdir) / "stdout"
+        write_large_stdout(stdout_path, args.size_mb, args.hosts)
+
+        def tail() -> int:
+            with stdout_path.open("rb") as stdout_file:
+                recaps = tail_play_recaps(stdout_file)
+            return sum(len(extract_host_stats(recap)) for recap in recaps)
+
+        def full() -> int:
+            with stdout_path.open(encoding="utf-8") as stdout_file:
+                content = stdout_file.read()
+            recaps = extract_play_recaps(content)
+            return sum(len(extract_host_stats(recap)) for recap in recaps)
+
+        result: Result = {
+            "stdout_mb": stdout_path.stat().st_size // 2**20,
+            "hosts": args.hosts,
+            "tail": measure(tail),
+        }
+        if args.compare_full:
+            result["full"] = measure(full)
+    return result
+
+
+def use_fixture_dir(workdir: Path) -> None:
+    """Point ARK's inventory and caches at a fixture directory."""
+    c.INVENTORY_DIR = str(workdir / "inventory")
+    c.CACHE_DIR = workdir / ".cache"
+    c.INVENTORY_CACHE_FILE = c.CACHE_DIR / "inventory.json"
+    c.ARTIFACT_INDEX_DIR = c.CACHE_DIR / "artifact_index"
+    LOADED_SNAPSHOTS.clear()
+
+
+def write_artifacts(
+    artifacts_dir: Path, count: int, hosts: int, tasks: int
+) -> None:
+    """Write count runner artifact folders with stdout and command files.
+
+    Each stdout has tasks tasks over hosts hosts and a PLAY RECAP; mtimes
+    are spread one minute apart so sorting has real work to do.
+    """
+    host_names = [f"host{number:05d}.example.com" for number in range(hosts)]
+    task_output = "".join(
+        f"TASK [Task {number}] {'*' * 60}\n"
+        + "".join(f"ok: [{host}]\n" for host in host_names)
+        + "\n"
+        for number in range(tasks)
+    )
+    recap = "".join(
+        f"{host} : ok={tasks}   changed=1    unreachable=0    failed=0    "
+        "skipped=0    rescued=0    ignored=0   \n"
+        for host in host_names
+    )
+    started = time.time() - count * 60
+    for number in range(count):
+        artifact_path = artifacts_dir / f"{number:08x}-0000-4000-8000-bench"
+        artifact_path.mkdir(parents=True)
+        playbook = f"playbook-{number % 25:02d}.yml"
+        (artifact_path / "command").write_text(
+            json.dumps(
+                {
+                    "command": [
+                        "ansible-playbook",
+                        "-i",
+                        "/srv/ark/inventory",
+                        f"/srv/ark/project/{playbook}",
+                    ],
+                    "cwd": "/srv/ark/project",
+                    "env": {"ANSIBLE_FORKS": "10"},
+                }
+            )
+        )
+        stdout_path = artifact_path / "stdout"
+        stdout_path.write_text(
+            f"PLAY [{playbook}] {'*' * 60}\n\n{task_output}"
+            f"PLAY RECAP {'*' * 60}\n{recap}\n"
+        )
+        (artifact_path / "status").write_text("successful")
+        (artifact_path / "rc").write_text("0")
+        mtime = started + number * 60
+        os.utime(stdout_path, (mtime, mtime))
+        os.utime(artifact_path, (mtime, mtime))
+
+
+def bench_artifacts(args: argparse.Namespace) -> Result:
+    """Time artifact discovery, parsing, indexing and metrics export."""
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        use_fixture_dir(Path(workdir))
+        artifacts_dir = Path(workdir) / "artifacts"
+        write_artifacts(artifacts_dir, args.artifacts, args.hosts, args.tasks)
+        folders = find_artifacts(str(artifacts_dir))
+
+        def recaps() -> int:
+            return sum(
+                len(host_stats)
+                for folder in folders
+                for host_stats in extract_artifact_recaps(folder)
+            )
+
+        def index() -> int:
+            conn = open_index(str(artifacts_dir))
+            try:
+                update_index(conn, str(artifacts_dir))
+                (count,) = conn.execute(
+                    "SELECT COUNT(*) FROM artifacts"
+                ).fetchone()
+            finally:
+                conn.close()
+            return int(count)
+
+        def metrics() -> int:
+            collector = MetricsCollector(str(artifacts_dir), "")
+            try:
+                return len(collector.collect())
+            finally:
+                collector.close()
+
+        return {
+            "artifacts": args.artifacts,
+            "hosts": args.hosts,
+            "find_artifacts": measure(
+                lambda: len(find_artifacts(str(artifacts_dir)))
+            ),
+            "sort_and_limit_artifacts": measure(
+                lambda: len(sort_and_limit_artifacts(list(folders), 10))
+            ),
+            "scan_and_select_artifacts": measure(
+                lambda: len(
+                    select_artifacts(scan_artifacts(str(artifacts_dir)), 10)
+                )
+            ),
+            "extract_artifact_recaps": measure(recaps),
+            "index_cold": measure(index),
+            "index_warm": measure(index),
+            "metrics": measure(metrics),
+        }
+
+
+def write_inventory_tree(root: Path, hosts: int, groups: int) -> List[str]:
+    """Write a YAML inventory tree of hosts spread over regions and groups.
+
+    Every region is a file with app_ groups as children, web_ groups
+    repeat some hosts, and group_vars/host_vars hold a few variables.
+    Returns the host names.
+    """
+    inventory_dir = root / "inventory"
+    (inventory_dir / "group_vars").mkdir(parents=True)
+    (inventory_dir / "host_vars").mkdir()
+    regions = 10
+    host_names: List[str] = []
+    for region in range(regions):
+        region_name = f"region_{region:02d}"
+        children: Dict[str, Any] = {}
+        for group in range(region, groups, regions):
+            members = range(group, hosts, groups)
+            children[f"app_{group:04d}"] = {
+                "hosts": {
+                    f"host{number:05d}.{region_name}": {
+                        "ansible_host": f"10.{number >> 16}."
+                        f"{(number >> 8) & 255}.{number & 255}"
+                    }
+                    for number in members
+                }
+            }
+            host_names.extend(
+                f"host{number:05d}.{region_name}" for number in members
+            )
+            children[f"web_{group:04d}"] = {
+                "hosts": {
+                    f"host{number:05d}.{region_name}": None
+                    for number in members[::4]
+                }
+            }
+        inventory = {
+            "all": {"children": {region_name: {"children": children}}}
+        }
+        with (inventory_dir / f"{region_name}.yml").open(
+            "w", encoding="utf-8"
+        ) as inventory_file:
+            yaml.safe_dump(inventory, inventory_file, default_style=None)
+        (inventory_dir / "group_vars" / f"{region_name}.yml").write_text(
+            f"region: {region_name}\n"
+        )
+    for host in host_names[:: max(1, len(host_names) // 100)]:
+        (inventory_dir / "host_vars" / f"{host}.yml").write_text(
+            "maintenance: true\n"
+        )
+    return host_names
+
+
+def bench_inventory(args: argparse.Namespace) -> Result:
+    """Time inventory parsing, snapshot caching and host lookups.
+
+    The get_host/get_group/resolve_hosts lookups parse the inventory with
+    Ansible on every call, which is what the snapshot and query index
+    avoid; both are timed so the gap shows up in the results.
+    """
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        use_fixture_dir(Path(workdir))
+        host_names = write_inventory_tree(
+            Path(workdir), args.hosts, args.groups
+        )
+        target_host = host_names[len(host_names) // 2]
+
+        def snapshot_from_disk() -> int:
+            LOADED_SNAPSHOTS.clear()
+            return len(get_inventory_snapshot()["hosts"])
+
+        def host_groups() -> int:
+            host = get_host(target_host)
+            return len(get_groups_for_host(host)) if host else 0
+
+        def group_hosts() -> int:
+            group = get_group("app_0001")
+            return len(get_hosts_for_group(group)) if group else 0
+
+        result: Result = {
+            "hosts": len(host_names),
+            "groups": args.groups,
+            "snapshot_build": measure(
+                lambda: len(get_inventory_snapshot(refresh=True)["hosts"]),
+                trace_memory=False,
+            ),
+            "snapshot_from_disk": measure(snapshot_from_disk),
+            "snapshot_in_memory": measure(
+                lambda: len(get_inventory_snapshot()["hosts"])
+            ),
+            "get_host_groups": measure(host_groups, trace_memory=False),
+            "get_group_hosts": measure(group_hosts, trace_memory=False),
+            "resolve_hosts": measure(
+                lambda: len(resolve_hosts(INVENTORY_PATTERNS[1])),
+                trace_memory=False,
+            ),
+        }
+        index = InventoryIndex(get_inventory_snapshot())
+        result["query"] = {}
+        for pattern in INVENTORY_PATTERNS:
+            timed = measure(functools.partial(index.resolve, pattern))
+            timed["value"] = len(timed["value"])
+            result["query"][pattern] = timed
+    return result
+
+
+def bench_dns(args: argparse.Namespace) -> Result:
+    """Compare the asyncio resolver with the nslookup subprocess path.
+
+    Also checks that --rate holds per server when every host needs both
+    an A and an AAAA query, flagging a regression when it is exceeded.
+    """
+    hosts = [f"host{number:05d}.example.com" for number in range(args.hosts)]
+    # Every tenth name is unresolvable to exercise the failure path.
+    hosts[::10] = [
+        f"missing{number:05d}.example.com"
+        for number in range(len(hosts[::10]))
+    ]
+    result: Result = {"hosts": args.hosts, "servers": args.servers}
+
+    stubs = [StubDnsServer(args.delay_ms / 1000) for _ in range(args.servers)]
+    for stub in stubs:
+        stub.__enter__()
+    try:
+        servers = [stub.address for stub in stubs]
+        queries = len(hosts) * len(servers)
+
+        timed = measure(
+            lambda: check_hosts(hosts, servers, args.timeout, args.concurrency)
+        )
+        missing = timed.pop("value")
+        timed["queries_per_second"] = round(queries / timed["seconds"], 1)
+        timed["missing_hosts"] = sum(1 for host in hosts if missing[host])
+        result["async"] = timed
+
+        with tempfile.TemporaryDirectory() as workdir:
+            store_args = argparse.Namespace(
+                store=os.path.join(workdir, "dns.sqlite"),
+                engine="async",
+                diff=False,
+                timeout=args.timeout,
+                concurrency=args.concurrency,
+                rate=0,
+                default_ttl=300,
+                min_ttl=0,
+            )
+            # The second run finds every stored result fresh.
+            for label in ("store_cold", "store_warm"):
+                timed = measure(
+                    lambda: check_hosts_incremental(hosts, servers, store_args)
+                )
+                timed.pop("value")
+                result[label] = timed
+
+        if args.rate > 0:
+            rate_hosts = [
+                f"empty{number:05d}.example.com"
+                for number in range(args.rate_hosts)
+            ]
+            for stub in stubs:
+                stub.query_times.clear()
+            check_hosts(
+                rate_hosts, servers, args.timeout, args.concurrency, args.rate
+            )
+            peak = max(stub.peak_rate() for stub in stubs)
+            result["rate"] = {"limit": args.rate, "peak_per_second": peak}
+            # One slot of slack for a window that starts on a query.
+            if peak > args.rate + 1:
+                result["regressions"] = [
+                    f"rate: {peak} queries/s to one server, limit {args.rate}"
+                ]
+
+        if shutil.which("nslookup"):
+            sample = hosts[: args.nslookup_hosts]
+            timed = measure(
+                lambda: [
+                    check_host(host, servers, args.timeout) for host in sample
+                ]
+            )
+            timed.pop("value")
+            timed["queries_per_second"] = round(
+                len(sample) * len(servers) / timed["seconds"], 1
+            )
+            result["nslookup"] = timed
+        else:
+            result["nslookup"] = "skipped: nslookup not installed"
+    finally:
+        for stub in stubs:
+            stub.__exit__()
+    return result
+
+
+def make_crontab(lines: int, ark_jobs: int) -> List[str]:
+    """Build a synthetic crontab with ark_jobs ARK lines among others."""
+    ark_script = c.PROJECT_DIR / "bin" / "ark.py"
+    cron_list = [
+        f"{number % 60} * * * * /usr/local/bin/task-{number}.sh"
+        for number in range(lines - ark_jobs)
+    ]
+    step = max(1, len(cron_list) // max(1, ark_jobs))
+    for number in range(ark_jobs):
+        cron_list.insert(
+            number * step,
+            f"0 1 * * * {c.ARK_INTERPRETER} {ark_script} run main.yml "
+            f"{c.CRONJOB_TAG}job-{number:05d}",
+        )
+    return cron_list
+
+
+def bench_cron(args: argparse.Namespace) -> Result:
+    """Compare the indexed apply plan with per-job crontab matching."""
+    cron_list = make_crontab(args.lines, args.ark_jobs)
+    # Half of the desired jobs change schedule, a tenth are new.
+    jobs = [
+        {
+            "name": f"job-{number:05d}",
+            "job": "main.yml",
+            "minute": "0" if number % 2 else "30",
+            "hour": "1",
+            "day": "*",
+            "month": "*",
+            "weekday": "*",
+        }
+        for number in range(args.jobs)
+    ]
+
+    def indexed() -> int:
+        _, diff = plan_cron_jobs(cron_list, jobs, prune=True)
+        return len(diff.added) + len(diff.updated) + len(diff.removed)
+
+    def per_job() -> int:
+        return len(add_or_update_cron_jobs(list(cron_list), jobs))
+
+    def remove() -> int:
+        names = [f"job-{number:05d}" for number in range(0, args.ark_jobs, 2)]
+        return len(remove_cron_jobs(list(cron_list), names))
+
+    return {
+        "lines": len(cron_list),
+        "ark_jobs": args.ark_jobs,
+        "jobs": args.jobs,
+        "index_cron_list": measure(lambda: len(index_cron_list(cron_list))),
+        "indexed": measure(indexed),
+        "per_job": measure(per_job),
+        "remove_cron_jobs": measure(remove),
+    }
+
+
+def write_startup_fixture(root: Path) -> Dict[str, str]:
+    """Write what the light commands read and return their environment.
+
+    The fixture has a few artifacts, the newest with job events, an
+    archive, an inventory, a cron manifest and a crontab command that
+    lists a synthetic crontab.
+    """
+    write_artifacts(root / "artifacts", 20, 10, 5)
+    # Job events for profile --last, in the newest artifact.
+    job_events_dir = root / "artifacts" / f"{19:08x}-0000-4000-8000-bench"
+    job_events_dir = job_events_dir / "job_events"
+    job_events_dir.mkdir()
+    for number in range(50):
+        (job_events_dir / f"{number + 1}-bench.json").write_text(
+            json.dumps(
+                {
+                    "event": "runner_on_ok",
+                    "event_data": {
+                        "host": f"host{number % 10:05d}.example.com",
+                        "task": f"Task {number // 10}",
+                        "task_uuid": f"task-{number // 10}",
+                        "play": "playbook-19.yml",
+                        "play_uuid": "play-0",
+                        "duration": 0.5,
+                    },
+                }
+            )
+        )
+    (root / "archive").mkdir()
+    write_inventory_tree(root, 200, 20)
+    crontab = root / "crontab.txt"
+    crontab.write_text("\n".join(make_crontab(100, 10)) + "\n")
+    (root / "cron.yml").write_text(
+        yaml.safe_dump(
+            [
+                {"name": f"job-{number:05d}", "job": "main.yml", "hour": "1"}
+                for number in range(10)
+            ]
+        )
+    )
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "crontab").write_text(f"#!/bin/sh\ncat {crontab}\n")
+    (bin_dir / "crontab").chmod(0o755)
+    return {
+        **os.environ,
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "ARK_NO_DAEMON": "1",
+    }
+
+
+def import_profile(
+    command: List[str], fixture_dir: Path, env: Dict[str, str]
+) -> Dict[str, Any]:
+    """Run ark with -X importtime in the fixture and total the imports."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_BOOTSTRAP]
+        + [str(ARK_SCRIPT), str(fixture_dir / ".cache")]
+        + command,
+        cwd=fixture_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    import_us = 0
+    modules = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name.strip())
+        # Top-level imports are indented by a single space.
+        if not name.startswith("  "):
+            import_us += int(cumulative)
+    return {"wall": elapsed, "import": import_us / 1e6, "modules": modules}
+
+
+def bench_startup(args: argparse.Namespace) -> Result:
+    """Time the cold start of light commands and flag regressions.
+
+    Each command first runs once unmeasured, which builds the inventory
+    cache and artifact index the measured runs then read.
+    """
+    result: Result = {"max_import_ms": args.max_import_ms, "commands": {}}
+    regressions = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        fixture_dir = Path(workdir)
+        env = write_startup_fixture(fixture_dir)
+        for command in LIGHT_COMMANDS:
+            import_profile(command, fixture_dir, env)
+            runs = [
+                import_profile(command, fixture_dir, env)
+                for _ in range(args.runs)
+            ]
+            import_ms = statistics.median(run["import"] for run in runs) * 1000
+            wall_ms = statistics.median(run["wall"] for run in runs) * 1000
+            heavy = sorted(
+                {
+                    module
+                    for run in runs
+                    for module in run["modules"]
+                    if module.split(".")[0] in HEAVY_MODULES
+                }
+            )
+            label = " ".join(["ark"] + command)
+            result["commands"][label] = {
+                "import_ms": round(import_ms, 1),
+                "wall_ms": round(wall_ms, 1),
+            }
+            if import_ms > args.max_import_ms:
+                regressions.append(
+                    f"{label}: imports took {import_ms:.1f} ms "
+                    f"(limit {args.max_import_ms} ms)"
+                )
+            if heavy:
+                regressions.append(f"{label}: imports {', '.join(heavy[:3])}")
+    result["regressions"] = regressions
+    return result
+
+
+def describe_run() -> Dict[str, str]:
+    """Record what the results were measured on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare_results(
+    baseline: Any, current: Any, path: str = ""
+) -> Dict[str, Dict[str, float]]:
+    """Pair up the timings of two result documents by their key path."""
+    if not isinstance(baseline, dict) or not isinstance(current, dict):
+        return {}
+    if "seconds" in baseline and "seconds" in current:
+        before, after = baseline["seconds"], current["seconds"]
+        return {
+            path: {
+                "before": before,
+                "after": after,
+                "ratio": round(after / before, 3) if before else 0.0,
+            }
+        }
+    changes: Dict[str, Dict[str, float]] = {}
+    for key in baseline.keys() & current.keys():
+        changes.update(
+            compare_results(
+                baseline[key], current[key], f"{path}.{key}" if path else key
+            )
+        )
+    return dict(sorted(changes.items()))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the selected benchmarks and print their results as JSON."""
+    parser = argparse.ArgumentParser(description="ARK benchmarks.")
+    parser.add_argument(
+        "--workdir",
+        default=None,
+        help="Directory for generated fixtures (default: system temp)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Also write the results to this JSON file",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Results JSON of an earlier commit to compare timings against",
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    recap_parser = subparsers.add_parser(
+        "recap", help="PLAY RECAP extraction from a large stdout file"
+    )
+    recap_parser.add_argument(
+        "--size-mb",
+        type=int,
+        default=2048,
+        help="Size of the synthetic stdout file (default 2048 MB)",
+    )
+    recap_parser.add_argument(
+        "--hosts",
+        type=int,
+        default=5000,
+        help="Number of hosts in the recap (default 5000)",
+    )
+    recap_parser.add_argument(
+        "--compare-full",
+        action="store_true",
+        help="Also time the full-read regex (needs RAM >= stdout size)",
+    )
+    recap_parser.set_defaults(func=bench_recap)
+
+    artifacts_parser = subparsers.add_parser(
+        "artifacts", help="Finding, sorting and indexing many artifacts"
+    )
+    artifacts_parser.add_argument(
+        "--artifacts",
+        type=int,
+        default=10000,
+        help="Artifact folders to generate (default 10000)",
+    )
+    artifacts_parser.add_argument(
+        "--hosts",
+        type=int,
+        default=20,
+        help="Hosts per run (default 20)",
+    )
+    artifacts_parser.add_argument(
+        "--tasks",
+        type=int,
+        default=10,
+        help="Tasks per run (default 10)",
+    )
+    artifacts_parser.set_defaults(func=bench_artifacts)
+
+    inventory_parser = subparsers.add_parser(
+        "inventory", help="Parsing, caching and querying a large inventory"
+    )
+    inventory_parser.add_argument(
+        "--hosts",
+        type=int,
+        default=50000,
+        help="Hosts in the generated inventory (default 50000)",
+    )
+    inventory_parser.add_argument(
+        "--groups",
+        type=int,
+        default=500,
+        help="app_ groups the hosts are spread over (default 500)",
+    )
+    inventory_parser.set_defaults(func=bench_inventory)
+
+    dns_parser = subparsers.add_parser(
+        "dns", help="Inventory DNS checks against local stub servers"
+    )
+    dns_parser.add_argument(
+        "--hosts", type=int, default=5000, help="Hosts to check (default 5000)"
+    )
+    dns_parser.add_argument(
+        "--servers", type=int, default=3, help="Stub servers (default 3)"
+    )
+    dns_parser.add_argument(
+        "--delay-ms",
+        type=float,
+        default=5,
+        help="Simulated server latency per query (default 5 ms)",
+    )
+    dns_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="Async engine queries in flight (default 100)",
+    )
+    dns_parser.add_argument(
+        "--timeout", type=float, default=5, help="Per-query timeout"
+    )
+    dns_parser.add_argument(
+        "--nslookup-hosts",
+        type=int,
+        default=100,
+        help="Hosts checked through nslookup (default 100)",
+    )
+    dns_parser.add_argument(
+        "--rate",
+        type=float,
+        default=50,
+        help="Per-server query rate to verify, 0 to skip (default 50)",
+    )
+    dns_parser.add_argument(
+        "--rate-hosts",
+        type=int,
+        default=100,
+        help="Hosts checked under --rate (default 100)",
+    )
+    dns_parser.set_defaults(func=bench_dns)
+
+    cron_parser = subparsers.add_parser(
+        "cron", help="Planning ARK cron jobs against a large crontab"
+    )
+    cron_parser.add_argument(
+        "--lines",
+        type=int,
+        default=10000,
+        help="Lines in the synthetic crontab (default 10000)",
+    )
+    cron_parser.add_argument(
+        "--ark-jobs",
+        type=int,
+        default=200,
+        help="ARK jobs already in the crontab (default 200)",
+    )
+    cron_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=220,
+        help="Jobs in the desired state (default 220)",
+    )
+    cron_parser.set_defaults(func=bench_cron)
+
+    startup_parser = subparsers.add_parser(
+        "startup",
+        help="Cold start of light ark commands; exits 1 on a regression",
+    )
+    startup_parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Starts per command, the median is used (default 5)",
+    )
+    startup_parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=150,
+        help="Allowed import time per light command (default 150 ms)",
+    )
+    startup_parser.set_defaults(func=bench_startup)
+
+    subparsers.add_parser(
+        "all", help=f"Run {', '.join(SUITE)} with their defaults"
+    )
+
+    args = parser.parse_args(argv)
+    if args.benchmark == "all":
+        runs = [
+            (
+                parser.parse_args(["--workdir", args.workdir, name])
+                if args.workdir
+                else parser.parse_args([name])
+            )
+            for name in SUITE
+        ]
+    else:
+        runs = [args]
+
+    results: Result = {"run": describe_run()}
+    for run_args in runs:
+        results[run_args.benchmark] = run_args.func(run_args)
+    if args.baseline:
+        with args.baseline.open(encoding="utf-8") as baseline_file:
+            results["changes"] = compare_results(
+                json.load(baseline_file), results
+            )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    if any(
+        isinstance(result, dict) and result.get("regressions")
+        for result in results.values()
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,40 @@
 """DNS resolution check for Ansible inventories."""
+
 __author__ = "Anthony Pagan <Get-Tony@outlook.com>"
 
 import argparse
 import csv
 import subprocess
-from typing import List
+import sys
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
 
 from ansible.inventory.manager import InventoryManager
 from ansible.parsing.dataloader import DataLoader
+from src.dns_store import (
+    DnsResult,
+    Pair,
+    diff_results,
+    find_due_pairs,
+    get_missing_servers,
+    load_results,
+    make_result,
+    open_store,
+    save_results,
+)
+from src.resolver import DNS_PORT, check_hosts, check_pairs, parse_server
 
 
 def check_host(host: str, dns_servers: List[str], timeout: int) -> List[str]:
     """Check if a host is resolvable by a list of DNS servers."""
     missing_servers = []
     for server in dns_servers:
+        address, port = parse_server(server)
+        port_args = [f"-port={port}"] if port != DNS_PORT else []
         try:
             resolved = subprocess.run(
-                ["nslookup", host, server],
+                ["nslookup", *port_args, host, address],
                 capture_output=True,
                 timeout=timeout,
                 check=True,
@@ -40,6 +58,133 @@ def get_inventory(args: argparse.Namespace) -> List[str]:
     return hosts
 
 
+def check_hosts_async(
+    hosts: List[str], dns_servers: List[str], args: argparse.Namespace
+) -> List[List[str]]:
+    """Check all hosts with the in-process asyncio resolver."""
+    missing = check_hosts(
+        hosts, dns_servers, args.timeout, args.concurrency, args.rate
+    )
+    return [
+        [host, ", ".join(missing[host])] for host in hosts if missing[host]
+    ]
+
+
+def check_hosts_nslookup(
+    hosts: List[str], dns_servers: List[str], args: argparse.Namespace
+) -> List[List[str]]:
+    """Check all hosts one at a time with nslookup subprocesses."""
+    results = []
+    for host in hosts:
+        try:
+            missing_servers = check_host(host, dns_servers, args.timeout)
+        except (
+            subprocess.TimeoutExpired,
+            subprocess.CalledProcessError,
+        ) as timeout_error:
+            print(f"Error: Issue with DNS resolution check - {timeout_error}")
+            continue
+        except ValueError as value_error:
+            print(f"Error: Invalid input value - {value_error}")
+            continue
+
+        if missing_servers:
+            results.append([host, ", ".join(missing_servers)])
+
+    return results
+
+
+def check_pairs_async(
+    pairs: List[Pair], args: argparse.Namespace
+) -> Dict[Pair, DnsResult]:
+    """Check host and server pairs with the asyncio resolver."""
+    checked_at = time.time()
+    answers = check_pairs(pairs, args.timeout, args.concurrency, args.rate)
+    return {
+        pair: make_result(answer, checked_at, args.default_ttl, args.min_ttl)
+        for pair, answer in zip(pairs, answers)
+    }
+
+
+def check_pairs_nslookup(
+    pairs: List[Pair], args: argparse.Namespace
+) -> Dict[Pair, DnsResult]:
+    """Check host and server pairs with nslookup, which reports no TTL."""
+    servers_by_host: Dict[str, List[str]] = {}
+    for host, server in pairs:
+        servers_by_host.setdefault(host, []).append(server)
+
+    results = {}
+    for host, servers in servers_by_host.items():
+        checked_at = time.time()
+        missing_servers = check_host(host, servers, args.timeout)
+        for server in servers:
+            results[(host, server)] = DnsResult(
+                server not in missing_servers,
+                max(args.default_ttl, args.min_ttl),
+                checked_at,
+            )
+    return results
+
+
+def check_hosts_incremental(
+    hosts: List[str], dns_servers: List[str], args: argparse.Namespace
+) -> List[List[str]]:
+    """Check only new or expired pairs, reusing the stored results.
+
+    Returns the missing servers per host, or with --diff the servers
+    that newly fail or newly resolve each host.
+    """
+    with closing(open_store(args.store)) as conn:
+        before = load_results(conn)
+        due = find_due_pairs(hosts, dns_servers, before, time.time())
+        if args.engine == "async":
+            checked = check_pairs_async(due, args)
+        else:
+            checked = check_pairs_nslookup(due, args)
+
+        audited = set(hosts)
+        servers = set(dns_servers)
+        stale = [
+            (host, server)
+            for host, server in before
+            if host not in audited or server not in servers
+        ]
+        save_results(conn, checked, stale)
+
+    total = len(hosts) * len(dns_servers)
+    print(
+        f"Checked {len(due)} of {total} host/server pairs; "
+        f"{total - len(due)} stored results have not expired.",
+        file=sys.stderr,
+    )
+    after = {**before, **checked}
+    if args.diff:
+        return diff_results(hosts, dns_servers, before, after)
+    return get_missing_servers(hosts, dns_servers, after)
+
+
+def write_results(
+    header: List[str], results: List[List[str]], output: Optional[str]
+) -> None:
+    """Write result rows to a CSV file, or print them."""
+    if not output:
+        print(", ".join(header))
+        for row in results:
+            print(",".join(row))
+        return
+
+    try:
+        with open(output, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(header)
+            writer.writerows(results)
+    except FileNotFoundError as file_error:
+        print(f"Error: Output file not found - {file_error}")
+    except PermissionError as perm_error:
+        print(f"Error: Permission denied for output file - {perm_error}")
+
+
 def main() -> None:
     """Check Ansible inventory hosts for DNS resolution."""
     parser = argparse.ArgumentParser()
@@ -57,10 +202,60 @@ def main() -> None:
         help="Timeout for each check (default 5 seconds)",
     )
     parser.add_argument("--output", "-o", help="Output CSV file")
+    parser.add_argument(
+        "--engine",
+        choices=["async", "nslookup"],
+        default="async",
+        help="Query servers directly (async) or via nslookup subprocesses",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=100,
+        help="Maximum queries in flight with the async engine (default 100)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="Maximum queries per second per server (default unlimited)",
+    )
+    parser.add_argument(
+        "--store",
+        help="SQLite file of earlier results; only new or expired host and "
+        "server pairs are queried again (default OUTPUT.sqlite with --output)",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Only report hosts newly broken or fixed since the stored run",
+    )
+    parser.add_argument(
+        "--min-ttl",
+        type=int,
+        default=0,
+        help="Reuse stored results for at least this many seconds "
+        "(default 0, use the answer TTL)",
+    )
+    parser.add_argument(
+        "--default-ttl",
+        type=int,
+        default=300,
+        help="Seconds to reuse failures and answers without a TTL "
+        "(default 300)",
+    )
     args = parser.parse_args()
+    if args.store is None and args.output:
+        args.store = f"{args.output}.sqlite"
+    if args.diff and not args.store:
+        print("Error: --diff needs --store or --output")
+        return
 
     try:
         dns_servers = args.dns_servers.split(",")
+        for server in dns_servers:
+            parse_server(server)
     except ValueError as value_error:
         print(f"Error: Invalid DNS servers list - {value_error}")
         return
@@ -71,39 +266,19 @@ def main() -> None:
         print(f"Error: Inventory file not found - {file_error}")
         return
 
-    results = []
-    for host in hosts:
-        try:
-            missing_servers = check_host(host, dns_servers, args.timeout)
-        except (
-            subprocess.TimeoutExpired,
-            subprocess.CalledProcessError,
-        ) as timeout_error:
-            print(f"Error: Issue with DNS resolution check - {timeout_error}")
-            continue
-        except ValueError as value_error:
-            print(f"Error: Invalid input value - {value_error}")
-            continue
-
-        if missing_servers:
-            results.append([host, ", ".join(missing_servers)])
+    if args.diff:
+        header = ["Hostname", "Newly broken with", "Fixed on"]
+    else:
+        header = ["Hostname", "No resolution with"]
 
-    if args.output:
-        try:
-            with open(
-                args.output, "w", newline="", encoding="utf-8"
-            ) as csv_file:
-                writer = csv.writer(csv_file)
-                writer.writerow(["Hostname", "No resolution with"])
-                writer.writerows(results)
-        except FileNotFoundError as file_error:
-            print(f"Error: Output file not found - {file_error}")
-        except PermissionError as perm_error:
-            print(f"Error: Permission denied for output file - {perm_error}")
+    if args.store:
+        results = check_hosts_incremental(hosts, dns_servers, args)
+    elif args.engine == "async":
+        results = check_hosts_async(hosts, dns_servers, args)
     else:
-        print("Hostname, No resolution with")
-        for row in results:
-            print(",".join(row))
+        results = check_hosts_nslookup(hosts, dns_servers, args)
+
+    write_results(header, results, args.output)
 
 
 if __name__ == "__main__":
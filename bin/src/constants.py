@@ -4,7 +4,18 @@ from pathlib import Path
 
 ARK_DIR: Path = Path(__file__).parent.parent.parent
 PROJECT_DIR: Path = ARK_DIR / "project"
+ARTIFACTS_DIR: Path = ARK_DIR / "artifacts"
+ARCHIVE_DIR: Path = ARK_DIR / "archive"
 ARK_INTERPRETER: Path = ARK_DIR / ".venv" / "bin" / "python"
 RUNNER_EXECUTABLE: str = "ansible-runner"
 INVENTORY_DIR: str = "inventory"
 CRONJOB_TAG: str = "#ARK-"
+SHARD_IDENT_MARKER: str = "-shard"
+CACHE_DIR: Path = ARK_DIR / ".cache"
+INVENTORY_CACHE_FILE: Path = CACHE_DIR / "inventory.json"
+ARTIFACT_INDEX_DIR: Path = CACHE_DIR / "artifact_index"
+SERVER_SOCKET: Path = CACHE_DIR / "ark.sock"
+FACT_CACHE_DIR: Path = CACHE_DIR / "facts"
+FACT_ARTIFACTS_DIR: Path = CACHE_DIR / "fact-artifacts"
+PROFILES_FILE: Path = ARK_DIR / "env" / "profiles.yml"
+PROJECT_MANIFEST_FILE: Path = CACHE_DIR / "project_manifest.json"
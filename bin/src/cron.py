@@ -3,7 +3,7 @@
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 import click
 
@@ -24,20 +24,60 @@ def read_cron_list(user: str) -> List[str]:
     return cron_list
 
 
+CRON_FIELDS = ("minute", "hour", "day", "month", "weekday")
+
+
+class CronDiff(NamedTuple):
+    """Names of the ARK cron jobs changed by applying a desired state."""
+
+    added: List[str]
+    updated: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def changed(self) -> bool:
+        """Whether the crontab needs to be written."""
+        return bool(self.added or self.updated or self.removed)
+
+
+def format_cron_line(job: Dict[str, str]) -> str:
+    """Build the crontab line that runs a job through ARK."""
+    python_interpreter = str(c.ARK_INTERPRETER)
+    ark_script = str(c.PROJECT_DIR / "bin" / "ark.py")
+    return (
+        f"{job['minute']} {job['hour']} {job['day']} "
+        f"{job['month']} {job['weekday']} {python_interpreter} "
+        f"{ark_script} run {job['job']} "
+        f"{c.CRONJOB_TAG}{job['name']}"
+    )
+
+
+def get_cron_job_name(line: str) -> Optional[str]:
+    """Get the lowercased ARK job name tagged at the end of a cron line."""
+    _, tag, name = line.lower().rpartition(c.CRONJOB_TAG.lower())
+    return name if tag else None
+
+
+def index_cron_list(cron_list: List[str]) -> Dict[str, List[int]]:
+    """Map each ARK job name to the indexes of its lines in the cron list.
+
+    A name normally has one line; any later lines are duplicates.
+    """
+    index: Dict[str, List[int]] = {}
+    for i, line in enumerate(cron_list):
+        name = get_cron_job_name(line)
+        if name is not None:
+            index.setdefault(name, []).append(i)
+    return index
+
+
 def add_or_update_cron_jobs(
     cron_list: List[str], add_or_update_jobs: List[Dict[str, str]]
 ) -> List[str]:
     """Add or update cron jobs."""
-    python_interpreter = str(c.ARK_INTERPRETER)
-    ark_script = str(c.PROJECT_DIR / "bin" / "ark.py")
-
     for job in add_or_update_jobs:
-        cron_line = (
-            f"{job['minute']} {job['hour']} {job['day']} "
-            f"{job['month']} {job['weekday']} {python_interpreter} "
-            f"{ark_script} run {job['job']} "
-            f"{c.CRONJOB_TAG}{job['name']}"
-        )
+        cron_line = format_cron_line(job)
         found = False
         for i, line in enumerate(cron_list):
             if line.lower().endswith(
@@ -74,15 +114,11 @@ def check_for_duplicates(
 def remove_cron_jobs(
     cron_list: List[str], remove_jobs: List[str]
 ) -> List[str]:
-    """Remove specified cron jobs."""
-    for unwanted_job in remove_jobs:
-        for i, line in enumerate(cron_list):
-            if line.lower().endswith(
-                f"{c.CRONJOB_TAG.lower()}{unwanted_job.lower()}"
-            ):
-                del cron_list[i]
-                break
-    return cron_list
+    """Remove specified cron jobs, including any duplicate lines."""
+    unwanted = {name.lower() for name in remove_jobs}
+    return [
+        line for line in cron_list if get_cron_job_name(line) not in unwanted
+    ]
 
 
 def update_crontab(user: str, cron_list: List[str]) -> None:
@@ -101,6 +137,7 @@ def manage_cron_jobs(
 ) -> None:
     """Manage cron jobs for a user."""
     cron_list = read_cron_list(user)
+    original = list(cron_list)
 
     if add_or_update_jobs:
         cron_list = add_or_update_cron_jobs(cron_list, add_or_update_jobs)
@@ -108,4 +145,117 @@ def manage_cron_jobs(
     if remove_jobs:
         cron_list = remove_cron_jobs(cron_list, remove_jobs)
 
-    update_crontab(user, cron_list)
+    if cron_list != original:
+        update_crontab(user, cron_list)
+
+
+def read_cron_manifest(manifest_path: Path) -> List[Dict[str, str]]:
+    """Read the desired ARK cron jobs from a YAML file.
+
+    The file is a list of mappings with a name, a job (the playbook) and
+    optional minute, hour, day, month and weekday fields defaulting to *.
+    """
+    # Only apply reads YAML; keep it off the startup path of other commands.
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    with manifest_path.open(encoding="utf-8") as manifest_file:
+        entries = yaml.safe_load(manifest_file) or []
+
+    if not isinstance(entries, list):
+        raise click.BadParameter(
+            f"{manifest_path} must contain a list of cron jobs."
+        )
+
+    jobs: List[Dict[str, str]] = []
+    names = set()
+    for entry in entries:
+        if not isinstance(entry, dict) or not {"name", "job"} <= set(entry):
+            raise click.BadParameter(
+                f"Invalid cron job in {manifest_path}: {entry}"
+            )
+        job = {"name": str(entry["name"]), "job": str(entry["job"])}
+        for field in CRON_FIELDS:
+            job[field] = str(entry.get(field, "*"))
+        if job["name"].lower() in names:
+            raise click.BadParameter(
+                f"Duplicate cron job name in {manifest_path}: {job['name']}"
+            )
+        names.add(job["name"].lower())
+        jobs.append(job)
+    return jobs
+
+
+def plan_cron_jobs(
+    cron_list: List[str], jobs: List[Dict[str, str]], prune: bool
+) -> Tuple[List[str], CronDiff]:
+    """Compute the cron list holding exactly the desired ARK jobs.
+
+    Existing jobs are updated in place and new ones appended, and any
+    duplicate lines of a desired job are removed. With prune, ARK jobs
+    missing from the desired state are removed; other lines are always
+    kept.
+    """
+    index = index_cron_list(cron_list)
+    new_list = list(cron_list)
+    diff = CronDiff([], [], [], [])
+    unwanted: List[int] = []
+
+    for job in jobs:
+        cron_line = format_cron_line(job)
+        line_numbers = index.pop(job["name"].lower(), [])
+        if not line_numbers:
+            new_list.append(cron_line)
+            diff.added.append(job["name"])
+            continue
+
+        first, *duplicates = line_numbers
+        if new_list[first] != cron_line:
+            new_list[first] = cron_line
+            diff.updated.append(job["name"])
+        elif not duplicates:
+            diff.unchanged.append(job["name"])
+        unwanted.extend(duplicates)
+        diff.removed.extend(f"{job['name']} (duplicate)" for _ in duplicates)
+
+    if prune:
+        for name, line_numbers in sorted(index.items(), key=lambda x: x[1]):
+            unwanted.extend(line_numbers)
+            line = cron_list[line_numbers[0]]
+            diff.removed.extend(
+                line[len(line) - len(name) :] for _ in line_numbers
+            )
+
+    if unwanted:
+        unwanted_lines = set(unwanted)
+        new_list = [
+            line for i, line in enumerate(new_list) if i not in unwanted_lines
+        ]
+    return new_list, diff
+
+
+def display_cron_diff(diff: CronDiff) -> None:
+    """Display the jobs added, updated and removed by an apply."""
+    for label, names in (
+        ("+", diff.added),
+        ("~", diff.updated),
+        ("-", diff.removed),
+    ):
+        for name in names:
+            click.echo(f"{label} {name}")
+    click.echo(
+        f"{len(diff.added)} added, {len(diff.updated)} updated, "
+        f"{len(diff.removed)} removed, {len(diff.unchanged)} unchanged."
+    )
+
+
+def apply_cron_jobs(
+    user: str, jobs: List[Dict[str, str]], prune: bool, dry_run: bool
+) -> CronDiff:
+    """Bring a user's ARK cron jobs to the desired state in one write."""
+    cron_list = read_cron_list(user)
+    new_list, diff = plan_cron_jobs(cron_list, jobs, prune)
+    display_cron_diff(diff)
+
+    if diff.changed and not dry_run:
+        update_crontab(user, new_list)
+    return diff
@@ -0,0 +1,242 @@
+"""Ansible-Runner Kit daemon and thin client."""
+
+import importlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+
+from src import constants as c
+
+# Top-level commands the CLI forwards to a running `ark serve`.
+SERVED_COMMANDS = {"facts", "inv", "report", "run"}
+
+# Imported up front so forked children start warm.
+PRELOADED_MODULES = (
+    "ansible.inventory.manager",
+    "ansible.parsing.dataloader",
+    "src.run",
+)
+
+# Set to any value to always run commands in the calling process.
+NO_DAEMON_ENV = "ARK_NO_DAEMON"
+
+
+class FrameWriter(io.TextIOBase):
+    """Text stream that sends each write as a JSON-lines frame."""
+
+    def __init__(self, connection: io.BufferedIOBase, stream: str) -> None:
+        super().__init__()
+        self.connection = connection
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            # click probes for binary streams by writing b"".
+            raise TypeError("write() argument must be str")
+        if text:
+            try:
+                send_frame(self.connection, {self.stream: text})
+            except OSError:
+                # The client is gone; its command is being interrupted.
+                pass
+        return len(text)
+
+    def isatty(self) -> bool:
+        return False
+
+
+def send_frame(connection: io.BufferedIOBase, frame: Dict[str, Any]) -> None:
+    """Write one JSON-lines frame and flush it to the peer."""
+    connection.write(json.dumps(frame).encode("utf-8") + b"\n")
+    connection.flush()
+
+
+class ArkRequestHandler(socketserver.StreamRequestHandler):
+    """Run one forwarded ark command in a forked, already warm process."""
+
+    server: "ArkServer"
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.stdin = io.StringIO(request.get("stdin", ""))
+        sys.stdout = FrameWriter(self.wfile, "stdout")
+        sys.stderr = FrameWriter(self.wfile, "stderr")
+        finished = threading.Event()
+        threading.Thread(
+            target=self.interrupt_on_hangup, args=(finished,), daemon=True
+        ).start()
+
+        exit_code = 0
+        try:
+            self.server.cli.main(
+                args=request["argv"], prog_name="ark", standalone_mode=True
+            )
+        except SystemExit as exit_:
+            if isinstance(exit_.code, int):
+                exit_code = exit_.code
+            elif exit_.code is not None:
+                sys.stderr.write(f"{exit_.code}\n")
+                exit_code = 1
+        except Exception as error:  # pylint: disable=broad-except
+            sys.stderr.write(f"Error: {error}\n")
+            exit_code = 1
+        finished.set()
+        try:
+            send_frame(self.wfile, {"exit": exit_code})
+        except OSError:
+            pass
+
+    def interrupt_on_hangup(self, finished: threading.Event) -> None:
+        """Interrupt the command, as Ctrl-C would, if the client hangs up.
+
+        The client sends nothing after its request, so a read returns only
+        once it has closed the connection.
+        """
+        try:
+            self.rfile.read(1)
+        except OSError:
+            pass
+        if not finished.is_set():
+            os.kill(os.getpid(), signal.SIGINT)
+
+
+class ArkServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server forking a warm child for every request.
+
+    The parent keeps Ansible, ansible-runner, the inventory snapshot, the
+    playbook list and the artifact index loaded, and refreshes them before
+    each fork; children inherit that state and exit after one command.
+    """
+
+    def __init__(self, socket_path: Path, cli: click.Group) -> None:
+        self.cli = cli
+        super().__init__(str(socket_path), ArkRequestHandler)
+
+    def server_bind(self) -> None:
+        # Only the owner may connect: requests run with the daemon's rights.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        try:
+            refresh_state()
+        except Exception:  # pylint: disable=broad-except
+            # The forked command hits the same error and reports it.
+            pass
+        super().process_request(request, client_address)
+
+
+def refresh_state() -> None:
+    """Bring the inventory, playbook and artifact caches up to date."""
+    # pylint: disable=import-outside-toplevel
+    from src.index import open_index, update_index
+    from src.inventory import get_inventory_snapshot
+    from src.utils import find_playbooks
+
+    if Path(c.INVENTORY_DIR).is_dir():
+        get_inventory_snapshot()
+    find_playbooks()
+    if c.ARTIFACTS_DIR.is_dir():
+        with closing(open_index(str(c.ARTIFACTS_DIR))) as index:
+            update_index(index, str(c.ARTIFACTS_DIR), str(c.ARCHIVE_DIR))
+
+
+def serve_commands(cli: click.Group, socket_path: Path) -> None:
+    """Load everything once and answer ark commands until interrupted."""
+    for module in PRELOADED_MODULES:
+        importlib.import_module(module)
+    refresh_state()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        if daemon_is_running(socket_path):
+            raise click.ClickException(
+                f"ark serve is already running on {socket_path}."
+            )
+        socket_path.unlink()
+
+    with ArkServer(socket_path, cli) as server:
+        click.echo(f"ark serve listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def daemon_is_running(socket_path: Path) -> bool:
+    """Check if something answers on the daemon socket."""
+    with closing(socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def forward_to_daemon(
+    argv: List[str], socket_path: Path = c.SERVER_SOCKET
+) -> Optional[int]:
+    """Run a command through `ark serve` and return its exit code.
+
+    Returns None, so the caller runs the command itself, when the command
+    is not served, the daemon is not running or ARK_NO_DAEMON is set.
+    """
+    if (
+        not argv
+        or argv[0] not in SERVED_COMMANDS
+        or os.environ.get(NO_DAEMON_ENV)
+        or not socket_path.exists()
+    ):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+
+    try:
+        with closing(sock), sock.makefile("rwb") as connection:
+            request = {
+                "argv": argv,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+            }
+            if "--stdin" in argv:
+                request["stdin"] = sys.stdin.read()
+            send_frame(connection, request)
+            for line in connection:
+                frame = json.loads(line)
+                if "stdout" in frame:
+                    sys.stdout.write(frame["stdout"])
+                    sys.stdout.flush()
+                elif "stderr" in frame:
+                    sys.stderr.write(frame["stderr"])
+                    sys.stderr.flush()
+                elif "exit" in frame:
+                    exit_code: int = frame["exit"]
+                    return exit_code
+    except KeyboardInterrupt:
+        # Closing the connection interrupts the command in the daemon.
+        click.echo("Aborted!", err=True)
+        return 1
+    click.echo("ark serve closed the connection.", err=True)
+    return 1
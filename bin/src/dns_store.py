@@ -0,0 +1,162 @@
+"""Persistent DNS check results that expire with their answer TTL."""
+
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.resolver import DnsAnswer
+
+# Bump when the schema changes; older stores are rebuilt from scratch.
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    host TEXT NOT NULL,
+    server TEXT NOT NULL,
+    resolved INTEGER NOT NULL,
+    ttl INTEGER NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (host, server)
+) WITHOUT ROWID;
+"""
+
+Pair = Tuple[str, str]
+
+
+class DnsResult(NamedTuple):
+    """Whether a server resolved a host, and until when that holds."""
+
+    resolved: bool
+    ttl: int
+    checked_at: float
+
+    @property
+    def expires_at(self) -> float:
+        """When the result should be checked again."""
+        return self.checked_at + self.ttl
+
+
+def open_store(store_path: str) -> sqlite3.Connection:
+    """Open the result store, creating or rebuilding it when needed."""
+    conn = sqlite3.connect(store_path)
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version != STORE_VERSION:
+        conn.execute("DROP TABLE IF EXISTS results")
+        conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def load_results(conn: sqlite3.Connection) -> Dict[Pair, DnsResult]:
+    """Load every stored result by (host, server)."""
+    return {
+        (host, server): DnsResult(bool(resolved), ttl, checked_at)
+        for host, server, resolved, ttl, checked_at in conn.execute(
+            "SELECT host, server, resolved, ttl, checked_at FROM results"
+        )
+    }
+
+
+def find_due_pairs(
+    hosts: Sequence[str],
+    dns_servers: Sequence[str],
+    results: Dict[Pair, DnsResult],
+    now: float,
+) -> List[Pair]:
+    """List the pairs that were never checked or whose result expired."""
+    due = []
+    for host in hosts:
+        for server in dns_servers:
+            result = results.get((host, server))
+            if result is None or result.expires_at <= now:
+                due.append((host, server))
+    return due
+
+
+def make_result(
+    answer: Optional[DnsAnswer],
+    checked_at: float,
+    default_ttl: int,
+    min_ttl: int,
+) -> DnsResult:
+    """Turn an answer into a result that expires with the answer's TTL.
+
+    Failures and answers without a TTL keep default_ttl; min_ttl raises
+    short TTLs so that, for example, a nightly audit reuses them.
+    """
+    ttl = default_ttl
+    if answer is not None and answer.ttl is not None:
+        ttl = answer.ttl
+    return DnsResult(answer is not None, max(ttl, min_ttl), checked_at)
+
+
+def save_results(
+    conn: sqlite3.Connection,
+    checked: Dict[Pair, DnsResult],
+    stale: Iterable[Pair],
+) -> None:
+    """Store new results and forget pairs no longer in the audit."""
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO results "
+            "(host, server, resolved, ttl, checked_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    host,
+                    server,
+                    int(result.resolved),
+                    result.ttl,
+                    result.checked_at,
+                )
+                for (host, server), result in checked.items()
+            ),
+        )
+        conn.executemany(
+            "DELETE FROM results WHERE host = ? AND server = ?", stale
+        )
+
+
+def get_missing_servers(
+    hosts: Sequence[str],
+    dns_servers: Sequence[str],
+    results: Dict[Pair, DnsResult],
+) -> List[List[str]]:
+    """Rows of hosts and the servers that could not resolve them."""
+    rows = []
+    for host in hosts:
+        missing = [
+            server
+            for server in dns_servers
+            if not results[(host, server)].resolved
+        ]
+        if missing:
+            rows.append([host, ", ".join(missing)])
+    return rows
+
+
+def diff_results(
+    hosts: Sequence[str],
+    dns_servers: Sequence[str],
+    before: Dict[Pair, DnsResult],
+    after: Dict[Pair, DnsResult],
+) -> List[List[str]]:
+    """Rows of hosts with servers that newly fail or newly resolve them.
+
+    Hosts new to the audit count as previously resolved, so only their
+    failures are reported.
+    """
+    rows = []
+    for host in hosts:
+        broken = []
+        fixed = []
+        for server in dns_servers:
+            previous = before.get((host, server))
+            was_resolved = previous is None or previous.resolved
+            is_resolved = after[(host, server)].resolved
+            if was_resolved and not is_resolved:
+                broken.append(server)
+            elif is_resolved and not was_resolved:
+                fixed.append(server)
+        if broken or fixed:
+            rows.append([host, ", ".join(broken), ", ".join(fixed)])
+    return rows
@@ -0,0 +1,81 @@
+"""Local stub DNS server for exercising the resolver."""
+
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, List
+
+from src.resolver import skip_name
+
+
+class StubDnsHandler(socketserver.BaseRequestHandler):
+    """Answer A queries for names starting with 'host', NXDOMAIN otherwise.
+
+    Names starting with 'empty' exist without records, so the resolver
+    asks for both A and AAAA.
+    """
+
+    server: "StubDnsServer"
+
+    def handle(self) -> None:
+        data, sock = self.request
+        with self.server.lock:
+            self.server.query_times.append(time.monotonic())
+        question_end = skip_name(data, 12) + 4
+        label_length = data[12]
+        name = data[13 : 13 + label_length]
+        qtype = struct.unpack("!H", data[question_end - 4 : question_end - 2])
+        found = name.startswith(b"host") and qtype[0] == 1
+        exists = found or name.startswith(b"empty")
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        header = data[:2] + struct.pack(
+            "!HHHHH", 0x8180 if exists else 0x8183, 1, int(found), 0, 0
+        )
+        answer = b""
+        if found:
+            answer = b"\xc0\x0c" + struct.pack(
+                "!HHIH4B", 1, 1, 300, 4, 127, 0, 0, 1
+            )
+        sock.sendto(
+            header + data[12:question_end] + answer, self.client_address
+        )
+
+
+class StubDnsServer(socketserver.ThreadingUDPServer):
+    """Local stub DNS server used to benchmark and test the resolver."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), StubDnsHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.query_times: List[float] = []
+
+    @property
+    def address(self) -> str:
+        """The 'host:port' the stub is listening on."""
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def peak_rate(self, window: float = 1.0) -> int:
+        """The most queries received within any window seconds."""
+        with self.lock:
+            times = sorted(self.query_times)
+        peak = 0
+        start = 0
+        for end, received in enumerate(times):
+            while received - times[start] >= window:
+                start += 1
+            peak = max(peak, end - start + 1)
+        return peak
+
+    def __enter__(self) -> "StubDnsServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
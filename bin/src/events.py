@@ -0,0 +1,173 @@
+"""Ansible-Runner Kit live event streaming."""
+
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+import click
+
+EVENT_SINK_FORMATS = ("ndjson",)
+
+# Runner events worth streaming; everything else is noise for consumers.
+STREAMED_EVENTS = {
+    "playbook_on_play_start": None,
+    "playbook_on_task_start": None,
+    "playbook_on_stats": None,
+    "runner_on_start": "started",
+    "runner_on_ok": "ok",
+    "runner_on_failed": "failed",
+    "runner_on_skipped": "skipped",
+    "runner_on_unreachable": "unreachable",
+    "runner_on_async_failed": "failed",
+    "runner_item_on_ok": "ok",
+    "runner_item_on_failed": "failed",
+    "runner_item_on_skipped": "skipped",
+}
+
+
+def compact_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Reduce a runner event to the fields a progress consumer needs."""
+    name = event.get("event")
+    if name not in STREAMED_EVENTS:
+        return None
+
+    event_data = event.get("event_data", {})
+    status = STREAMED_EVENTS[name]
+    if status == "ok" and event_data.get("res", {}).get("changed"):
+        status = "changed"
+    record = {
+        "ts": event.get("created"),
+        "ident": event.get("runner_ident"),
+        "event": name,
+        "play": event_data.get("play"),
+        "task": event_data.get("task"),
+        "host": event_data.get("host"),
+        "status": status,
+        "duration": event_data.get("duration"),
+    }
+    if name == "playbook_on_stats":
+        record["failures"] = event_data.get("failures")
+        record["dark"] = event_data.get("dark")
+    return {key: value for key, value in record.items() if value is not None}
+
+
+class NdjsonEventWriter:
+    """Buffered NDJSON writer used as an ansible-runner event handler.
+
+    Records are written in batches of batch_size, and a background thread
+    flushes whatever is buffered every flush_interval seconds, so a wide
+    run does not pay for a write per event and records still show during
+    quiet tasks. A lock lets concurrent runners share a writer.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        close_stream: bool = True,
+    ) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.close_stream = close_stream
+        self.buffer: List[str] = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_loop, daemon=True)
+        self.flusher.start()
+
+    @property
+    def to_stdout(self) -> bool:
+        """Whether records go to stdout, which must then stay pure NDJSON."""
+        return self.stream is sys.stdout
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Queue a record, flushing when the batch is full or stale."""
+        line = json.dumps(record, separators=(",", ":"))
+        with self.lock:
+            self.buffer.append(line)
+            if (
+                len(self.buffer) >= self.batch_size
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def flush_loop(self) -> None:
+        """Flush buffered records every flush_interval until closed."""
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+
+    def event_handler(self, event: Dict[str, Any]) -> bool:
+        """Stream a runner event; always keep it in the artifacts too."""
+        record = compact_event(event)
+        if record is not None:
+            self.write(record)
+        return True
+
+    def status_handler(
+        self, status_data: Dict[str, Any], runner_config: Any = None
+    ) -> None:
+        """Stream runner status changes and flush so they show promptly."""
+        self.write(
+            {
+                "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "ident": status_data.get("runner_ident"),
+                "event": "status",
+                "status": status_data.get("status"),
+            }
+        )
+        self.flush()
+
+    def flush(self) -> None:
+        """Write out any buffered records."""
+        with self.lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.buffer:
+            self.stream.write("\n".join(self.buffer) + "\n")
+            self.stream.flush()
+            self.buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush remaining records and close the stream if we own it."""
+        self.closed.set()
+        self.flusher.join()
+        self.flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+def parse_event_sink(
+    # Callback function. ctx and param are required even if unused!
+    ctx: click.Context,  # pylint: disable=unused-argument
+    param: click.Parameter,  # pylint: disable=unused-argument
+    value: Optional[str],
+) -> Optional[str]:
+    """Validate an event sink of the form '<format>:<path|->'."""
+    if value is None:
+        return None
+    sink_format, _, target = value.partition(":")
+    if sink_format not in EVENT_SINK_FORMATS or not target:
+        raise click.BadParameter(
+            f"Invalid event sink: {value}. Expected one of "
+            f"{', '.join(f'{name}:<path|->' for name in EVENT_SINK_FORMATS)}"
+        )
+    return value
+
+
+def open_event_writer(sink: str) -> NdjsonEventWriter:
+    """Open the writer for a validated event sink."""
+    _, _, target = sink.partition(":")
+    if target == "-":
+        return NdjsonEventWriter(sys.stdout, close_stream=False)
+    return NdjsonEventWriter(
+        open(  # pylint: disable=consider-using-with
+            target, "a", encoding="utf-8", buffering=1024 * 1024
+        )
+    )
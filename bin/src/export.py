@@ -0,0 +1,117 @@
+"""Ansible-Runner Kit streaming report output."""
+
+import csv
+import heapq
+import itertools
+import json
+import sys
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import click
+
+from src.index import (
+    RECAP_FIELDS,
+    ArtifactRecord,
+    read_artifact_record,
+    scan_artifacts,
+    scan_packed_artifacts,
+)
+from src.utils import echo_artifact_report, get_artifact_playbook
+
+REPORT_FORMATS = ("text", "json", "ndjson", "csv")
+
+CSV_COLUMNS = ("path", "ident", "playbook", "timestamp", "recap", "host")
+
+
+def select_artifacts(
+    found: Iterable[Tuple[Path, int]], last: Optional[int]
+) -> List[Tuple[Path, int]]:
+    """Order artifacts newest first, keeping only the last N if given.
+
+    The mtimes come from the scan, so nothing is stat'ed again, and a heap
+    picks the last N without sorting every artifact.
+    """
+    if last is not None and last > 0:
+        return heapq.nlargest(last, found, key=itemgetter(1))
+    return sorted(found, key=itemgetter(1), reverse=True)
+
+
+def iter_artifact_records(
+    artifacts_dir: str,
+    archive_dir: Optional[str],
+    last: Optional[int],
+    playbook: Optional[str],
+) -> Iterator[ArtifactRecord]:
+    """Parse artifacts newest first, yielding each record as it is read.
+
+    With a playbook filter the last N matches are not known up front, so
+    artifacts are walked newest first until N of them match.
+    """
+    found: Iterable[Tuple[Path, int]] = scan_artifacts(artifacts_dir)
+    if archive_dir:
+        found = itertools.chain(found, scan_packed_artifacts(archive_dir))
+
+    selected = select_artifacts(found, None if playbook else last)
+    if playbook:
+        selected_iter: Iterable[Tuple[Path, int]] = (
+            (artifact_path, mtime_ns)
+            for artifact_path, mtime_ns in selected
+            if get_artifact_playbook(artifact_path) == playbook
+        )
+        if last is not None and last > 0:
+            selected_iter = itertools.islice(selected_iter, last)
+    else:
+        selected_iter = selected
+
+    for artifact_path, mtime_ns in selected_iter:
+        yield read_artifact_record(artifact_path, mtime_ns)
+
+
+def iter_csv_rows(record: ArtifactRecord) -> Iterator[List[object]]:
+    """Flatten a record into one CSV row per host and recap."""
+    for recap_number, host_stats in enumerate(record["recaps"]):
+        for host, stats in host_stats.items():
+            yield [
+                record["path"],
+                record["ident"],
+                record["playbook"] or "",
+                record["timestamp"],
+                recap_number,
+                host,
+            ] + [stats.get(field, 0) for field in RECAP_FIELDS]
+
+
+def write_report_records(
+    records: Iterable[ArtifactRecord], output_format: str
+) -> None:
+    """Write report records as they arrive, as text, JSON, NDJSON or CSV."""
+    if output_format == "text":
+        for record in records:
+            echo_artifact_report(
+                record["path"],
+                record["playbook"],
+                record["timestamp"],
+                record["recaps"],
+            )
+        return
+
+    if output_format == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(CSV_COLUMNS + RECAP_FIELDS)
+        for record in records:
+            writer.writerows(iter_csv_rows(record))
+            sys.stdout.flush()
+        return
+
+    if output_format == "json":
+        click.echo("[")
+    for number, record in enumerate(records):
+        line = json.dumps(record)
+        if output_format == "json":
+            click.echo(f"{',' if number else ''}{line}")
+        else:
+            click.echo(line)
+    if output_format == "json":
+        click.echo("]")
@@ -0,0 +1,126 @@
+"""Ansible-Runner Kit Fact Cache."""
+
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from src import constants as c
+
+# Seconds cached facts stay valid for smart gathering.
+FACT_CACHE_TIMEOUT = 86400
+
+# Ansible 2.19+ prefixes cache keys with a schema version, e.g. s1_web01.
+FACT_KEY_PREFIX = re.compile(r"^s\d+_")
+
+
+def fact_cache_kwargs(
+    enabled: bool, timeout: int = FACT_CACHE_TIMEOUT
+) -> Dict[str, Any]:
+    """Build the ansible-runner arguments to share the ARK fact cache.
+
+    ansible-runner keeps a fact cache per artifact by default, so smart
+    gathering never finds facts from an earlier run. An absolute
+    fact_cache path makes every run use the same jsonfile cache.
+    """
+    if not enabled:
+        return {}
+    return {
+        "fact_cache_type": "jsonfile",
+        "fact_cache": str(c.FACT_CACHE_DIR),
+        "envvars": {
+            "ANSIBLE_GATHERING": "smart",
+            "ANSIBLE_CACHE_PLUGIN_TIMEOUT": str(timeout),
+        },
+    }
+
+
+def iter_fact_cache_files(
+    known_hosts: Optional[Dict[str, List[str]]] = None,
+) -> Iterator[Tuple[str, Path, float]]:
+    """Yield the host, path and modification time of every cache file.
+
+    A host may have several files, e.g. with and without a key prefix.
+    """
+    if not c.FACT_CACHE_DIR.is_dir():
+        return
+    for cache_file in c.FACT_CACHE_DIR.iterdir():
+        if cache_file.name.startswith(".") or not cache_file.is_file():
+            continue
+        host = cache_file.name
+        if known_hosts is None or host not in known_hosts:
+            host = FACT_KEY_PREFIX.sub("", host)
+        yield host, cache_file, cache_file.stat().st_mtime
+
+
+def read_fact_cache(
+    known_hosts: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Tuple[Path, float]]:
+    """Map each cached host to its newest cache file and its mtime."""
+    entries: Dict[str, Tuple[Path, float]] = {}
+    for host, cache_file, mtime in iter_fact_cache_files(known_hosts):
+        if host not in entries or entries[host][1] < mtime:
+            entries[host] = (cache_file, mtime)
+    return entries
+
+
+def format_age(seconds: float) -> str:
+    """Format an age in seconds as a short human-readable string."""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.1f}{unit}"
+    return f"{seconds:.0f}s"
+
+
+def display_fact_status(
+    hosts: Dict[str, List[str]], ttl: int, show_hosts: bool
+) -> None:
+    """Display fact cache age per host and coverage of the inventory."""
+    now = time.time()
+    entries = read_fact_cache(hosts)
+    fresh = expired = 0
+    for host in hosts:
+        entry = entries.get(host)
+        if entry is None:
+            state = "missing"
+        elif now - entry[1] > ttl:
+            expired += 1
+            state = f"expired ({format_age(now - entry[1])} old)"
+        else:
+            fresh += 1
+            state = f"cached {format_age(now - entry[1])} ago"
+        if show_hosts:
+            click.echo(f"{host}: {state}")
+
+    stale = [host for host in entries if host not in hosts]
+    total = len(hosts)
+    coverage = fresh / total * 100 if total else 0.0
+    click.echo(
+        f"{fresh} of {total} hosts have fresh facts ({coverage:.1f}%), "
+        f"{expired} expired, {total - fresh - expired} missing, "
+        f"{len(stale)} cached hosts not in the inventory."
+    )
+
+
+def prune_fact_cache(
+    hosts: Dict[str, List[str]], ttl: int, dry_run: bool
+) -> List[Path]:
+    """Remove cached facts of unknown hosts or older than ttl seconds.
+
+    Every cache file is checked, so all the files of a host go at once.
+    """
+    now = time.time()
+    action = "Would remove" if dry_run else "Removed"
+    removed = []
+    for host, cache_file, mtime in iter_fact_cache_files(hosts):
+        if host in hosts and now - mtime <= ttl:
+            continue
+        if not dry_run:
+            cache_file.unlink(missing_ok=True)
+        reason = "not in inventory" if host not in hosts else "expired"
+        click.echo(f"{action} {cache_file.name} ({reason})")
+        removed.append(cache_file)
+    click.echo(f"{action} {len(removed)} fact cache entries.")
+    return removed
@@ -0,0 +1,140 @@
+"""Ansible-Runner Kit Host Variables."""
+
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import click
+from ansible import constants as C
+from ansible.inventory.helpers import get_group_vars, sort_groups
+from ansible.inventory.host import Host
+from ansible.inventory.manager import InventoryManager
+from ansible.utils.vars import combine_vars
+from ansible.vars.plugins import (
+    get_vars_from_inventory_sources,
+    get_vars_from_path,
+)
+
+from src import constants as c
+from src.inventory import get_groups_for_host, load_inventory
+
+# Host name, its groups and its variables (None unless requested).
+HostRecord = Tuple[str, List[str], Optional[Dict[str, Any]]]
+
+
+class HostVarsResolver:
+    """Resolve the inventory variables of many hosts in one pass.
+
+    Variables are merged the way Ansible's VariableManager does before a
+    play: group vars in VARIABLE_PRECEDENCE order, then host vars, from the
+    inventory, its group_vars/host_vars and the playbook directory. Hosts
+    sharing the same groups reuse one merged result, so group_vars files
+    are loaded and combined once per group combination, not once per host.
+    """
+
+    def __init__(self, inventory: InventoryManager) -> None:
+        self.inventory = inventory
+        self.loader = inventory._loader  # pylint: disable=protected-access
+        self.sources = inventory._sources  # pylint: disable=protected-access
+        self.play_dir = str(c.PROJECT_DIR)
+        self.group_cache: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def inventory_vars(self, entities: Sequence[Any]) -> Dict[str, Any]:
+        """Vars from group_vars and host_vars next to the inventory."""
+        found: Dict[str, Any] = get_vars_from_inventory_sources(
+            self.loader, self.sources, entities, "all"
+        )
+        return found
+
+    def play_vars(self, entities: Sequence[Any]) -> Dict[str, Any]:
+        """Vars from group_vars and host_vars next to the playbooks."""
+        found: Dict[str, Any] = get_vars_from_path(
+            self.loader, self.play_dir, entities, "all"
+        )
+        return found
+
+    def group_layer(self, host: Host) -> Dict[str, Any]:
+        """Merged vars of the host's groups, memoized per group set."""
+        host_groups = sort_groups(
+            [group for group in host.get_groups() if group.name != "all"]
+        )
+        key = tuple(group.name for group in host_groups)
+        if key in self.group_cache:
+            return self.group_cache[key]
+
+        all_group = self.inventory.groups["all"]
+        layers: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "all_inventory": lambda: all_group.get_vars(),
+            "groups_inventory": lambda: get_group_vars(host_groups),
+            "all_plugins_inventory": lambda: self.inventory_vars([all_group]),
+            "all_plugins_play": lambda: self.play_vars([all_group]),
+            "groups_plugins_inventory": lambda: self.inventory_vars(
+                host_groups
+            ),
+            "groups_plugins_play": lambda: self.play_vars(host_groups),
+        }
+        merged: Dict[str, Any] = {}
+        for entry in C.VARIABLE_PRECEDENCE:
+            if entry in layers:
+                merged = combine_vars(merged, layers[entry]())
+        self.group_cache[key] = merged
+        return merged
+
+    def host_vars(self, host: Host) -> Dict[str, Any]:
+        """All inventory variables of a host."""
+        merged = combine_vars(self.group_layer(host), host.get_vars())
+        merged = combine_vars(merged, self.inventory_vars([host]))
+        merged = combine_vars(merged, self.play_vars([host]))
+        return {
+            key: value
+            for key, value in merged.items()
+            if key not in C.INTERNAL_STATIC_VARS
+        }
+
+
+def iter_host_vars(
+    pattern: str = "all",
+    with_vars: bool = True,
+    keys: Optional[Sequence[str]] = None,
+) -> Iterator[HostRecord]:
+    """Yield each matching host with its groups and resolved vars."""
+    inventory = load_inventory()
+    resolver = HostVarsResolver(inventory)
+    for host in inventory.get_hosts(pattern=pattern or "all"):
+        host_vars = resolver.host_vars(host) if with_vars else None
+        if host_vars is not None and keys:
+            host_vars = {
+                key: host_vars[key] for key in keys if key in host_vars
+            }
+        yield host.name, get_groups_for_host(host), host_vars
+
+
+def write_host_records(
+    records: Iterable[HostRecord],
+    output_format: str,
+) -> None:
+    """Stream host records as NDJSON lines or as one JSON object."""
+    if output_format == "json":
+        click.echo("{")
+    for number, (name, groups, host_vars) in enumerate(records):
+        record: Dict[str, Any] = {"groups": groups}
+        if host_vars is not None:
+            record["vars"] = host_vars
+        if output_format == "json":
+            click.echo(
+                f"{',' if number else ''}{json.dumps(name)}: "
+                f"{json.dumps(record, default=str)}"
+            )
+        else:
+            click.echo(json.dumps({"host": name, **record}, default=str))
+    if output_format == "json":
+        click.echo("}")
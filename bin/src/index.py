@@ -0,0 +1,333 @@
+"""Ansible-Runner Kit Artifact Index."""
+
+import hashlib
+import itertools
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, TypedDict
+
+from src import constants as c
+from src.retention import read_rc, read_run_duration, read_status
+from src.utils import (
+    PACKED_ARTIFACT_SUFFIX,
+    STATS_EVENT_FIELDS,
+    HostStats,
+    extract_artifact_recaps,
+    extract_playbook_name_from_file,
+    find_packed_artifacts,
+    is_packed_artifact,
+    read_packed_summary,
+)
+
+# Bump when the schema changes; older index files are rebuilt from scratch.
+INDEX_VERSION = 2
+
+RECAP_FIELDS: Tuple[str, ...] = tuple(STATS_EVENT_FIELDS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    ident TEXT NOT NULL,
+    playbook TEXT,
+    mtime_ns INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT,
+    rc INTEGER,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS artifacts_by_mtime
+    ON artifacts (mtime_ns);
+CREATE INDEX IF NOT EXISTS artifacts_by_playbook
+    ON artifacts (playbook, mtime_ns);
+CREATE TABLE IF NOT EXISTS host_stats (
+    path TEXT NOT NULL REFERENCES artifacts (path) ON DELETE CASCADE,
+    recap INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    {", ".join(f"{field} INTEGER NOT NULL" for field in RECAP_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS host_stats_by_path
+    ON host_stats (path, recap);
+"""
+
+
+class ArtifactRecord(TypedDict):
+    """Indexed summary of a single artifact folder or archive."""
+
+    path: str
+    ident: str
+    playbook: Optional[str]
+    mtime_ns: int
+    timestamp: str
+    status: Optional[str]
+    rc: Optional[int]
+    duration: Optional[float]
+    recaps: List[HostStats]
+
+
+def get_index_path(artifacts_dir: str) -> Path:
+    """Get the index file for an artifacts directory.
+
+    The index lives outside the artifacts directory because ansible-runner
+    rotation removes every entry it finds there.
+    """
+    resolved = str(Path(artifacts_dir).resolve())
+    digest = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:16]
+    return c.ARTIFACT_INDEX_DIR / f"{digest}.sqlite"
+
+
+def get_shard_group(ident: str) -> Optional[str]:
+    """The ident prefix shared by the shards of a sharded run, if any."""
+    group, marker, number = ident.rpartition(c.SHARD_IDENT_MARKER)
+    return group + marker if marker and number.isdigit() else None
+
+
+def open_index(artifacts_dir: str) -> sqlite3.Connection:
+    """Open the artifact index, creating or rebuilding it when needed."""
+    index_path = get_index_path(artifacts_dir)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version != INDEX_VERSION:
+        conn.executescript(
+            "DROP TABLE IF EXISTS host_stats; DROP TABLE IF EXISTS artifacts;"
+        )
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def scan_artifacts(artifacts_dir: str) -> Iterator[Tuple[Path, int]]:
+    """Yield artifact folders and their stdout mtime.
+
+    Folders containing a stdout file are not descended into, so the
+    job_events of every run are never walked.
+    """
+    pending = [artifacts_dir]
+    while pending:
+        folder = pending.pop()
+        try:
+            stdout_stat = os.stat(os.path.join(folder, "stdout"))
+        except OSError:
+            stdout_stat = None
+
+        if stdout_stat is not None:
+            yield Path(folder), stdout_stat.st_mtime_ns
+            continue
+
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+        except OSError:
+            continue
+
+
+def read_artifact_record(artifact_path: Path, mtime_ns: int) -> ArtifactRecord:
+    """Parse one artifact folder or archive into its summary record."""
+    if is_packed_artifact(artifact_path):
+        summary = read_packed_summary(artifact_path)
+        ident = summary["ident"]
+        playbook_name = summary["playbook"]
+        status = summary.get("status")
+        rc = summary.get("rc")
+        # Archives packed before durations were recorded have none.
+        duration = summary.get("duration")
+        recaps: List[HostStats] = summary["recaps"]
+    else:
+        ident = artifact_path.name
+        playbook_name = extract_playbook_name_from_file(
+            str(artifact_path / "command")
+        )
+        status = read_status(artifact_path)
+        rc = read_rc(artifact_path)
+        duration = read_run_duration(artifact_path)
+        recaps = extract_artifact_recaps(artifact_path)
+    return ArtifactRecord(
+        path=str(artifact_path),
+        ident=ident,
+        playbook=playbook_name,
+        mtime_ns=mtime_ns,
+        timestamp=datetime.fromtimestamp(mtime_ns / 1e9).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        ),
+        status=status,
+        rc=rc,
+        duration=duration,
+        recaps=recaps,
+    )
+
+
+def index_artifact(
+    conn: sqlite3.Connection, artifact_path: Path, key: str, mtime_ns: int
+) -> None:
+    """Parse one artifact folder or archive and store its summary."""
+    record = read_artifact_record(artifact_path, mtime_ns)
+
+    conn.execute("DELETE FROM artifacts WHERE path = ?", (key,))
+    conn.execute(
+        "INSERT INTO artifacts "
+        "(path, ident, playbook, mtime_ns, timestamp, status, rc, duration) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            key,
+            record["ident"],
+            record["playbook"],
+            mtime_ns,
+            record["timestamp"],
+            record["status"],
+            record["rc"],
+            record["duration"],
+        ),
+    )
+    rows = []
+    for recap_number, host_stats in enumerate(record["recaps"]):
+        for host, stats in host_stats.items():
+            rows.append(
+                (key, recap_number, host)
+                + tuple(stats.get(field, 0) for field in RECAP_FIELDS)
+            )
+    conn.executemany(
+        f"INSERT INTO host_stats (path, recap, host, "
+        f"{', '.join(RECAP_FIELDS)}) "
+        f"VALUES (?, ?, ?{', ?' * len(RECAP_FIELDS)})",
+        rows,
+    )
+
+
+def scan_packed_artifacts(archive_dir: str) -> Iterator[Tuple[Path, int]]:
+    """Yield packed artifact archives and their mtime."""
+    for archive_path in find_packed_artifacts(archive_dir):
+        try:
+            yield archive_path, archive_path.stat().st_mtime_ns
+        except OSError:
+            continue
+
+
+def update_index(
+    conn: sqlite3.Connection,
+    artifacts_dir: str,
+    archive_dir: Optional[str] = None,
+) -> None:
+    """Index new or changed artifacts and forget removed ones.
+
+    Archives are keyed relative to the artifacts directory as well, so a
+    packed run simply replaces its folder in the index; without an
+    archive_dir, indexed archives are kept as they are. Runs indexed
+    while still in progress have no status, since ansible-runner only
+    writes the status file when a run ends, after the last stdout write;
+    they are read again once that file appears.
+    """
+    known = {}
+    unfinished = set()
+    for path, mtime_ns, status in conn.execute(
+        "SELECT path, mtime_ns, status FROM artifacts"
+    ):
+        known[path] = mtime_ns
+        if status is None:
+            unfinished.add(path)
+    seen = set()
+
+    found = scan_artifacts(artifacts_dir)
+    if archive_dir:
+        found = itertools.chain(found, scan_packed_artifacts(archive_dir))
+    for artifact_path, mtime_ns in found:
+        key = os.path.relpath(artifact_path, artifacts_dir)
+        seen.add(key)
+        if known.get(key) != mtime_ns or (
+            key in unfinished and (artifact_path / "status").is_file()
+        ):
+            index_artifact(conn, artifact_path, key, mtime_ns)
+
+    removed = known.keys() - seen
+    if not archive_dir:
+        removed = {
+            key for key in removed if not key.endswith(PACKED_ARTIFACT_SUFFIX)
+        }
+    conn.executemany(
+        "DELETE FROM artifacts WHERE path = ?", [(key,) for key in removed]
+    )
+    conn.commit()
+
+
+def load_recaps(conn: sqlite3.Connection, key: str) -> List[HostStats]:
+    """Load the recap host stats stored for an artifact."""
+    recaps: List[HostStats] = []
+    rows = conn.execute(
+        f"SELECT recap, host, {', '.join(RECAP_FIELDS)} FROM host_stats "
+        "WHERE path = ? ORDER BY recap, rowid",
+        (key,),
+    )
+    for recap_number, host, *counters in rows:
+        while len(recaps) <= recap_number:
+            recaps.append({})
+        recaps[recap_number][host] = dict(zip(RECAP_FIELDS, counters))
+    return recaps
+
+
+def query_artifacts(
+    conn: sqlite3.Connection,
+    artifacts_dir: str,
+    last: Optional[int] = None,
+    playbook: Optional[str] = None,
+    ident_prefix: Optional[str] = None,
+) -> Iterator[ArtifactRecord]:
+    """Yield indexed artifacts, newest first."""
+    query = (
+        "SELECT path, ident, playbook, mtime_ns, timestamp, status, rc, "
+        "duration FROM artifacts"
+    )
+    conditions: List[str] = []
+    params: List[object] = []
+    if playbook:
+        conditions.append("playbook = ?")
+        params.append(playbook)
+    if ident_prefix:
+        conditions.append("substr(ident, 1, ?) = ?")
+        params.extend([len(ident_prefix), ident_prefix])
+    if conditions:
+        query += f" WHERE {' AND '.join(conditions)}"
+    query += " ORDER BY mtime_ns DESC LIMIT ?"
+    params.append(last if last and last > 0 else -1)
+
+    for (
+        key,
+        ident,
+        playbook_name,
+        mtime_ns,
+        timestamp,
+        status,
+        rc,
+        duration,
+    ) in conn.execute(query, params).fetchall():
+        yield ArtifactRecord(
+            path=os.path.normpath(os.path.join(artifacts_dir, key)),
+            ident=ident,
+            playbook=playbook_name,
+            mtime_ns=mtime_ns,
+            timestamp=timestamp,
+            status=status,
+            rc=rc,
+            duration=duration,
+            recaps=load_recaps(conn, key),
+        )
+
+
+def list_artifact_paths(
+    conn: sqlite3.Connection,
+    artifacts_dir: str,
+    playbook: Optional[str] = None,
+) -> Iterator[Path]:
+    """Yield indexed artifact folders and archives, newest first."""
+    query = "SELECT path FROM artifacts"
+    params: List[object] = []
+    if playbook:
+        query += " WHERE playbook = ?"
+        params.append(playbook)
+    query += " ORDER BY mtime_ns DESC"
+
+    for (key,) in conn.execute(query, params):
+        yield Path(os.path.normpath(os.path.join(artifacts_dir, key)))
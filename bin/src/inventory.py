@@ -1,24 +1,70 @@
 """Ansible-Runner Kit Host Operations."""
 
-from typing import Union
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, TypedDict, Union
 
 import click
-from ansible.inventory.group import Group
-from ansible.inventory.host import Host
-from ansible.inventory.manager import InventoryManager
-from ansible.parsing.dataloader import DataLoader
 
 from src import constants as c
 
+# Ansible is only imported when the inventory has to be parsed, so reading
+# the cached snapshot does not pay for it.
+if TYPE_CHECKING:
+    from ansible.inventory.group import Group
+    from ansible.inventory.host import Host
+    from ansible.inventory.manager import InventoryManager
+
+# Bump when the snapshot layout changes so stale caches are rebuilt.
+SNAPSHOT_VERSION = 1
+
+# Relative file path -> [mtime_ns, size, sha256]
+Fingerprint = Dict[str, List[Union[int, str]]]
+
+
+class InventorySnapshot(TypedDict):
+    """Serialized view of the inventory membership."""
+
+    version: int
+    source: str
+    fingerprint: Fingerprint
+    hosts: Dict[str, List[str]]
+    groups: Dict[str, List[str]]
+    children: Dict[str, List[str]]
+
+
+# Inventory source path -> the last snapshot loaded by this process.
+LOADED_SNAPSHOTS: Dict[str, InventorySnapshot] = {}
+
+
+def load_inventory() -> "InventoryManager":
+    """Parse the inventory directory."""
+    # pylint: disable=import-outside-toplevel
+    from ansible.inventory.manager import InventoryManager
+    from ansible.parsing.dataloader import DataLoader
 
-def get_host(target_host: str) -> Union[Host, None]:
-    """Get a host from the inventory."""
     data_loader = DataLoader()
-    inventory = InventoryManager(loader=data_loader, sources=[c.INVENTORY_DIR])
+    return InventoryManager(loader=data_loader, sources=[c.INVENTORY_DIR])
+
+
+def get_host(target_host: str) -> Union["Host", None]:
+    """Get a host from the inventory."""
+    inventory = load_inventory()
     return inventory.get_host(target_host)
 
 
-def get_groups_for_host(host: Host) -> list[str]:
+def resolve_hosts(pattern: str) -> List[str]:
+    """Get the names of the hosts matching an Ansible host pattern."""
+    inventory = load_inventory()
+    return [
+        host.name for host in inventory.get_hosts(pattern=pattern or "all")
+    ]
+
+
+def get_groups_for_host(host: "Host") -> list[str]:
     """Get all groups a host is a member of."""
     groups = []
     for group in host.groups:
@@ -33,22 +79,160 @@ def display_groups(target_host: str, groups: list[str]) -> None:
         click.echo(f"- {group}")
 
 
-def get_group(target_group: str) -> Union[Group, None]:
+def get_group(target_group: str) -> Union["Group", None]:
     """Get a group from the inventory."""
-    data_loader = DataLoader()
-    inventory = InventoryManager(loader=data_loader, sources=[c.INVENTORY_DIR])
+    inventory = load_inventory()
     return inventory.groups.get(target_group)
 
 
-def get_hosts_for_group(group: Group) -> list[Union[Host, None]]:
+def get_hosts_for_group(group: "Group") -> list[Union["Host", None]]:
     """Get all hosts in a group."""
-    host_list: list[Union[Host, None]] = []
+    host_list: list[Union["Host", None]] = []
     host_list = group.get_hosts()
     return host_list
 
 
-def display_hosts(target_group: str, hosts: list[Union[Host, None]]) -> None:
+def display_hosts(target_group: str, hosts: list[str]) -> None:
     """Display all hosts in a group."""
     click.echo(f"Group '{target_group}' contains the following hosts:")
     for host in hosts:
         click.echo(f"- {host}")
+
+
+def hash_file(file_path: Path) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with file_path.open("rb") as file_:
+        for block in iter(lambda: file_.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_inventory(
+    previous: Optional[Fingerprint] = None,
+) -> Fingerprint:
+    """Fingerprint every file under the inventory directory.
+
+    Files whose mtime and size match the previous fingerprint reuse the
+    stored hash, so an unchanged inventory is validated with stat calls only.
+    """
+    previous = previous or {}
+    inventory_root = Path(c.INVENTORY_DIR)
+    fingerprint: Fingerprint = {}
+
+    for dir_path, dir_names, file_names in os.walk(inventory_root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = Path(dir_path) / file_name
+            relative_path = str(file_path.relative_to(inventory_root))
+            stat = file_path.stat()
+            known = previous.get(relative_path)
+            if known and known[:2] == [stat.st_mtime_ns, stat.st_size]:
+                file_hash = str(known[2])
+            else:
+                file_hash = hash_file(file_path)
+            fingerprint[relative_path] = [
+                stat.st_mtime_ns,
+                stat.st_size,
+                file_hash,
+            ]
+
+    return fingerprint
+
+
+def same_content(first: Fingerprint, second: Fingerprint) -> bool:
+    """Check if two fingerprints describe the same file contents."""
+    if first.keys() != second.keys():
+        return False
+    return all(first[path][2] == second[path][2] for path in first)
+
+
+def build_inventory_snapshot(
+    fingerprint: Optional[Fingerprint] = None,
+) -> InventorySnapshot:
+    """Parse the inventory and flatten its membership into a snapshot."""
+    inventory = load_inventory()
+    hosts = {
+        name: get_groups_for_host(host)
+        for name, host in inventory.hosts.items()
+    }
+    groups = {
+        name: [host.name for host in group.get_hosts()]
+        for name, group in inventory.groups.items()
+    }
+    children = {
+        name: [child.name for child in group.child_groups]
+        for name, group in inventory.groups.items()
+    }
+    return InventorySnapshot(
+        version=SNAPSHOT_VERSION,
+        source=str(Path(c.INVENTORY_DIR).resolve()),
+        fingerprint=fingerprint or fingerprint_inventory(),
+        hosts=hosts,
+        groups=groups,
+        children=children,
+    )
+
+
+def read_inventory_cache() -> Optional[InventorySnapshot]:
+    """Read the cached inventory snapshot, if a usable one exists."""
+    try:
+        with c.INVENTORY_CACHE_FILE.open(encoding="utf-8") as cache_file:
+            snapshot: InventorySnapshot = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get(
+        "source"
+    ) != str(Path(c.INVENTORY_DIR).resolve()):
+        return None
+    return snapshot
+
+
+def write_inventory_cache(snapshot: InventorySnapshot) -> None:
+    """Atomically write the inventory snapshot to the cache file."""
+    c.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        encoding="utf-8",
+        dir=c.CACHE_DIR,
+        prefix=".inventory-",
+        delete=False,
+    ) as temp:
+        json.dump(snapshot, temp)
+    os.replace(temp.name, c.INVENTORY_CACHE_FILE)
+
+
+def get_inventory_snapshot(
+    use_cache: bool = True, refresh: bool = False
+) -> InventorySnapshot:
+    """Get the inventory snapshot, rebuilding it only when files changed.
+
+    Snapshots are also kept in memory, so a long-lived process such as
+    `ark serve` only stats the inventory files on later calls.
+    """
+    if not use_cache:
+        return build_inventory_snapshot()
+
+    source = str(Path(c.INVENTORY_DIR).resolve())
+    cached = (
+        None
+        if refresh
+        else LOADED_SNAPSHOTS.get(source) or read_inventory_cache()
+    )
+    fingerprint = fingerprint_inventory(
+        cached["fingerprint"] if cached else None
+    )
+
+    if cached and same_content(cached["fingerprint"], fingerprint):
+        if cached["fingerprint"] != fingerprint:
+            # Touched but unchanged files: remember the new mtimes.
+            cached["fingerprint"] = fingerprint
+            write_inventory_cache(cached)
+        LOADED_SNAPSHOTS[source] = cached
+        return cached
+
+    snapshot = build_inventory_snapshot(fingerprint)
+    write_inventory_cache(snapshot)
+    LOADED_SNAPSHOTS[source] = snapshot
+    return snapshot
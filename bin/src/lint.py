@@ -1,7 +1,10 @@
 """Linting functions for Ansible playbooks."""
 
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, NamedTuple
 
 import click
 
@@ -32,12 +35,69 @@ def lint_single_playbook(playbook_file: str) -> None:
         click.echo(f"Error linting playbook '{playbook_file}': {single_error}")
 
 
-def lint_all_playbooks() -> None:
-    """Lint all playbooks in the project directory."""
-    for playbook in find_playbooks():
-        playbooks_path: Path = c.PROJECT_DIR / playbook
-        try:
-            click.echo(f"\nLinting '{playbook}'...", nl=False)
-            subprocess.check_output(["ansible-lint", str(playbooks_path)])
-        except subprocess.CalledProcessError as list_error:
-            click.echo(f"Error linting playbook '{playbook}': {list_error}")
+class LintResult(NamedTuple):
+    """Outcome of linting one playbook."""
+
+    playbook: str
+    passed: bool
+    output: str
+    seconds: float
+
+
+def lint_playbook(playbook: str) -> LintResult:
+    """Lint a playbook in the project directory and capture the output."""
+    playbook_path: Path = c.PROJECT_DIR / playbook
+    started = time.perf_counter()
+    linted = subprocess.run(
+        ["ansible-lint", str(playbook_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=False,
+    )
+    return LintResult(
+        playbook=playbook,
+        passed=linted.returncode == 0,
+        output=linted.stdout,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def lint_all_playbooks(jobs: int = 1) -> None:
+    """Lint all playbooks in the project directory.
+
+    Up to jobs ansible-lint processes run at once. Output is printed in
+    playbook name order as soon as each playbook and those before it have
+    finished, followed by a summary.
+    """
+    playbooks = sorted(find_playbooks())
+    started = time.perf_counter()
+
+    results: List[LintResult] = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for result in executor.map(lint_playbook, playbooks):
+            status = "passed" if result.passed else "failed"
+            click.echo(
+                f"\nLinting '{result.playbook}'... {status} "
+                f"({result.seconds:.1f}s)"
+            )
+            if not result.passed:
+                click.echo(result.output.rstrip())
+            results.append(result)
+
+    display_lint_summary(results, time.perf_counter() - started)
+
+
+def display_lint_summary(results: List[LintResult], wall_time: float) -> None:
+    """Display pass/fail counts and per-playbook times, slowest first."""
+    passed = sum(1 for result in results if result.passed)
+    click.echo("\nLint summary:")
+    click.echo("-------------------------")
+    for result in sorted(results, key=lambda item: item.seconds, reverse=True):
+        status = "PASS" if result.passed else "FAIL"
+        click.echo(f"{status}  {result.seconds:7.1f}s  {result.playbook}")
+    click.echo("-------------------------")
+    click.echo(
+        f"{passed} passed, {len(results) - passed} failed "
+        f"in {wall_time:.1f}s"
+    )
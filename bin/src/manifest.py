@@ -0,0 +1,311 @@
+"""Ansible-Runner Kit project manifest and syntax check cache."""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import click
+
+from src import constants as c
+from src.inventory import hash_file
+
+# Bump when the manifest layout changes so stale manifests are ignored.
+MANIFEST_VERSION = 1
+
+INCLUDE_TASK_KEYS = {
+    "include_tasks",
+    "import_tasks",
+    "include",
+    "ansible.builtin.include_tasks",
+    "ansible.builtin.import_tasks",
+}
+INCLUDE_ROLE_KEYS = {
+    "include_role",
+    "import_role",
+    "ansible.builtin.include_role",
+    "ansible.builtin.import_role",
+}
+IMPORT_PLAYBOOK_KEYS = {"import_playbook", "ansible.builtin.import_playbook"}
+TASK_SECTIONS = ("pre_tasks", "tasks", "post_tasks", "handlers")
+BLOCK_SECTIONS = ("block", "rescue", "always")
+
+# Relative file path -> [mtime_ns, size, sha256]
+FileHashes = Dict[str, List[Any]]
+
+
+class PlaybookFiles:
+    """The files a playbook is built from: itself, imports and roles.
+
+    Names that are templated or otherwise unresolvable make the set
+    incomplete, in which case the whole project directory stands in.
+    """
+
+    def __init__(self) -> None:
+        self.files: Set[Path] = set()
+        self.roles: Set[str] = set()
+        self.complete = True
+
+    def resolve(self, name: Any, base_dir: Path) -> Optional[Path]:
+        """Resolve an included file name, relative to base_dir first."""
+        if not isinstance(name, str) or "{{" in name:
+            self.complete = False
+            return None
+        for candidate in (base_dir / name, c.PROJECT_DIR / name):
+            if candidate.is_file():
+                return candidate
+        # Record the missing file so creating it changes the hash.
+        return base_dir / name
+
+    def add_playbook(self, playbook_path: Path) -> None:
+        """Add a playbook and everything its plays import."""
+        if playbook_path in self.files:
+            return
+        plays = self.add_yaml(playbook_path)
+        if not isinstance(plays, list):
+            return
+        for play in plays:
+            if not isinstance(play, dict):
+                continue
+            for key in IMPORT_PLAYBOOK_KEYS & play.keys():
+                path = self.resolve(play[key], playbook_path.parent)
+                if path:
+                    self.add_playbook(path)
+            for role in play.get("roles") or []:
+                self.add_role(
+                    role.get("role") or role.get("name")
+                    if isinstance(role, dict)
+                    else role
+                )
+            for vars_file in play.get("vars_files") or []:
+                path = self.resolve(vars_file, playbook_path.parent)
+                if path:
+                    self.files.add(path)
+            for section in TASK_SECTIONS:
+                self.add_tasks(play.get(section), playbook_path.parent)
+
+    def add_tasks(self, tasks: Any, base_dir: Path) -> None:
+        """Add the task files and roles a task list includes."""
+        if not isinstance(tasks, list):
+            return
+        for task in tasks:
+            if not isinstance(task, dict):
+                continue
+            for section in BLOCK_SECTIONS:
+                self.add_tasks(task.get(section), base_dir)
+            for key in INCLUDE_TASK_KEYS & task.keys():
+                value = task[key]
+                name = value.get("file") if isinstance(value, dict) else value
+                path = self.resolve(name, base_dir)
+                if path and path not in self.files:
+                    self.add_tasks(self.add_yaml(path), path.parent)
+            for key in INCLUDE_ROLE_KEYS & task.keys():
+                value = task[key]
+                self.add_role(
+                    value.get("name") if isinstance(value, dict) else None
+                )
+
+    def add_role(self, name: Any) -> None:
+        """Add every file of a project role and of its dependencies."""
+        if not isinstance(name, str) or "{{" in name:
+            self.complete = False
+            return
+        if name in self.roles:
+            return
+        self.roles.add(name)
+        role_dir = c.PROJECT_DIR / "roles" / name
+        if not role_dir.is_dir():
+            if "." not in name:
+                # Missing roles fail the check; note them for the hash.
+                self.files.add(role_dir)
+            return
+
+        for dir_path, dir_names, file_names in os.walk(role_dir):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                self.files.add(Path(dir_path) / file_name)
+        for section in ("tasks", "handlers"):
+            for task_file in sorted((role_dir / section).glob("*.y*ml")):
+                self.add_tasks(load_yaml(task_file), task_file.parent)
+        meta = load_yaml(role_dir / "meta" / "main.yml")
+        if isinstance(meta, dict):
+            for dependency in meta.get("dependencies") or []:
+                self.add_role(
+                    dependency.get("role") or dependency.get("name")
+                    if isinstance(dependency, dict)
+                    else dependency
+                )
+
+    def add_yaml(self, path: Path) -> Any:
+        """Add a YAML file and return its content."""
+        self.files.add(path)
+        return load_yaml(path)
+
+
+def load_yaml(path: Path) -> Any:
+    """Load a YAML file, or None if it is missing or not plain YAML."""
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    try:
+        with path.open(encoding="utf-8") as yaml_file:
+            return yaml.safe_load(yaml_file)
+    except (OSError, yaml.YAMLError):
+        return None
+
+
+def list_project_files() -> List[Path]:
+    """Every file under the project directory."""
+    files: List[Path] = []
+    for dir_path, dir_names, file_names in os.walk(c.PROJECT_DIR):
+        dir_names[:] = sorted(name for name in dir_names if name[0] != ".")
+        files.extend(Path(dir_path) / name for name in sorted(file_names))
+    return files
+
+
+def get_playbook_files(playbook_path: Path) -> List[Path]:
+    """The files whose content decides whether a playbook is valid."""
+    playbook_files = PlaybookFiles()
+    playbook_files.add_playbook(playbook_path)
+    if not playbook_files.complete:
+        return list_project_files()
+    return sorted(playbook_files.files)
+
+
+def read_manifest() -> Dict[str, Any]:
+    """Read the project manifest, or start an empty one."""
+    try:
+        with c.PROJECT_MANIFEST_FILE.open(encoding="utf-8") as file_:
+            manifest: Dict[str, Any] = json.load(file_)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "files": {}, "playbooks": {}}
+    return manifest
+
+
+def write_manifest(manifest: Dict[str, Any]) -> None:
+    """Atomically write the project manifest."""
+    c.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        encoding="utf-8",
+        dir=c.CACHE_DIR,
+        prefix=".manifest-",
+        delete=False,
+    ) as temp:
+        json.dump(manifest, temp)
+    os.replace(temp.name, c.PROJECT_MANIFEST_FILE)
+
+
+def hash_playbook(
+    playbook_path: Path, known: FileHashes
+) -> Tuple[str, FileHashes]:
+    """Hash a playbook's files together with the Ansible version.
+
+    Files whose mtime and size match the known hashes are not read.
+    Returns the combined hash and the hashes of the files used.
+    """
+    # pylint: disable=import-outside-toplevel
+    from ansible.release import __version__ as ansible_version
+
+    combined = hashlib.sha256(f"ansible {ansible_version}\n".encode())
+    hashes: FileHashes = {}
+    for path in get_playbook_files(playbook_path):
+        relative_path = os.path.relpath(path, c.PROJECT_DIR)
+        try:
+            stat = path.stat()
+        except OSError:
+            hashes[relative_path] = [None, None, "missing"]
+        else:
+            entry = known.get(relative_path)
+            if entry and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+                file_hash = entry[2]
+            else:
+                file_hash = hash_file(path)
+            hashes[relative_path] = [stat.st_mtime_ns, stat.st_size, file_hash]
+        combined.update(
+            f"{relative_path}:{hashes[relative_path][2]}\n".encode()
+        )
+    return combined.hexdigest(), hashes
+
+
+def run_syntax_check(playbook_path: Path) -> subprocess.CompletedProcess[str]:
+    """Run ansible-playbook --syntax-check on a playbook.
+
+    A one-host inline inventory keeps a large inventory from being parsed;
+    host patterns do not matter to the syntax.
+    """
+    return subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "ansible.cli.playbook",
+            "--syntax-check",
+            "-i",
+            "localhost,",
+            str(playbook_path),
+        ],
+        cwd=playbook_path.parent,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def preflight_playbooks(playbook_paths: List[Path]) -> bool:
+    """Syntax check playbooks whose files changed since they last passed.
+
+    The project manifest records, per playbook, its files, their hashes
+    and the combined hash of the last passing check. File hashes are
+    rebuilt on every call, so files no playbook uses any more, such as
+    deleted or renamed task files, drop out of the manifest.
+    """
+    manifest = read_manifest()
+    known: FileHashes = manifest["files"]
+    files: FileHashes = {}
+    all_ok = True
+    for playbook_path in playbook_paths:
+        name = os.path.relpath(playbook_path, c.PROJECT_DIR)
+        combined, hashes = hash_playbook(playbook_path, known)
+        files.update(hashes)
+        record = manifest["playbooks"].setdefault(name, {})
+        record["files"] = sorted(hashes)
+        record["hash"] = combined
+        if record.get("checked_hash") == combined:
+            continue
+
+        started = time.monotonic()
+        result = run_syntax_check(playbook_path)
+        if result.returncode == 0:
+            record["checked_hash"] = combined
+            record["checked_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            continue
+
+        all_ok = False
+        click.echo(
+            f"Syntax check of {name} failed in "
+            f"{time.monotonic() - started:.1f}s:",
+            err=True,
+        )
+        click.echo((result.stderr or result.stdout).strip(), err=True)
+
+    # Keep the hashes of playbooks not checked this time, while they exist.
+    manifest["playbooks"] = {
+        name: record
+        for name, record in manifest["playbooks"].items()
+        if (c.PROJECT_DIR / name).is_file()
+    }
+    for record in manifest["playbooks"].values():
+        for relative_path in record.get("files", []):
+            if relative_path not in files and relative_path in known:
+                files[relative_path] = known[relative_path]
+    manifest["files"] = files
+    write_manifest(manifest)
+    return all_ok
@@ -0,0 +1,244 @@
+"""Ansible-Runner Kit OpenMetrics exporter."""
+
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from src.index import get_shard_group, open_index, update_index
+from src.retention import FINISHED_STATUSES
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Recap counters exported per host; the rest of the recap is left out.
+HOST_FIELDS = ("ok", "changed", "failed", "unreachable")
+
+PLAYBOOK_METRICS = (
+    (
+        "ark_playbook_last_run_timestamp_seconds",
+        "Time the last finished run of the playbook ended.",
+    ),
+    (
+        "ark_playbook_last_run_duration_seconds",
+        "Duration of the last finished run of the playbook.",
+    ),
+    (
+        "ark_playbook_last_run_exit_code",
+        "ansible-runner return code of the last finished run.",
+    ),
+    (
+        "ark_playbook_last_run_success",
+        "1 if the last finished run of the playbook was successful.",
+    ),
+)
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LastRun(NamedTuple):
+    """The newest finished run of a playbook, over all of its shards."""
+
+    playbook: str
+    paths: List[str]
+    mtime_ns: int
+    duration: Optional[float]
+    rc: Optional[int]
+    status: Optional[str]
+
+
+def query_last_runs(conn: sqlite3.Connection) -> List[LastRun]:
+    """The newest finished run of each playbook, by playbook name.
+
+    A sharded run has one artifact per shard; the shards are combined,
+    so the run is only successful when every shard was.
+    """
+    statuses = sorted(FINISHED_STATUSES)
+    placeholders = ", ".join("?" * len(statuses))
+    newest = conn.execute(
+        f"""
+        SELECT playbook, ident, path, MAX(mtime_ns), duration, rc, status
+        FROM artifacts
+        WHERE playbook IS NOT NULL AND status IN ({placeholders})
+        GROUP BY playbook
+        ORDER BY playbook
+        """,
+        statuses,
+    ).fetchall()
+
+    last_runs = []
+    for playbook, ident, path, mtime_ns, duration, rc, status in newest:
+        group = get_shard_group(ident)
+        if group is None:
+            last_runs.append(
+                LastRun(playbook, [path], mtime_ns, duration, rc, status)
+            )
+            continue
+        shards = conn.execute(
+            "SELECT path, mtime_ns, duration, rc, status FROM artifacts "
+            "WHERE playbook = ? AND substr(ident, 1, ?) = ?",
+            (playbook, len(group), group),
+        ).fetchall()
+        durations = [row[2] for row in shards if row[2] is not None]
+        return_codes = [row[3] for row in shards if row[3] is not None]
+        last_runs.append(
+            LastRun(
+                playbook,
+                [row[0] for row in shards],
+                max(row[1] for row in shards),
+                max(durations) if durations else None,
+                (
+                    next((rc for rc in return_codes if rc), return_codes[0])
+                    if return_codes
+                    else None
+                ),
+                next(
+                    (row[4] for row in shards if row[4] != "successful"),
+                    "successful",
+                ),
+            )
+        )
+    return last_runs
+
+
+def render_metrics(conn: sqlite3.Connection) -> str:
+    """Render the last run of every playbook and its host recaps.
+
+    Only the newest run per playbook is read from the index, so the cost
+    follows the number of playbooks and hosts, not the run history.
+    """
+    last_runs = query_last_runs(conn)
+    playbook_values: Dict[str, List[str]] = {
+        name: [] for name, _ in PLAYBOOK_METRICS
+    }
+    host_values: Dict[str, List[str]] = {field: [] for field in HOST_FIELDS}
+    sums = ", ".join(f"SUM({field})" for field in HOST_FIELDS)
+    for run in last_runs:
+        labels = f'playbook="{escape_label(run.playbook)}"'
+        samples = (
+            run.mtime_ns / 1e9,
+            run.duration,
+            run.rc,
+            int(run.status == "successful"),
+        )
+        for (name, _), value in zip(PLAYBOOK_METRICS, samples):
+            if value is not None:
+                playbook_values[name].append(f"{name}{{{labels}}} {value}")
+
+        for host, *counters in conn.execute(
+            f"SELECT host, {sums} FROM host_stats "
+            f"WHERE path IN ({', '.join('?' * len(run.paths))}) "
+            "GROUP BY host ORDER BY host",
+            run.paths,
+        ):
+            host_labels = f'{labels},host="{escape_label(host)}"'
+            for field, value in zip(HOST_FIELDS, counters):
+                host_values[field].append(
+                    f"ark_host_{field}{{{host_labels}}} {value}"
+                )
+
+    lines = []
+    for name, help_text in PLAYBOOK_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(playbook_values[name])
+    for field in HOST_FIELDS:
+        name = f"ark_host_{field}"
+        lines.append(
+            f"# HELP {name} {field.capitalize()} tasks per host in the last "
+            "finished run of the playbook."
+        )
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(host_values[field])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsCollector:
+    """Keep the artifact index open and render metrics when it changes.
+
+    Each collection indexes only new or changed artifacts; the metrics
+    text is rendered again only when that changed the index.
+    """
+
+    def __init__(self, artifacts_dir: str, archive_dir: str) -> None:
+        self.artifacts_dir = artifacts_dir
+        self.archive_dir = archive_dir
+        self.conn = open_index(artifacts_dir)
+        self.changes = -1
+        self.text = ""
+
+    def collect(self) -> str:
+        """Update the index and return the current metrics."""
+        update_index(self.conn, self.artifacts_dir, self.archive_dir)
+        if self.conn.total_changes != self.changes:
+            self.text = render_metrics(self.conn)
+            self.changes = self.conn.total_changes
+        return self.text
+
+    def close(self) -> None:
+        """Close the artifact index."""
+        self.conn.close()
+
+
+def write_textfile(
+    artifacts_dir: str, archive_dir: str, textfile: Path
+) -> None:
+    """Write the metrics for the Prometheus node exporter textfile collector.
+
+    The file is replaced atomically so the collector never reads half of it.
+    """
+    with closing(MetricsCollector(artifacts_dir, archive_dir)) as collector:
+        text = collector.collect()
+    textfile.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        encoding="utf-8",
+        dir=textfile.parent,
+        prefix=f".{textfile.name}.",
+        delete=False,
+    ) as temp:
+        temp.write(text)
+    os.chmod(temp.name, 0o644)
+    os.replace(temp.name, textfile)
+
+
+def serve_metrics(
+    artifacts_dir: str, archive_dir: str, address: str, port: int
+) -> None:
+    """Serve /metrics over HTTP until interrupted."""
+    # Only the server needs http.server; keep it out of ark's startup.
+    # pylint: disable=import-outside-toplevel
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    collector = MetricsCollector(artifacts_dir, archive_dir)
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Answer scrapes of /metrics."""
+
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            """Send the metrics, or 404 for any other path."""
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = collector.collect().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            # pylint: disable=redefined-builtin
+            """Keep scrapes out of the terminal."""
+
+    with closing(collector), HTTPServer(
+        (address, port), MetricsHandler
+    ) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,277 @@
+"""Ansible-Runner Kit run profiling from job events."""
+
+import json
+import os
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from src.utils import is_packed_artifact
+
+RESULT_EVENTS = {
+    "runner_on_ok",
+    "runner_on_failed",
+    "runner_on_skipped",
+    "runner_on_unreachable",
+    "runner_on_async_failed",
+}
+
+NO_ROLE = "(no role)"
+
+
+class TaskTiming:
+    """Timing of one task across every host it ran on."""
+
+    def __init__(self, play: str, name: str, role: str) -> None:
+        self.play = play
+        self.name = name
+        self.role = role
+        self.hosts = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_host = ""
+
+    def add(self, host: str, duration: float) -> None:
+        """Record one host's result for the task."""
+        self.hosts += 1
+        self.total += duration
+        if duration >= self.slowest:
+            self.slowest = duration
+            self.slowest_host = host
+
+
+class PlayTiming:
+    """Timing of one play: wall time, task maxima and host chains."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start: Optional[datetime] = None
+        self.end: Optional[datetime] = None
+        self.tasks: Dict[str, None] = {}
+        self.host_totals: Dict[str, float] = {}
+
+    def add(
+        self,
+        task_uuid: str,
+        host: str,
+        duration: float,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> None:
+        """Record one host's task result in the play."""
+        self.tasks.setdefault(task_uuid)
+        self.host_totals[host] = self.host_totals.get(host, 0.0) + duration
+        if start and (self.start is None or start < self.start):
+            self.start = start
+        if end and (self.end is None or end > self.end):
+            self.end = end
+
+    @property
+    def wall(self) -> float:
+        """Seconds from the first task start to the last task end."""
+        if self.start is None or self.end is None:
+            return 0.0
+        return (self.end - self.start).total_seconds()
+
+
+class RunProfile:
+    """Per-task, per-host, per-role and per-play timings of a run."""
+
+    def __init__(self) -> None:
+        self.tasks: Dict[str, TaskTiming] = {}
+        self.hosts: Dict[str, float] = {}
+        self.roles: Dict[str, float] = {}
+        self.plays: Dict[str, PlayTiming] = {}
+        self.events = 0
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """Fold one job event into the profile."""
+        if event.get("event") not in RESULT_EVENTS:
+            return
+        event_data = event.get("event_data", {})
+        duration = float(event_data.get("duration") or 0.0)
+        host = str(event_data.get("host", ""))
+        role = str(event_data.get("role") or NO_ROLE)
+        task_uuid = str(event_data.get("task_uuid", ""))
+        play_uuid = str(event_data.get("play_uuid", ""))
+        play_name = str(event_data.get("play", ""))
+
+        self.events += 1
+        task = self.tasks.get(task_uuid)
+        if task is None:
+            task = self.tasks[task_uuid] = TaskTiming(
+                play_name, str(event_data.get("task", "")), role
+            )
+        task.add(host, duration)
+        self.hosts[host] = self.hosts.get(host, 0.0) + duration
+        self.roles[role] = self.roles.get(role, 0.0) + duration
+
+        play = self.plays.get(play_uuid)
+        if play is None:
+            play = self.plays[play_uuid] = PlayTiming(play_name)
+        play.add(
+            task_uuid,
+            host,
+            duration,
+            parse_time(event_data.get("start")),
+            parse_time(event_data.get("end")),
+        )
+
+    def critical_path(self, play: PlayTiming) -> float:
+        """Sum of the slowest host per task: the linear-strategy bound."""
+        return sum(self.tasks[task_uuid].slowest for task_uuid in play.tasks)
+
+    def tasks_by_key(self) -> Dict[Tuple[str, str], TaskTiming]:
+        """Tasks keyed by (play, task name), to match them across runs."""
+        return {(task.play, task.name): task for task in self.tasks.values()}
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp from a job event."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def iter_job_events(job_events_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Stream the result events of an artifact, one file at a time.
+
+    Only files mentioning a duration are decoded; task starts and other
+    bookkeeping events are skipped without JSON parsing.
+    """
+    with os.scandir(job_events_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json") or entry.name.endswith(
+                "-partial.json"
+            ):
+                continue
+            with open(entry.path, "rb") as event_file:
+                raw = event_file.read()
+            if b'"duration"' in raw:
+                yield json.loads(raw)
+
+
+def iter_packed_job_events(archive_path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream the result events of a packed artifact, one member at a time.
+
+    Job event members are decompressed one by one; the rest of the archive
+    is never read.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        for name in archive.namelist():
+            if (
+                not name.startswith("job_events/")
+                or not name.endswith(".json")
+                or name.endswith("-partial.json")
+            ):
+                continue
+            raw = archive.read(name)
+            if b'"duration"' in raw:
+                yield json.loads(raw)
+
+
+def build_profile(artifact_path: Path) -> RunProfile:
+    """Build the run profile of an artifact folder or archive."""
+    if is_packed_artifact(artifact_path):
+        events = iter_packed_job_events(artifact_path)
+    else:
+        job_events_dir = artifact_path / "job_events"
+        if not job_events_dir.is_dir():
+            raise click.ClickException(
+                f"{artifact_path} has no job_events to profile."
+            )
+        events = iter_job_events(job_events_dir)
+
+    profile = RunProfile()
+    for event in events:
+        profile.add_event(event)
+    if not profile.events and is_packed_artifact(artifact_path):
+        raise click.ClickException(
+            f"{artifact_path} has no job_events to profile."
+        )
+    return profile
+
+
+def top(items: Dict[Any, float], count: int) -> List[Tuple[Any, float]]:
+    """The count largest items of a mapping, largest first."""
+    return sorted(items.items(), key=lambda item: item[1], reverse=True)[
+        :count
+    ]
+
+
+def display_profile(
+    artifact_path: Path, profile: RunProfile, count: int
+) -> None:
+    """Display the slowest tasks, hosts, roles and play critical paths."""
+    click.echo(f"Profile for {artifact_path}:")
+    click.echo(
+        f"{profile.events} results, {len(profile.tasks)} tasks, "
+        f"{len(profile.hosts)} hosts"
+    )
+
+    click.echo("\nSlowest tasks (slowest host / total across hosts):")
+    slowest_tasks = top(
+        {task_uuid: task.slowest for task_uuid, task in profile.tasks.items()},
+        count,
+    )
+    for task_uuid, _ in slowest_tasks:
+        task = profile.tasks[task_uuid]
+        click.echo(
+            f"  {task.slowest:9.2f}s {task.total:10.2f}s  "
+            f"{task.play} | {task.name} ({task.slowest_host})"
+        )
+
+    click.echo("\nSlowest hosts (total task time):")
+    for host, seconds in top(profile.hosts, count):
+        click.echo(f"  {seconds:9.2f}s  {host}")
+
+    click.echo("\nRole totals (task time across hosts):")
+    for role, seconds in top(profile.roles, len(profile.roles)):
+        click.echo(f"  {seconds:9.2f}s  {role}")
+
+    click.echo("\nPlays (wall / critical path / slowest host chain):")
+    for play in profile.plays.values():
+        slowest_host, chain = top(play.host_totals, 1)[0]
+        click.echo(
+            f"  {play.wall:9.2f}s {profile.critical_path(play):9.2f}s "
+            f"{chain:9.2f}s  {play.name} ({slowest_host})"
+        )
+    click.echo("")
+
+
+def display_profile_comparison(
+    base_path: Path,
+    base: RunProfile,
+    other_path: Path,
+    other: RunProfile,
+    count: int,
+) -> None:
+    """Display the tasks and plays whose timing changed the most."""
+    click.echo(f"Comparing {other_path} against {base_path}:")
+
+    base_tasks = base.tasks_by_key()
+    other_tasks = other.tasks_by_key()
+    changes: List[Tuple[float, float, Tuple[str, str]]] = []
+    for key in base_tasks.keys() | other_tasks.keys():
+        before = base_tasks[key].slowest if key in base_tasks else 0.0
+        after = other_tasks[key].slowest if key in other_tasks else 0.0
+        changes.append((before, after, key))
+    changes.sort(key=lambda change: abs(change[1] - change[0]), reverse=True)
+
+    click.echo("\nLargest task changes (slowest host, before -> after):")
+    for before, after, (play_name, task_name) in changes[:count]:
+        click.echo(
+            f"  {after - before:+9.2f}s  {before:9.2f}s -> {after:9.2f}s  "
+            f"{play_name} | {task_name}"
+        )
+
+    click.echo("\nPlays (wall, before -> after):")
+    base_plays = {play.name: play for play in base.plays.values()}
+    for play in other.plays.values():
+        before = base_plays[play.name].wall if play.name in base_plays else 0
+        click.echo(
+            f"  {play.wall - before:+9.2f}s  {before:9.2f}s -> "
+            f"{play.wall:9.2f}s  {play.name}"
+        )
+    click.echo("")
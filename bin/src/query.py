@@ -0,0 +1,226 @@
+"""Ansible-Runner Kit Inventory Queries."""
+
+import fnmatch
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+import click
+
+from src.inventory import InventorySnapshot
+
+# Same separators and subscripts as Ansible host patterns.
+PATTERN_SEPARATOR = re.compile(
+    r"""(?:
+        [^\s:\[\]]      # anything other than whitespace or ':[]'
+        |
+        \[[^\]]*\]      # or a single complete bracketed expression
+    )+""",
+    re.X,
+)
+PATTERN_WITH_SUBSCRIPT = re.compile(
+    r"""^
+        (.+)            # a pattern expression ending with
+        \[(?:
+            (-?[0-9]+)| # a single positive or negative index
+            ([0-9]+):   # or an x:y or x: range
+            ([0-9]*)
+        )\]
+        $""",
+    re.X,
+)
+GLOB_CHARACTERS = (".", "?", "*", "[")
+
+Subscript = Tuple[int, Optional[int]]
+
+
+def split_pattern(pattern: str) -> List[str]:
+    """Split a host pattern on commas, or on colons without commas."""
+    if "," in pattern:
+        terms = pattern.split(",")
+    else:
+        terms = PATTERN_SEPARATOR.findall(pattern)
+    return [term.strip() for term in terms if term.strip()]
+
+
+def order_terms(terms: List[str]) -> List[str]:
+    """Apply unions first, then intersections, then exclusions."""
+    unions = [term for term in terms if term[0] not in "&!"]
+    intersections = [term for term in terms if term[0] == "&"]
+    exclusions = [term for term in terms if term[0] == "!"]
+    return (unions or ["all"]) + intersections + exclusions
+
+
+def split_subscript(term: str) -> Tuple[str, Optional[Subscript]]:
+    """Split a 'web[0]' or 'web[1:3]' term into its pattern and range."""
+    if term[0] == "~":
+        return term, None
+    match = PATTERN_WITH_SUBSCRIPT.match(term)
+    if not match:
+        return term, None
+    expression, index, start, end = match.groups()
+    if index:
+        return expression, (int(index), None)
+    return expression, (int(start), int(end) if end else -1)
+
+
+def compile_term(term: str) -> Pattern[str]:
+    """Compile a '~regex' or shell glob term."""
+    try:
+        if term[0] == "~":
+            return re.compile(term[1:])
+        return re.compile(fnmatch.translate(term))
+    except re.error as error:
+        raise click.BadParameter(
+            f"Invalid host pattern {term}: {error}"
+        ) from error
+
+
+class InventoryIndex:
+    """Host and group lookups over an inventory snapshot.
+
+    Patterns follow Ansible's rules: 'a,b' or 'a:b' is a union, '&a' an
+    intersection and '!a' an exclusion; terms may be group or host names,
+    shell globs, '~' regular expressions, and take [i] or [i:j] subscripts.
+    """
+
+    def __init__(self, snapshot: InventorySnapshot) -> None:
+        self.host_groups = snapshot["hosts"]
+        self.group_hosts = snapshot["groups"]
+        self.term_cache: Dict[str, List[str]] = {}
+
+    def match_term(self, term: str) -> List[str]:
+        """Hosts matched by one term, ignoring any & or ! prefix."""
+        term = term.lstrip("&!")
+        if not term:
+            return []
+        if term in self.term_cache:
+            return self.term_cache[term]
+
+        expression, subscript = split_subscript(term)
+        hosts = self.enumerate(expression)
+        if subscript and hosts:
+            start, end = subscript
+            try:
+                if end is None:
+                    hosts = [hosts[start]]
+                elif end == -1:
+                    hosts = hosts[start:]
+                else:
+                    hosts = hosts[start : end + 1]
+            except IndexError:
+                raise click.BadParameter(
+                    f"No hosts matched the subscripted pattern '{term}'"
+                ) from None
+        self.term_cache[term] = hosts
+        return hosts
+
+    def enumerate(self, expression: str) -> List[str]:
+        """Hosts of the groups matching an expression, then hosts matching."""
+        if expression in self.group_hosts:
+            matching_groups = [expression]
+        elif expression[0] == "~" or any(
+            char in expression for char in GLOB_CHARACTERS
+        ):
+            compiled = compile_term(expression)
+            matching_groups = [
+                group for group in self.group_hosts if compiled.match(group)
+            ]
+        else:
+            matching_groups = []
+
+        results: List[str] = []
+        for group in matching_groups:
+            results.extend(self.group_hosts[group])
+
+        if not matching_groups and expression in self.host_groups:
+            results.append(expression)
+        elif expression[0] == "~" or any(
+            char in expression for char in GLOB_CHARACTERS
+        ):
+            compiled = compile_term(expression)
+            results.extend(
+                host for host in self.host_groups if compiled.match(host)
+            )
+        return list(dict.fromkeys(results))
+
+    def resolve(self, pattern: str) -> List[str]:
+        """Hosts matching a full pattern, in inventory order."""
+        hosts: List[str] = []
+        selected: Set[str] = set()
+        for term in order_terms(split_pattern(pattern)):
+            if term[0] == "!":
+                excluded = set(self.match_term(term))
+                hosts = [host for host in hosts if host not in excluded]
+                selected -= excluded
+            elif term[0] == "&":
+                kept = set(self.match_term(term))
+                hosts = [host for host in hosts if host in kept]
+                selected &= kept
+            else:
+                for host in self.match_term(term):
+                    if host not in selected:
+                        selected.add(host)
+                        hosts.append(host)
+        return hosts
+
+
+def read_host_list(lines: Iterable[str]) -> List[str]:
+    """Read host names, one per line, ignoring blanks and comments."""
+    hosts = (line.strip() for line in lines)
+    return list(
+        dict.fromkeys(host for host in hosts if host and host[0] != "#")
+    )
+
+
+def query_inventory(
+    index: InventoryIndex,
+    pattern: str,
+    candidates: Optional[List[str]] = None,
+) -> Tuple[List[str], List[str]]:
+    """Match a pattern, optionally restricted to candidate hosts.
+
+    Returns the matching hosts and the candidates missing from the
+    inventory. Candidate order is kept when candidates are given.
+    """
+    matched = index.resolve(pattern)
+    if candidates is None:
+        return matched, []
+
+    matched_set = set(matched)
+    hosts = [host for host in candidates if host in matched_set]
+    unknown = [host for host in candidates if host not in index.host_groups]
+    return hosts, unknown
+
+
+def display_query_result(
+    index: InventoryIndex,
+    hosts: List[str],
+    unknown: List[str],
+    output_format: str,
+    with_groups: bool,
+) -> None:
+    """Display matched hosts, or their groups, as text or JSON."""
+    if output_format == "json":
+        result: Dict[str, object] = {
+            "count": len(hosts),
+            "hosts": (
+                {host: index.host_groups[host] for host in hosts}
+                if with_groups
+                else hosts
+            ),
+        }
+        if unknown:
+            result["unknown"] = unknown
+        click.echo(json.dumps(result, indent=2))
+        return
+
+    lines = (
+        [f"{host}: {', '.join(index.host_groups[host])}" for host in hosts]
+        if with_groups
+        else hosts
+    )
+    if lines:
+        click.echo("\n".join(lines))
+    for host in unknown:
+        click.echo(f"Host '{host}' not found in the inventory.", err=True)
@@ -0,0 +1,160 @@
+"""Ansible-Runner Kit reruns of failed hosts."""
+
+import json
+import zipfile
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import click
+
+from src import constants as c
+from src.index import (
+    ArtifactRecord,
+    get_shard_group,
+    open_index,
+    query_artifacts,
+    update_index,
+)
+from src.utils import HostStats, is_packed_artifact
+
+# Recap counters that make a host worth retrying.
+RERUN_FIELDS = ("failed", "unreachable")
+
+# Written by ARK into each artifact, since ansible-runner passes extra
+# variables through env/extravars, which every run overwrites.
+RUN_EXTRA_VARS_FILE = "extravars.json"
+
+
+def find_last_run(playbook_name: str) -> List[ArtifactRecord]:
+    """Find the artifacts of the newest indexed run of a playbook.
+
+    A sharded run has one artifact per shard, all returned, newest first.
+    """
+    artifacts_dir = str(c.ARTIFACTS_DIR)
+    if not c.ARTIFACTS_DIR.is_dir():
+        return []
+    with closing(open_index(artifacts_dir)) as index:
+        update_index(index, artifacts_dir, str(c.ARCHIVE_DIR))
+        record = next(
+            query_artifacts(index, artifacts_dir, 1, playbook_name), None
+        )
+        if record is None:
+            return []
+        group = get_shard_group(record["ident"])
+        if group is None:
+            return [record]
+        return list(
+            query_artifacts(
+                index,
+                artifacts_dir,
+                playbook=playbook_name,
+                ident_prefix=group,
+            )
+        )
+
+
+def get_failed_hosts(recaps: List[HostStats]) -> List[str]:
+    """Hosts with failed or unreachable tasks in any recap, in order."""
+    hosts: Dict[str, None] = {}
+    for host_stats in recaps:
+        for host, stats in host_stats.items():
+            if any(stats.get(field, 0) > 0 for field in RERUN_FIELDS):
+                hosts.setdefault(host)
+    return list(hosts)
+
+
+def write_run_extra_vars(
+    artifact_path: Path, extra_vars: Dict[str, Any]
+) -> None:
+    """Record the extra variables of a run in its artifact folder."""
+    (artifact_path / RUN_EXTRA_VARS_FILE).write_text(
+        json.dumps(extra_vars), encoding="utf-8"
+    )
+
+
+def read_run_extra_vars(artifact_path: Path) -> Dict[str, Any]:
+    """Read the extra variables passed to an earlier run.
+
+    Runs started by ARK record them in the artifact. For other runs, the
+    inline JSON '-e' arguments of the command file are used; '-e @file'
+    arguments point at files shared by every run and are left out.
+    """
+    if is_packed_artifact(artifact_path):
+        with zipfile.ZipFile(artifact_path) as archive:
+            if RUN_EXTRA_VARS_FILE in archive.namelist():
+                recorded = json.loads(archive.read(RUN_EXTRA_VARS_FILE))
+                return dict(recorded)
+            command = json.loads(archive.read("command"))["command"]
+    elif (artifact_path / RUN_EXTRA_VARS_FILE).is_file():
+        with (artifact_path / RUN_EXTRA_VARS_FILE).open(
+            encoding="utf-8"
+        ) as file_:
+            return dict(json.load(file_))
+    else:
+        with (artifact_path / "command").open(encoding="utf-8") as file_:
+            command = json.load(file_)["command"]
+
+    extra_vars: Dict[str, Any] = {}
+    for flag, value in zip(command, command[1:]):
+        if flag not in ("-e", "--extra-vars") or value.startswith("@"):
+            continue
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            extra_vars.update(parsed)
+    return extra_vars
+
+
+def write_rerun_limit(playbook_name: str, hosts: List[str]) -> str:
+    """Write the hosts to retry to a limit file and return the limit.
+
+    A file keeps the command line short however many hosts failed, and
+    is left in place as a record of the last retry.
+    """
+    limit_file = c.CACHE_DIR / "rerun" / f"{playbook_name}.limit"
+    limit_file.parent.mkdir(parents=True, exist_ok=True)
+    limit_file.write_text("\n".join(hosts) + "\n", encoding="utf-8")
+    return f"@{limit_file}"
+
+
+def prepare_rerun(
+    playbook_name: str, same_extra_vars: bool, err: bool = False
+) -> Tuple[List[str], Dict[str, Any]]:
+    """Find the failed hosts, and optionally extra vars, of the last run.
+
+    The recaps of every shard of a sharded run are merged.
+    """
+    records = find_last_run(playbook_name)
+    if not records:
+        raise click.ClickException(
+            f"No earlier run of {playbook_name} found in {c.ARTIFACTS_DIR}."
+        )
+
+    last_run = f"{records[0]['ident']}, {records[0]['timestamp']}"
+    if len(records) > 1:
+        last_run = f"{len(records)} shards, newest {last_run}"
+    hosts = get_failed_hosts(
+        [host_stats for record in records for host_stats in record["recaps"]]
+    )
+    if not hosts:
+        click.echo(
+            f"No failed or unreachable hosts in the last {playbook_name} "
+            f"run ({last_run}).",
+            err=err,
+        )
+        return [], {}
+
+    click.echo(
+        f"Rerunning {playbook_name} on {len(hosts)} failed or unreachable "
+        f"hosts from the last run ({last_run}).",
+        err=err,
+    )
+    extra_vars = (
+        read_run_extra_vars(Path(records[0]["path"]))
+        if same_extra_vars
+        else {}
+    )
+    return hosts, extra_vars
@@ -0,0 +1,346 @@
+"""Asynchronous DNS resolution against specific name servers."""
+
+import asyncio
+import ipaddress
+import random
+import struct
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+DNS_PORT = 53
+RESOLV_CONF = "/etc/resolv.conf"
+
+QTYPE_A = 1
+QTYPE_PTR = 12
+QTYPE_AAAA = 28
+QCLASS_IN = 1
+
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+FLAG_TRUNCATED = 0x0200
+FLAG_RECURSION_DESIRED = 0x0100
+
+
+class DnsAnswer(NamedTuple):
+    """The parts of a DNS response used to judge resolution."""
+
+    rcode: int
+    truncated: bool
+    answers: int
+    ttl: Optional[int]
+
+
+class RateLimiter:
+    """Space out queries to a single server to at most rate per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait until the next query slot is free."""
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class QueryThrottle:
+    """Bound the queries in flight and the queries per second per server.
+
+    Each query, including TCP retries, waits for its server's rate slot
+    before taking a concurrency slot, so a throttled server never holds
+    slots the other servers could use.
+    """
+
+    def __init__(self, concurrency: int, rate: float) -> None:
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.rate = rate
+        self.limiters: Dict[str, RateLimiter] = {}
+
+    async def send(
+        self, server: str, exchange: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Run one query exchange with a server within the limits."""
+        limiter = self.limiters.setdefault(server, RateLimiter(self.rate))
+        await limiter.wait()
+        async with self.semaphore:
+            return await exchange()
+
+
+class _UdpQuery(asyncio.DatagramProtocol):
+    """Datagram protocol resolving a future with the matching response."""
+
+    def __init__(self, query_id: int, future: "asyncio.Future[bytes]") -> None:
+        self.query_id = query_id
+        self.future = future
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if (
+            len(data) >= 2
+            and struct.unpack("!H", data[:2])[0] == self.query_id
+        ):
+            if not self.future.done():
+                self.future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+def parse_server(server: str) -> Tuple[str, int]:
+    """Split a 'host', 'host:port' or '[v6]:port' server into its parts."""
+    server = server.strip()
+    if server.startswith("["):
+        address, _, port = server[1:].partition("]")
+        return address, int(port.lstrip(":") or DNS_PORT)
+    if server.count(":") == 1:
+        address, port = server.split(":")
+        return address, int(port)
+    return server, DNS_PORT
+
+
+def read_search_domains(resolv_conf: str = RESOLV_CONF) -> List[str]:
+    """Read the search domains from resolv.conf, as nslookup does."""
+    domains: List[str] = []
+    try:
+        with open(resolv_conf, encoding="utf-8") as conf_file:
+            for line in conf_file:
+                fields = line.split()
+                if fields and fields[0] in ("search", "domain"):
+                    domains = fields[1:]
+    except OSError:
+        pass
+    return domains
+
+
+def candidate_names(host: str, search_domains: Sequence[str]) -> List[str]:
+    """List the names to try for a host, applying the search list."""
+    if "." in host.rstrip(".") or host.endswith("."):
+        return [host]
+    return [f"{host}.{domain}" for domain in search_domains] + [host]
+
+
+def build_query(name: str, qtype: int, query_id: int) -> bytes:
+    """Build a recursive DNS query packet."""
+    header = struct.pack(
+        "!HHHHHH", query_id, FLAG_RECURSION_DESIRED, 1, 0, 0, 0
+    )
+    question = b"".join(
+        bytes([len(label)]) + label
+        for label in name.rstrip(".").encode("idna").split(b".")
+        if label
+    )
+    return header + question + b"\x00" + struct.pack("!HH", qtype, QCLASS_IN)
+
+
+def skip_name(data: bytes, offset: int) -> int:
+    """Return the offset just past an encoded, possibly compressed, name."""
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += 1
+        if length == 0:
+            return offset
+        offset += length
+
+
+def parse_response(data: bytes) -> DnsAnswer:
+    """Parse the rcode, truncation flag and answer TTLs of a response."""
+    _, flags, questions, answers, _, _ = struct.unpack("!HHHHHH", data[:12])
+    offset = 12
+    for _ in range(questions):
+        offset = skip_name(data, offset) + 4
+
+    ttl: Optional[int] = None
+    for _ in range(answers):
+        offset = skip_name(data, offset)
+        _, _, record_ttl, length = struct.unpack(
+            "!HHIH", data[offset : offset + 10]
+        )
+        ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+        offset += 10 + length
+
+    return DnsAnswer(
+        rcode=flags & 0x000F,
+        truncated=bool(flags & FLAG_TRUNCATED),
+        answers=answers,
+        ttl=ttl,
+    )
+
+
+async def query_udp(
+    address: str, port: int, packet: bytes, timeout: float
+) -> bytes:
+    """Send a query over UDP and wait for the matching response."""
+    loop = asyncio.get_running_loop()
+    future: "asyncio.Future[bytes]" = loop.create_future()
+    query_id = struct.unpack("!H", packet[:2])[0]
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _UdpQuery(query_id, future), remote_addr=(address, port)
+    )
+    try:
+        transport.sendto(packet)
+        return await asyncio.wait_for(future, timeout)
+    finally:
+        transport.close()
+
+
+async def query_tcp(
+    address: str, port: int, packet: bytes, timeout: float
+) -> bytes:
+    """Send a query over TCP, used when the UDP answer was truncated."""
+
+    async def exchange() -> bytes:
+        reader, writer = await asyncio.open_connection(address, port)
+        try:
+            writer.write(struct.pack("!H", len(packet)) + packet)
+            await writer.drain()
+            (length,) = struct.unpack("!H", await reader.readexactly(2))
+            return await reader.readexactly(length)
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def query(
+    server: str,
+    name: str,
+    qtype: int,
+    timeout: float,
+    throttle: Optional[QueryThrottle] = None,
+) -> DnsAnswer:
+    """Query a server for a name, retrying over TCP when truncated."""
+    address, port = parse_server(server)
+    packet = build_query(name, qtype, random.randint(0, 0xFFFF))
+    throttle = throttle or QueryThrottle(1, 0)
+    answer = parse_response(
+        await throttle.send(
+            server, lambda: query_udp(address, port, packet, timeout)
+        )
+    )
+    if answer.truncated:
+        answer = parse_response(
+            await throttle.send(
+                server, lambda: query_tcp(address, port, packet, timeout)
+            )
+        )
+    return answer
+
+
+async def resolve(
+    host: str,
+    server: str,
+    timeout: float,
+    search_domains: Sequence[str] = (),
+    throttle: Optional[QueryThrottle] = None,
+) -> Optional[DnsAnswer]:
+    """Resolve a host on one server; return the answer or None if missing.
+
+    Like nslookup, IP addresses are looked up as PTR records and names try
+    A before AAAA.
+    """
+    try:
+        reverse_name = ipaddress.ip_address(host).reverse_pointer
+    except ValueError:
+        lookups = [
+            (name, qtype)
+            for name in candidate_names(host, search_domains)
+            for qtype in (QTYPE_A, QTYPE_AAAA)
+        ]
+    else:
+        lookups = [(reverse_name, QTYPE_PTR)]
+
+    nonexistent = set()
+    for name, qtype in lookups:
+        if name in nonexistent:
+            continue
+        try:
+            answer = await query(server, name, qtype, timeout, throttle)
+        except (OSError, asyncio.TimeoutError, struct.error, IndexError):
+            return None
+        if answer.rcode == RCODE_NOERROR and answer.answers:
+            return answer
+        if answer.rcode == RCODE_NXDOMAIN:
+            nonexistent.add(name)
+        elif answer.rcode != RCODE_NOERROR:
+            return None
+    return None
+
+
+async def resolve_pairs(
+    pairs: Sequence[Tuple[str, str]],
+    timeout: float,
+    concurrency: int,
+    rate: float,
+) -> List[Optional[DnsAnswer]]:
+    """Resolve (host, server) pairs concurrently, in pair order."""
+    throttle = QueryThrottle(concurrency, rate)
+    search_domains = read_search_domains()
+    return await asyncio.gather(
+        *(
+            resolve(host, server, timeout, search_domains, throttle)
+            for host, server in pairs
+        )
+    )
+
+
+async def find_missing_servers(
+    hosts: Sequence[str],
+    dns_servers: Sequence[str],
+    timeout: float,
+    concurrency: int,
+    rate: float,
+) -> Dict[str, List[str]]:
+    """Check every host against every server concurrently.
+
+    Returns the servers that could not resolve each host, in server order.
+    """
+    pairs = [(host, server) for host in hosts for server in dns_servers]
+    answers = await resolve_pairs(pairs, timeout, concurrency, rate)
+
+    missing: Dict[str, List[str]] = {host: [] for host in hosts}
+    for (host, server), answer in zip(pairs, answers):
+        if answer is None:
+            missing[host].append(server)
+    return missing
+
+
+def check_hosts(
+    hosts: Sequence[str],
+    dns_servers: Sequence[str],
+    timeout: float,
+    concurrency: int = 100,
+    rate: float = 0,
+) -> Dict[str, List[str]]:
+    """Synchronous entry point for find_missing_servers."""
+    return asyncio.run(
+        find_missing_servers(hosts, dns_servers, timeout, concurrency, rate)
+    )
+
+
+def check_pairs(
+    pairs: Sequence[Tuple[str, str]],
+    timeout: float,
+    concurrency: int = 100,
+    rate: float = 0,
+) -> List[Optional[DnsAnswer]]:
+    """Synchronous entry point for resolve_pairs."""
+    return asyncio.run(resolve_pairs(pairs, timeout, concurrency, rate))
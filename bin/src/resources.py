@@ -0,0 +1,296 @@
+"""Ansible-Runner Kit controller resource sampling."""
+
+import csv
+import io
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from src.index import list_artifact_paths
+from src.utils import is_packed_artifact
+
+# Samples are written next to the runner's own files in the artifact.
+RESOURCES_FILE = "resources.csv"
+
+RESOURCE_COLUMNS = (
+    "elapsed_ms",
+    "cpu_percent",
+    "rss_kb",
+    "threads",
+    "fds",
+    "processes",
+)
+
+SAMPLE_INTERVAL: float = 1.0
+
+# Equal time slices shown in the report timeline.
+TIMELINE_BUCKETS = 12
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+Sample = Tuple[int, ...]
+
+# pid -> (cpu ticks, rss pages, threads)
+ProcessStats = Dict[int, Tuple[int, int, int]]
+
+
+def list_child_pids(pid: int) -> Optional[List[int]]:
+    """Children of a process from /proc/<pid>/task/*/children.
+
+    Returns None when the kernel does not provide the children files.
+    """
+    children: List[int] = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return []
+    for task in tasks:
+        try:
+            with open(
+                f"/proc/{pid}/task/{task}/children", encoding="ascii"
+            ) as children_file:
+                children.extend(
+                    int(child) for child in children_file.read().split()
+                )
+        except FileNotFoundError:
+            if not os.path.exists(f"/proc/{pid}/task/{task}"):
+                continue
+            return None
+        except OSError:
+            continue
+    return children
+
+
+def scan_parent_pids() -> Dict[int, List[int]]:
+    """Map every process to its children by reading all of /proc."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        stat = read_stat_fields(int(entry.name))
+        if stat:
+            children.setdefault(int(stat[1]), []).append(int(entry.name))
+    return children
+
+
+def find_descendants(root: int) -> List[int]:
+    """Every process below root, found through the children files."""
+    descendants: List[int] = []
+    pending = [root]
+    while pending:
+        children = list_child_pids(pending.pop())
+        if children is None:
+            return find_descendants_by_scan(root)
+        descendants.extend(children)
+        pending.extend(children)
+    return descendants
+
+
+def find_descendants_by_scan(root: int) -> List[int]:
+    """Every process below root, for kernels without children files."""
+    children = scan_parent_pids()
+    descendants: List[int] = []
+    pending = [root]
+    while pending:
+        found = children.get(pending.pop(), [])
+        descendants.extend(found)
+        pending.extend(found)
+    return descendants
+
+
+def read_stat_fields(pid: int) -> Optional[List[str]]:
+    """The /proc/<pid>/stat fields after the command name.
+
+    Index 0 is the state, 1 the parent pid, 11 and 12 user and system
+    ticks, 17 the thread count and 21 the resident pages.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as stat_file:
+            stat = stat_file.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses.
+    return stat[stat.rfind(b")") + 2 :].decode("ascii").split()
+
+
+def count_fds(pid: int) -> int:
+    """Number of open file descriptors of a process."""
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return 0
+
+
+class ResourceSampler:
+    """Sample the CPU, memory, threads, fds and processes below ARK.
+
+    A daemon thread reads /proc for every process started by this one,
+    which covers ansible-playbook and its forked workers, every
+    SAMPLE_INTERVAL seconds. Sharded runs are sampled as one tree.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: List[Sample] = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample_loop, daemon=True)
+        self.started = 0.0
+        self.last_ticks: Dict[int, int] = {}
+        self.last_time = 0.0
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        self.started = self.last_time = time.monotonic()
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampling thread."""
+        self.stopped.set()
+        self.thread.join()
+
+    def sample_loop(self) -> None:
+        """Take a sample every interval until stopped."""
+        root = os.getpid()
+        while not self.stopped.wait(self.interval):
+            self.samples.append(self.take_sample(root))
+
+    def take_sample(self, root: int) -> Sample:
+        """Sum the resources of the processes below root.
+
+        CPU is the share of one core used since the previous sample, from
+        the ticks of processes seen before plus those of new processes.
+        """
+        now = time.monotonic()
+        stats: ProcessStats = {}
+        fds = 0
+        for pid in find_descendants(root):
+            fields = read_stat_fields(pid)
+            if not fields or fields[0] == "Z":
+                continue
+            stats[pid] = (
+                int(fields[11]) + int(fields[12]),
+                int(fields[21]),
+                int(fields[17]),
+            )
+            fds += count_fds(pid)
+
+        used_ticks = sum(
+            ticks - self.last_ticks.get(pid, 0)
+            for pid, (ticks, _, _) in stats.items()
+        )
+        elapsed = max(now - self.last_time, 1e-6)
+        self.last_ticks = {pid: ticks for pid, (ticks, _, _) in stats.items()}
+        self.last_time = now
+        return (
+            int((now - self.started) * 1000),
+            round(max(used_ticks, 0) / CLOCK_TICKS / elapsed * 100),
+            sum(rss for _, rss, _ in stats.values()) * PAGE_KB,
+            sum(threads for _, _, threads in stats.values()),
+            fds,
+            len(stats),
+        )
+
+    def write(self, artifact_path: Path) -> None:
+        """Write the samples to the artifact folder as CSV."""
+        with (artifact_path / RESOURCES_FILE).open(
+            "w", newline="", encoding="utf-8"
+        ) as resources_file:
+            writer = csv.writer(resources_file)
+            writer.writerow(RESOURCE_COLUMNS)
+            writer.writerows(self.samples)
+
+
+def read_resource_samples(artifact_path: Path) -> Optional[List[Sample]]:
+    """Read the resource samples of an artifact folder or archive."""
+    try:
+        if is_packed_artifact(artifact_path):
+            with zipfile.ZipFile(artifact_path) as archive:
+                text = archive.read(RESOURCES_FILE).decode("utf-8")
+        else:
+            text = (artifact_path / RESOURCES_FILE).read_text(encoding="utf-8")
+    except (OSError, KeyError):
+        return None
+    rows = csv.reader(io.StringIO(text))
+    next(rows, None)
+    return [tuple(int(value) for value in row) for row in rows]
+
+
+def iter_timeline(
+    samples: List[Sample], column: int, scale: int = 1
+) -> Iterator[str]:
+    """Peak of a column in equal time slices, at most TIMELINE_BUCKETS."""
+    count = min(TIMELINE_BUCKETS, len(samples))
+    first = samples[0][0]
+    span = samples[-1][0] - first + 1
+    buckets: List[Optional[int]] = [None] * count
+    for sample in samples:
+        bucket = (sample[0] - first) * count // span
+        buckets[bucket] = max(buckets[bucket] or 0, sample[column])
+    return (
+        "-" if peak is None else str(round(peak / scale)) for peak in buckets
+    )
+
+
+def display_resources(artifact_path: Path, samples: List[Sample]) -> None:
+    """Display peaks, means and a timeline of an artifact's samples."""
+    click.echo(f"Controller resources for {artifact_path}:")
+    if not samples:
+        click.echo("  No samples; the run ended within one interval.\n")
+        return
+
+    click.echo(
+        f"  {len(samples)} samples over {samples[-1][0] / 1000:.0f}s; "
+        f"timeline peaks in {min(TIMELINE_BUCKETS, len(samples))} "
+        "equal slices."
+    )
+    labels = {
+        "cpu_percent": "CPU %",
+        "rss_kb": "RSS MB",
+        "threads": "Threads",
+        "fds": "FDs",
+        "processes": "Processes",
+    }
+    click.echo(f"  {'':<10} {'peak':>8} {'mean':>8}  timeline")
+    for column, name in enumerate(RESOURCE_COLUMNS[1:], start=1):
+        values = [sample[column] for sample in samples]
+        scale = 1024 if name == "rss_kb" else 1
+        timeline = " ".join(iter_timeline(samples, column, scale))
+        click.echo(
+            f"  {labels[name]:<10} {max(values) / scale:>8.0f} "
+            f"{sum(values) / len(values) / scale:>8.1f}  {timeline}"
+        )
+    click.echo("")
+
+
+def display_sampled_runs(
+    conn: sqlite3.Connection,
+    artifacts_dir: str,
+    last: Optional[int],
+    playbook: Optional[str],
+) -> None:
+    """Display the resources of the last sampled runs, newest first."""
+    sampled: Iterator[Tuple[Path, List[Sample]]] = (
+        (artifact_path, samples)
+        for artifact_path in list_artifact_paths(conn, artifacts_dir, playbook)
+        for samples in (read_resource_samples(artifact_path),)
+        if samples is not None
+    )
+    if last is not None and last > 0:
+        sampled = itertools.islice(sampled, last)
+
+    found = False
+    for artifact_path, samples in sampled:
+        display_resources(artifact_path, samples)
+        found = True
+    if not found:
+        click.echo(
+            "No runs with resource samples; use run --sample-resources."
+        )
@@ -0,0 +1,206 @@
+"""Ansible-Runner Kit artifact packing and retention."""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import List, Optional
+
+import click
+
+from src.utils import (
+    PACKED_ARTIFACT_SUFFIX,
+    PACKED_SUMMARY_MEMBER,
+    extract_artifact_recaps,
+    extract_playbook_name_from_file,
+    find_packed_artifacts,
+    get_artifact_timestamp,
+)
+
+# ansible-runner writes one of these to the status file once a run ends.
+FINISHED_STATUSES = {"successful", "failed", "timeout", "canceled"}
+
+SIZE_UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+def parse_size(
+    # Callback function. ctx and param are required even if unused!
+    ctx: click.Context,  # pylint: disable=unused-argument
+    param: click.Parameter,  # pylint: disable=unused-argument
+    value: Optional[str],
+) -> Optional[int]:
+    """Convert a size such as 500M or 20G to bytes."""
+    if value is None:
+        return None
+    match = re.fullmatch(r"(\d+)\s*([KMGT]?)B?", value.strip().upper())
+    if not match:
+        raise click.BadParameter(
+            f"Invalid size: {value}. Use a number with an optional "
+            "K, M, G or T suffix."
+        )
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def read_status(artifact_path: Path) -> Optional[str]:
+    """Read the runner status of an artifact folder."""
+    try:
+        return (artifact_path / "status").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def read_rc(artifact_path: Path) -> Optional[int]:
+    """Read the runner return code of an artifact folder."""
+    try:
+        return int((artifact_path / "rc").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def read_run_duration(artifact_path: Path) -> Optional[float]:
+    """Seconds from the runner writing the command file to the status.
+
+    ansible-runner writes the command file before starting the run and
+    the status file once it ends.
+    """
+    try:
+        started = (artifact_path / "command").stat().st_mtime
+        ended = (artifact_path / "status").stat().st_mtime
+    except OSError:
+        return None
+    return round(max(ended - started, 0.0), 3)
+
+
+def pack_artifact(artifact_path: Path, archive_dir: Path) -> Path:
+    """Pack a finished artifact folder into a single zip archive.
+
+    The archive starts with a small JSON summary (playbook, timestamp,
+    status, duration and recaps) so reports never decompress the rest.
+    The folder is removed once the archive is in place.
+    """
+    stdout_path = artifact_path / "stdout"
+    summary = {
+        "ident": artifact_path.name,
+        "playbook": extract_playbook_name_from_file(
+            str(artifact_path / "command")
+        ),
+        "timestamp": get_artifact_timestamp(stdout_path),
+        "status": read_status(artifact_path),
+        "rc": read_rc(artifact_path),
+        "duration": read_run_duration(artifact_path),
+        "recaps": extract_artifact_recaps(artifact_path),
+    }
+    mtime = stdout_path.stat().st_mtime
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archive_path = (
+        archive_dir / f"{artifact_path.name}{PACKED_ARTIFACT_SUFFIX}"
+    )
+    with tempfile.NamedTemporaryFile(
+        dir=archive_dir, prefix=".packing-", delete=False
+    ) as temp:
+        try:
+            with zipfile.ZipFile(
+                temp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6
+            ) as archive:
+                archive.writestr(PACKED_SUMMARY_MEMBER, json.dumps(summary))
+                for dir_path, dir_names, file_names in os.walk(artifact_path):
+                    dir_names.sort()
+                    for file_name in sorted(file_names):
+                        file_path = Path(dir_path) / file_name
+                        archive.write(
+                            file_path,
+                            str(file_path.relative_to(artifact_path)),
+                        )
+        except BaseException:
+            # Leave no partial archive behind to use up the space.
+            os.unlink(temp.name)
+            raise
+    os.replace(temp.name, archive_path)
+    # Keep the run time as the archive mtime so retention sorts by run age.
+    os.utime(archive_path, (mtime, mtime))
+    shutil.rmtree(artifact_path)
+    return archive_path
+
+
+def find_finished_artifacts(artifacts_dir: str) -> List[Path]:
+    """Find artifact folders whose run has finished, oldest first."""
+    artifact_root_path = Path(artifacts_dir)
+    if not artifact_root_path.is_dir():
+        return []
+    finished = [
+        path
+        for path in artifact_root_path.iterdir()
+        if path.is_dir()
+        and (path / "stdout").is_file()
+        and read_status(path) in FINISHED_STATUSES
+    ]
+    finished.sort(key=lambda folder: (folder / "stdout").stat().st_mtime)
+    return finished
+
+
+def pack_artifacts(
+    artifacts_dir: str, archive_dir: str, keep_unpacked: int
+) -> List[Path]:
+    """Pack finished artifacts, leaving the newest keep_unpacked as is."""
+    finished = find_finished_artifacts(artifacts_dir)
+    to_pack = finished[: max(len(finished) - keep_unpacked, 0)]
+
+    archives = []
+    for artifact_path in to_pack:
+        archive_path = pack_artifact(artifact_path, Path(archive_dir))
+        click.echo(f"Packed {artifact_path} -> {archive_path}")
+        archives.append(archive_path)
+    return archives
+
+
+def prune_archives(
+    archive_dir: str,
+    max_bytes: Optional[int],
+    max_age_days: Optional[float],
+    max_count: Optional[int],
+) -> List[Path]:
+    """Remove the oldest archives until every given limit is met.
+
+    Archives are kept newest first; the first one past any limit is
+    removed together with every older one, even if some would still fit.
+    """
+    archives = sorted(
+        ((path, path.stat()) for path in find_packed_artifacts(archive_dir)),
+        key=lambda item: item[1].st_mtime,
+        reverse=True,
+    )
+    oldest_allowed = (
+        time.time() - max_age_days * 86400 if max_age_days is not None else 0
+    )
+
+    removed: List[Path] = []
+    kept_bytes = 0
+    kept_count = 0
+    for archive_path, archive_stat in archives:
+        keep = (
+            not removed
+            and archive_stat.st_mtime >= oldest_allowed
+            and (max_count is None or kept_count < max_count)
+            and (
+                max_bytes is None
+                or kept_bytes + archive_stat.st_size <= max_bytes
+            )
+        )
+        if keep:
+            kept_bytes += archive_stat.st_size
+            kept_count += 1
+            continue
+        archive_path.unlink()
+        click.echo(f"Removed {archive_path}")
+        removed.append(archive_path)
+
+    click.echo(
+        f"Kept {kept_count} archives ({kept_bytes / 2**20:.1f} MiB), "
+        f"removed {len(removed)}."
+    )
+    return removed
@@ -1,10 +1,32 @@
 """Ansible-Runner Kit run command."""
 
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import uuid
 from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import ansible_runner
+import click
+import yaml
 
 from src import constants as c
+from src.events import NdjsonEventWriter
+from src.facts import fact_cache_kwargs
+from src.inventory import resolve_hosts
+from src.rerun import write_run_extra_vars
+from src.utils import (
+    HostStats,
+    echo_artifact_report,
+    extract_artifact_recaps,
+    get_playbook_path,
+)
+
+POLL_INTERVAL: float = 0.5
 
 
 def prepare_extra_vars(extra_vars: str) -> dict[str, str]:
@@ -19,17 +41,483 @@ def prepare_extra_vars(extra_vars: str) -> dict[str, str]:
     return extra_vars_dict
 
 
+def merge_runner_kwargs(*options: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine ansible-runner arguments, merging their envvars."""
+    merged: Dict[str, Any] = {}
+    envvars: Dict[str, str] = {}
+    for option in options:
+        envvars.update(option.get("envvars", {}))
+        merged.update(option)
+    if envvars:
+        merged["envvars"] = envvars
+    return merged
+
+
+def event_kwargs(event_writer: Optional[NdjsonEventWriter]) -> Dict[str, Any]:
+    """Build the ansible-runner handler arguments for an event writer."""
+    if event_writer is None:
+        return {}
+    return {
+        "event_handler": event_writer.event_handler,
+        "status_handler": event_writer.status_handler,
+    }
+
+
 def run_ansible_playbook(
     playbook_path: Path,
     rotate_artifacts: int,
     limit: str,
-    extra_vars_dict: dict[str, str],
-) -> None:
-    """Run an Ansible playbook using ansible-runner."""
-    ansible_runner.run(
+    extra_vars_dict: Dict[str, Any],
+    event_writer: Optional[NdjsonEventWriter] = None,
+    runner_options: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Run an Ansible playbook using ansible-runner.
+
+    Returns the artifact folder of the run.
+    """
+    runner = ansible_runner.run(
         private_data_dir=str(c.ARK_DIR),
         playbook=str(playbook_path),
         rotate_artifacts=rotate_artifacts,
         limit=limit,
         extravars=extra_vars_dict if extra_vars_dict else None,
+        # Keep stdout clean when the events are streamed to it.
+        quiet=bool(event_writer and event_writer.to_stdout),
+        **event_kwargs(event_writer),
+        **(runner_options or {}),
+    )
+    artifact_path = Path(runner.config.artifact_dir)
+    write_run_extra_vars(artifact_path, extra_vars_dict)
+    return artifact_path
+
+
+class RunJob(NamedTuple):
+    """A playbook run to be started with ansible-runner."""
+
+    name: str
+    playbook_path: Path
+    limit: str
+    extra_vars_dict: Dict[str, Any]
+    runner_options: Optional[Dict[str, Any]] = None
+    ident: Optional[str] = None
+
+
+class RunOutcome(NamedTuple):
+    """The result of a finished playbook run."""
+
+    name: str
+    ident: str
+    status: str
+    rc: Optional[int]
+    seconds: float
+
+
+def make_ident(playbook_path: Path) -> str:
+    """Make a unique artifact ident that names the playbook."""
+    return f"{playbook_path.stem}-{uuid.uuid4()}"
+
+
+def read_run_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
+    """Read a run manifest.
+
+    The manifest is a YAML list whose items are either playbook names or
+    mappings with a playbook and optional limit and extra_vars.
+    """
+    with manifest_path.open(encoding="utf-8") as manifest_file:
+        entries = yaml.safe_load(manifest_file) or []
+
+    if not isinstance(entries, list):
+        raise click.BadParameter(
+            f"{manifest_path} must contain a list of playbooks."
+        )
+
+    manifest: List[Dict[str, Any]] = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"playbook": entry}
+        if not isinstance(entry, dict) or "playbook" not in entry:
+            raise click.BadParameter(
+                f"Invalid manifest entry in {manifest_path}: {entry}"
+            )
+        manifest.append(entry)
+    return manifest
+
+
+def make_run_job(
+    entry: Dict[str, Any], limit: str, extra_vars: str
+) -> Optional[RunJob]:
+    """Turn a manifest entry into a run job, using the CLI defaults."""
+    playbook_path = get_playbook_path(str(entry["playbook"]))
+    if not playbook_path:
+        return None
+
+    entry_extra_vars = entry.get("extra_vars", extra_vars)
+    if isinstance(entry_extra_vars, dict):
+        # Keep YAML types: numbers, booleans and lists reach the playbook
+        # as they are written in the manifest.
+        extra_vars_dict = {
+            str(key): value for key, value in entry_extra_vars.items()
+        }
+    else:
+        extra_vars_dict = prepare_extra_vars(str(entry_extra_vars or ""))
+
+    return RunJob(
+        name=str(entry["playbook"]),
+        playbook_path=playbook_path,
+        limit=str(entry.get("limit", limit) or ""),
+        extra_vars_dict=extra_vars_dict,
+    )
+
+
+def rotate_artifacts_dir(keep: int) -> None:
+    """Remove all but the newest keep artifact directories."""
+    if not c.ARTIFACTS_DIR.is_dir():
+        return
+
+    artifact_folders = sorted(
+        (path for path in c.ARTIFACTS_DIR.iterdir() if path.is_dir()),
+        key=lambda folder: folder.stat().st_mtime,
+        reverse=True,
+    )
+    for artifact_folder in artifact_folders[keep:]:
+        shutil.rmtree(artifact_folder, ignore_errors=True)
+
+
+def run_playbooks_concurrently(
+    jobs: List[RunJob],
+    max_parallel: int,
+    rotate_artifacts: int,
+    event_writer: Optional[NdjsonEventWriter] = None,
+) -> List[RunOutcome]:
+    """Run playbooks with ansible_runner.run_async, max_parallel at a time.
+
+    Every run gets its own ident, made up unless the job gives one, and
+    so its own artifact directory.
+    Artifacts are rotated once up front instead of by each runner, since
+    runners starting together would race to remove the same directories.
+    The whole batch is always kept.
+    """
+    rotate_artifacts_dir(max(rotate_artifacts - len(jobs), 0))
+    # Progress goes to stderr when stdout carries the event stream.
+    err = bool(event_writer and event_writer.to_stdout)
+    pending = list(jobs)
+    running: List[Tuple[RunJob, str, threading.Thread, Any, float]] = []
+    started_idents: List[str] = []
+    outcomes: Dict[str, RunOutcome] = {}
+
+    while pending or running:
+        while pending and len(running) < max_parallel:
+            job = pending.pop(0)
+            ident = job.ident or make_ident(job.playbook_path)
+            click.echo(f"Starting {job.name} ({ident})", err=err)
+            thread, runner = ansible_runner.run_async(
+                private_data_dir=str(c.ARK_DIR),
+                playbook=str(job.playbook_path),
+                ident=ident,
+                rotate_artifacts=0,
+                limit=job.limit,
+                extravars=job.extra_vars_dict or None,
+                quiet=True,
+                **event_kwargs(event_writer),
+                **(job.runner_options or {}),
+            )
+            running.append((job, ident, thread, runner, time.monotonic()))
+            started_idents.append(ident)
+
+        time.sleep(POLL_INTERVAL)
+        for entry in list(running):
+            job, ident, thread, runner, started = entry
+            if thread.is_alive():
+                continue
+            running.remove(entry)
+            write_run_extra_vars(
+                Path(runner.config.artifact_dir), job.extra_vars_dict
+            )
+            outcome = RunOutcome(
+                name=job.name,
+                ident=ident,
+                status=str(runner.status),
+                rc=runner.rc,
+                seconds=time.monotonic() - started,
+            )
+            click.echo(
+                f"Finished {job.name} ({ident}): {outcome.status} "
+                f"in {outcome.seconds:.1f}s",
+                err=err,
+            )
+            outcomes[ident] = outcome
+
+    return [outcomes[ident] for ident in started_idents]
+
+
+def display_run_outcomes(
+    outcomes: List[RunOutcome], err: bool = False
+) -> None:
+    """Display a combined pass/fail table for concurrent runs."""
+    name_width = max([len("Playbook")] + [len(item.name) for item in outcomes])
+    line_width = name_width + 32 + max(len(item.ident) for item in outcomes)
+    click.echo("", err=err)
+    click.echo(
+        f"{'Playbook':<{name_width}}  {'Status':<10}  {'RC':>3}  "
+        f"{'Duration':>9}  Ident",
+        err=err,
     )
+    click.echo("-" * line_width, err=err)
+    for outcome in outcomes:
+        click.echo(
+            f"{outcome.name:<{name_width}}  {outcome.status:<10}  "
+            f"{'' if outcome.rc is None else outcome.rc:>3}  "
+            f"{outcome.seconds:>8.1f}s  {outcome.ident}",
+            err=err,
+        )
+    failed = sum(1 for item in outcomes if item.status != "successful")
+    click.echo("-" * line_width, err=err)
+    click.echo(f"{len(outcomes) - failed} passed, {failed} failed", err=err)
+
+
+def split_into_shards(hosts: List[str], shards: int) -> List[List[str]]:
+    """Split hosts into at most shards non-empty, balanced groups."""
+    return [hosts[offset::shards] for offset in range(min(shards, len(hosts)))]
+
+
+def run_sharded_playbook(
+    playbook_path: Path,
+    shards: int,
+    rotate_artifacts: int,
+    limit: str,
+    extra_vars_dict: Dict[str, Any],
+    event_writer: Optional[NdjsonEventWriter] = None,
+    runner_options: Optional[Dict[str, Any]] = None,
+) -> List[RunOutcome]:
+    """Run one playbook as parallel runner invocations over host shards.
+
+    The hosts matched by limit are split into balanced shards, and each
+    shard runs as its own ansible-runner invocation limited through a host
+    list file. The shard idents share a prefix, so a later --rerun-failed
+    finds every shard of the run.
+    """
+    err = bool(event_writer and event_writer.to_stdout)
+    hosts = resolve_hosts(limit)
+    if not hosts:
+        click.echo(
+            f"No hosts in the inventory match '{limit or 'all'}'.", err=err
+        )
+        return []
+
+    host_shards = split_into_shards(hosts, shards)
+    click.echo(
+        f"Running {playbook_path.name} against {len(hosts)} hosts "
+        f"in {len(host_shards)} shards.",
+        err=err,
+    )
+
+    c.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    group = make_ident(playbook_path)
+    with tempfile.TemporaryDirectory(dir=c.CACHE_DIR) as shard_dir:
+        jobs = []
+        for number, shard_hosts in enumerate(host_shards, start=1):
+            limit_file = Path(shard_dir) / f"shard-{number}.limit"
+            limit_file.write_text("\n".join(shard_hosts) + "\n")
+            jobs.append(
+                RunJob(
+                    name=f"{playbook_path.name} [shard {number}]",
+                    playbook_path=playbook_path,
+                    limit=f"@{limit_file}",
+                    extra_vars_dict=extra_vars_dict,
+                    runner_options=runner_options,
+                    ident=f"{group}{c.SHARD_IDENT_MARKER}{number}",
+                )
+            )
+        outcomes = run_playbooks_concurrently(
+            jobs, len(jobs), rotate_artifacts, event_writer
+        )
+
+    display_run_outcomes(outcomes, err)
+    display_merged_report(playbook_path, outcomes, err)
+    return outcomes
+
+
+def merge_shard_recaps(outcomes: List[RunOutcome]) -> HostStats:
+    """Merge the recap host stats of every shard into one."""
+    merged: HostStats = {}
+    for outcome in outcomes:
+        artifact_path = c.ARTIFACTS_DIR / outcome.ident
+        if not (artifact_path / "stdout").is_file():
+            continue
+        for host_stats in extract_artifact_recaps(artifact_path):
+            for host, stats in host_stats.items():
+                totals = merged.setdefault(host, {})
+                for key, value in stats.items():
+                    totals[key] = totals.get(key, 0) + value
+    return dict(sorted(merged.items()))
+
+
+def display_merged_report(
+    playbook_path: Path, outcomes: List[RunOutcome], err: bool = False
+) -> None:
+    """Display a single recap report for a sharded run."""
+    click.echo("", err=err)
+    echo_artifact_report(
+        ", ".join(str(c.ARTIFACTS_DIR / item.ident) for item in outcomes),
+        playbook_path.name,
+        time.strftime("%Y-%m-%d %H:%M:%S"),
+        [merge_shard_recaps(outcomes)],
+        err,
+    )
+
+
+def warm_fact_cache(pattern: str, forks: int, gather_subset: str) -> bool:
+    """Gather facts for the hosts matching pattern into the fact cache.
+
+    Runs only fact gathering, ad hoc and with many forks, so a later run
+    with the fact cache enabled can skip gathering for these hosts.
+    """
+    c.FACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    runner = ansible_runner.run(
+        private_data_dir=str(c.ARK_DIR),
+        host_pattern=pattern,
+        # gather_facts, unlike setup, marks the facts as gathered for smart
+        # gathering.
+        module="ansible.builtin.gather_facts",
+        module_args=f"gather_subset={gather_subset}",
+        forks=forks,
+        # Keep ad hoc artifacts out of the playbook reports.
+        artifact_dir=str(c.FACT_ARTIFACTS_DIR),
+        rotate_artifacts=1,
+        quiet=True,
+        **fact_cache_kwargs(True),
+    )
+    stats = runner.stats or {}
+    gathered = len(stats.get("ok", {}))
+    unreachable = sorted(stats.get("dark", {}))
+    failed = sorted(stats.get("failures", {}))
+    click.echo(
+        f"Gathered facts for {gathered} hosts in "
+        f"{time.monotonic() - started:.1f}s: {len(unreachable)} unreachable, "
+        f"{len(failed)} failed."
+    )
+    for host in unreachable:
+        click.echo(f"  unreachable: {host}", err=True)
+    for host in failed:
+        click.echo(f"  failed: {host}", err=True)
+    return str(runner.status) == "successful"
+
+
+class TuneTrial(NamedTuple):
+    """One timed probe run at a fork count and pipelining setting."""
+
+    forks: int
+    pipelining: bool
+    status: str
+    hosts: int
+    seconds: float
+
+    @property
+    def hosts_per_second(self) -> float:
+        """Hosts that answered the probe per second."""
+        return self.hosts / self.seconds if self.seconds else 0.0
+
+
+def run_tune_probe(
+    probe: Dict[str, Any], tune_dir: Path, forks: int, pipelining: bool
+) -> Tuple[str, int, float]:
+    """Run the probe once against the hosts in tune_dir's sample.limit.
+
+    Returns the run status, the number of hosts that answered and the
+    time taken.
+    """
+    started = time.monotonic()
+    runner = ansible_runner.run(
+        private_data_dir=str(c.ARK_DIR),
+        artifact_dir=str(tune_dir / "artifacts"),
+        limit=f"@{tune_dir / 'sample.limit'}",
+        forks=forks,
+        quiet=True,
+        envvars={"ANSIBLE_PIPELINING": str(pipelining)},
+        **probe,
+    )
+    seconds = time.monotonic() - started
+    stats = runner.stats or {}
+    answered = (
+        set(stats.get("processed", {}))
+        - set(stats.get("failures", {}))
+        - set(stats.get("dark", {}))
+    )
+    return str(runner.status), len(answered), seconds
+
+
+def run_tune_trials(
+    hosts: List[str],
+    forks_list: List[int],
+    playbook_path: Optional[Path],
+    rounds: int = 3,
+) -> List[TuneTrial]:
+    """Time a probe against hosts at each fork count, pipelining off and on.
+
+    The probe is the ping module run ad hoc, or a project playbook. A
+    discarded warm-up probe first opens SSH control connections and fills
+    caches, then every setting is timed once per round, in a shuffled
+    order each round, and its median time is kept, so no setting gains
+    from always running after another. Trial artifacts go to a temporary
+    directory so they never show up in reports.
+    """
+    probe: Dict[str, Any] = (
+        {"playbook": str(playbook_path)}
+        if playbook_path
+        else {"host_pattern": "all", "module": "ansible.builtin.ping"}
+    )
+    settings = [
+        (forks, pipelining)
+        for pipelining in (False, True)
+        for forks in forks_list
+    ]
+    timings: Dict[Tuple[int, bool], List[Tuple[str, int, float]]] = {
+        setting: [] for setting in settings
+    }
+    c.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=c.CACHE_DIR) as tune_dir:
+        limit_file = Path(tune_dir) / "sample.limit"
+        limit_file.write_text("\n".join(hosts) + "\n")
+
+        _, _, seconds = run_tune_probe(
+            probe, Path(tune_dir), max(forks_list), False
+        )
+        click.echo(f"warm-up probe in {seconds:6.2f}s, discarded")
+        for number in range(1, rounds + 1):
+            random.shuffle(settings)
+            for forks, pipelining in settings:
+                status, answered, seconds = run_tune_probe(
+                    probe, Path(tune_dir), forks, pipelining
+                )
+                timings[(forks, pipelining)].append(
+                    (status, answered, seconds)
+                )
+                click.echo(
+                    f"round {number}/{rounds}  forks={forks:<4} "
+                    f"pipelining={'on ' if pipelining else 'off'}  "
+                    f"{answered}/{len(hosts)} hosts in {seconds:6.2f}s"
+                )
+
+    trials = []
+    click.echo("Median of each setting:")
+    for (forks, pipelining), runs in sorted(timings.items()):
+        statuses = [status for status, _, _ in runs]
+        trial = TuneTrial(
+            forks,
+            pipelining,
+            next(
+                (status for status in statuses if status != "successful"),
+                "successful",
+            ),
+            min(answered for _, answered, _ in runs),
+            statistics.median(seconds for _, _, seconds in runs),
+        )
+        click.echo(
+            f"forks={forks:<4} "
+            f"pipelining={'on ' if pipelining else 'off'}  "
+            f"{trial.hosts}/{len(hosts)} hosts in {trial.seconds:6.2f}s "
+            f"({trial.hosts_per_second:.1f} hosts/s)"
+        )
+        trials.append(trial)
+    return trials
@@ -0,0 +1,227 @@
+"""Ansible-Runner Kit fleet summaries over indexed runs."""
+
+import sqlite3
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+# Counters kept per host and run; the rest of the recap is not summarized.
+SUMMARY_FIELDS = ("changed", "failed", "unreachable")
+
+# Runs shown in each playbook trend line.
+TREND_RUNS = 10
+
+
+class RunMatrix:
+    """Recap counters of many runs, stored column by column.
+
+    Row i is one host in one run: run_ids[i] and host_ids[i] index into
+    runs and hosts, and counters[field][i] holds that host's recap counter
+    summed over the run's plays. Rows are ordered oldest run first.
+    """
+
+    def __init__(self) -> None:
+        self.runs: List[str] = []
+        self.playbooks: List[str] = []
+        self.hosts: List[str] = []
+        self.run_ids = array("I")
+        self.host_ids = array("I")
+        self.counters: Dict[str, "array[int]"] = {
+            field: array("I") for field in SUMMARY_FIELDS
+        }
+
+    def __len__(self) -> int:
+        return len(self.run_ids)
+
+
+def load_run_matrix(
+    conn: sqlite3.Connection,
+    last: Optional[int] = None,
+    playbook: Optional[str] = None,
+) -> RunMatrix:
+    """Load the recap counters of the last runs from the artifact index.
+
+    Runs are read one at a time through the host_stats path index and
+    appended to the columns in bulk; only runs with several recaps need
+    SQLite to sum their counters per host.
+    """
+    runs_query = "SELECT path, playbook FROM artifacts"
+    params: List[object] = []
+    if playbook:
+        runs_query += " WHERE playbook = ?"
+        params.append(playbook)
+    runs_query += " ORDER BY mtime_ns DESC LIMIT ?"
+    params.append(last if last and last > 0 else -1)
+    runs = conn.execute(runs_query, params).fetchall()
+    runs.reverse()
+
+    multi_recap = {
+        path
+        for (path,) in conn.execute(
+            "SELECT DISTINCT path FROM host_stats WHERE recap > 0"
+        )
+    }
+    fields = ", ".join(SUMMARY_FIELDS)
+    sums = ", ".join(f"SUM({field})" for field in SUMMARY_FIELDS)
+    single_query = f"SELECT host, {fields} FROM host_stats WHERE path = ?"
+    multi_query = (
+        f"SELECT host, {sums} FROM host_stats WHERE path = ? GROUP BY host"
+    )
+
+    matrix = RunMatrix()
+    host_numbers: Dict[str, int] = {}
+    columns = [matrix.counters[field] for field in SUMMARY_FIELDS]
+    for run_id, (path, playbook_name) in enumerate(runs):
+        matrix.runs.append(path)
+        matrix.playbooks.append(playbook_name or "(unknown)")
+        rows = conn.execute(
+            multi_query if path in multi_recap else single_query, (path,)
+        ).fetchall()
+        if not rows:
+            continue
+
+        names, *counters = zip(*rows)
+        for name in names:
+            if name not in host_numbers:
+                host_numbers[name] = len(matrix.hosts)
+                matrix.hosts.append(name)
+        matrix.run_ids.extend(array("I", [run_id]) * len(rows))
+        matrix.host_ids.extend(map(host_numbers.__getitem__, names))
+        for column, values in zip(columns, counters):
+            column.extend(values)
+    return matrix
+
+
+class HostSummary(NamedTuple):
+    """How often a host failed, was unreachable or changed."""
+
+    host: str
+    runs: int
+    failed: int
+    unreachable: int
+    changed: int
+
+
+class PlaybookTrend(NamedTuple):
+    """Per-run failing host counts of one playbook, oldest run first."""
+
+    playbook: str
+    hosts: "array[int]"
+    failed: "array[int]"
+
+
+def summarize_runs(
+    matrix: RunMatrix,
+) -> Tuple[List[HostSummary], List[PlaybookTrend]]:
+    """Aggregate the matrix per host and per playbook run in one pass."""
+    host_count = len(matrix.hosts)
+    run_count = len(matrix.runs)
+    host_runs = array("I", bytes(4 * host_count))
+    host_failed = array("I", bytes(4 * host_count))
+    host_unreachable = array("I", bytes(4 * host_count))
+    host_changed = array("I", bytes(4 * host_count))
+    run_hosts = array("I", bytes(4 * run_count))
+    run_failed = array("I", bytes(4 * run_count))
+
+    for run_id, host_id, changed, failed, unreachable in zip(
+        matrix.run_ids,
+        matrix.host_ids,
+        matrix.counters["changed"],
+        matrix.counters["failed"],
+        matrix.counters["unreachable"],
+    ):
+        host_runs[host_id] += 1
+        run_hosts[run_id] += 1
+        if failed or unreachable:
+            run_failed[run_id] += 1
+        if failed:
+            host_failed[host_id] += 1
+        if unreachable:
+            host_unreachable[host_id] += 1
+        if changed:
+            host_changed[host_id] += 1
+
+    hosts = [
+        HostSummary(
+            host,
+            host_runs[i],
+            host_failed[i],
+            host_unreachable[i],
+            host_changed[i],
+        )
+        for i, host in enumerate(matrix.hosts)
+    ]
+
+    run_ids_by_playbook: Dict[str, List[int]] = {}
+    for run_id, playbook_name in enumerate(matrix.playbooks):
+        run_ids_by_playbook.setdefault(playbook_name, []).append(run_id)
+    trends = [
+        PlaybookTrend(
+            playbook_name,
+            array("I", (run_hosts[i] for i in run_ids)),
+            array("I", (run_failed[i] for i in run_ids)),
+        )
+        for playbook_name, run_ids in sorted(run_ids_by_playbook.items())
+    ]
+    return hosts, trends
+
+
+def percent(count: int, total: int) -> str:
+    """Format count out of total as a percentage."""
+    return f"{count / total * 100:5.1f}%" if total else "    -"
+
+
+def display_summary(matrix: RunMatrix, top: int) -> None:
+    """Display failure rates, drifting hosts and per-playbook trends."""
+    if not matrix.runs:
+        click.echo("No indexed runs to summarize.")
+        return
+
+    hosts, trends = summarize_runs(matrix)
+    click.echo(
+        f"Summary of {len(matrix.runs)} runs, {len(matrix.hosts)} hosts, "
+        f"{len(matrix)} host results."
+    )
+
+    click.echo("\nHosts by failure rate (failed / unreachable / changed):")
+    unhealthy = sorted(
+        (item for item in hosts if item.failed or item.unreachable),
+        key=lambda item: (
+            -(item.failed + item.unreachable) / item.runs,
+            item.host,
+        ),
+    )
+    for item in unhealthy[:top]:
+        click.echo(
+            f"  {percent(item.failed, item.runs)} "
+            f"{percent(item.unreachable, item.runs)} "
+            f"{percent(item.changed, item.runs)}  "
+            f"{item.host} ({item.runs} runs)"
+        )
+    if not unhealthy:
+        click.echo("  No host failed or was unreachable.")
+
+    drifting = [
+        item.host
+        for item in hosts
+        if item.runs > 1 and item.changed == item.runs
+    ]
+    click.echo(f"\nHosts changed on every run ({len(drifting)}):")
+    for host in sorted(drifting)[:top]:
+        click.echo(f"  {host}")
+    if len(drifting) > top:
+        click.echo(f"  ... and {len(drifting) - top} more")
+
+    click.echo(
+        "\nPlaybook trends (failing hosts per run, oldest first; "
+        "overall failing rate):"
+    )
+    for trend in trends:
+        recent = " ".join(str(count) for count in trend.failed[-TREND_RUNS:])
+        click.echo(
+            f"  {trend.playbook}: {len(trend.failed)} runs, "
+            f"{percent(sum(trend.failed), sum(trend.hosts)).strip()} "
+            f"[{recent}]"
+        )
+    click.echo("")
@@ -0,0 +1,116 @@
+"""Ansible-Runner Kit connection and fork profiles."""
+
+import time
+from typing import Any, Dict, List, Optional
+
+import click
+
+from src import constants as c
+
+Profile = Dict[str, Any]
+
+
+def parse_forks(
+    # Callback function. ctx and param are required even if unused!
+    ctx: click.Context,  # pylint: disable=unused-argument
+    param: click.Parameter,  # pylint: disable=unused-argument
+    value: str,
+) -> List[int]:
+    """Convert a comma separated list of fork counts to integers."""
+    try:
+        forks = sorted({int(item) for item in value.split(",") if item})
+    except ValueError:
+        raise click.BadParameter(
+            f"Invalid fork counts: {value}. Use e.g. 5,10,25,50."
+        ) from None
+    if not forks or forks[0] < 1:
+        raise click.BadParameter("Fork counts must be positive.")
+    return forks
+
+
+def read_profiles() -> Dict[str, Profile]:
+    """Read the named profiles, if any have been written."""
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    try:
+        with c.PROFILES_FILE.open(encoding="utf-8") as profiles_file:
+            profiles = yaml.safe_load(profiles_file) or {}
+    except FileNotFoundError:
+        return {}
+    if not isinstance(profiles, dict):
+        raise click.ClickException(
+            f"{c.PROFILES_FILE} must contain a mapping of profiles."
+        )
+    return profiles
+
+
+def load_profile(name: str) -> Profile:
+    """Get a named profile, failing if it does not exist."""
+    profiles = read_profiles()
+    if name not in profiles:
+        known = ", ".join(sorted(profiles)) or "none"
+        raise click.ClickException(
+            f"Profile '{name}' not found in {c.PROFILES_FILE} "
+            f"(available: {known}). Create it with 'ark tune'."
+        )
+    profile: Profile = profiles[name]
+    return profile
+
+
+def write_profile(name: str, settings: Profile) -> None:
+    """Save settings under a profile name, keeping other profiles."""
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    profiles = read_profiles()
+    profiles[name] = {**profiles.get(name, {}), **settings}
+    c.PROFILES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with c.PROFILES_FILE.open("w", encoding="utf-8") as profiles_file:
+        yaml.safe_dump(profiles, profiles_file, sort_keys=False)
+
+
+def profile_kwargs(profile: Optional[Profile]) -> Dict[str, Any]:
+    """Build the ansible-runner arguments that apply a profile.
+
+    Forks are passed on the command line. Pipelining and any extra
+    envvars of the profile are environment variables, which settings in
+    env/envvars take precedence over.
+    """
+    if not profile:
+        return {}
+    kwargs: Dict[str, Any] = {}
+    envvars = {
+        str(key): str(value)
+        for key, value in (profile.get("envvars") or {}).items()
+    }
+    if "forks" in profile:
+        kwargs["forks"] = int(profile["forks"])
+    if "pipelining" in profile:
+        envvars["ANSIBLE_PIPELINING"] = str(bool(profile["pipelining"]))
+    if envvars:
+        kwargs["envvars"] = envvars
+    return kwargs
+
+
+def sample_hosts(hosts: List[str], size: int) -> List[str]:
+    """Pick size hosts spread evenly over the list."""
+    if len(hosts) <= size:
+        return hosts
+    step = len(hosts) / size
+    return [hosts[int(number * step)] for number in range(size)]
+
+
+def tuned_profile(
+    forks: int, pipelining: bool, hosts: int, hosts_per_second: float
+) -> Profile:
+    """Build the profile settings for the best trial."""
+    return {
+        "forks": forks,
+        "pipelining": pipelining,
+        "tuned": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "sample_hosts": hosts,
+            "hosts_per_second": round(hosts_per_second, 2),
+        },
+    }
@@ -1,24 +1,62 @@
 """Ansible-Runner Kit Utilities."""
 
 import json
+import os
 import re
 import sys
+import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 import click
 
 from . import constants as c
 
+HostStats = Dict[str, Dict[str, int]]
+
+# Project directory -> (mtime_ns, playbook names) seen by this process.
+PLAYBOOK_CACHE: Dict[str, Tuple[int, List[str]]] = {}
+
+PACKED_ARTIFACT_SUFFIX: str = ".zip"
+PACKED_SUMMARY_MEMBER: str = "ark_index.json"
+
+RECAP_HEADER: bytes = b"PLAY RECAP"
+RECAP_HEADER_LINE = re.compile(rb"PLAY RECAP[ \t]+\*+\s*$")
+RECAP_BLOCK_SIZE: int = 64 * 1024
+
+# Recap counter name -> playbook_on_stats event_data key
+STATS_EVENT_FIELDS: Dict[str, str] = {
+    "ok": "ok",
+    "changed": "changed",
+    "unreachable": "dark",
+    "failed": "failures",
+    "skipped": "skipped",
+    "rescued": "rescued",
+    "ignored": "ignored",
+}
+
 
 def find_playbooks() -> List[str]:
-    """Find all YAML or YML playbooks in the project directory."""
+    """Find all YAML or YML playbooks in the project directory.
+
+    The list is reused until the directory's mtime changes, which happens
+    whenever a playbook is added, removed or renamed.
+    """
+    try:
+        mtime_ns = c.PROJECT_DIR.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = -1
+    known = PLAYBOOK_CACHE.get(str(c.PROJECT_DIR))
+    if known and known[0] == mtime_ns:
+        return list(known[1])
+
     playbooks: List[str] = []
     for playbook in c.PROJECT_DIR.glob("*.yml"):
         playbooks.append(playbook.name)
     for playbook in c.PROJECT_DIR.glob("*.yaml"):
         playbooks.append(playbook.name)
+    PLAYBOOK_CACHE[str(c.PROJECT_DIR)] = (mtime_ns, list(playbooks))
     return playbooks
 
 
@@ -87,17 +125,50 @@ def validate_inventory_dir() -> None:
         sys.exit(1)
 
 
-def find_artifacts(artifacts_dir: str) -> List[Path]:
-    """Find all artifact folders in the artifacts directory."""
+def find_artifacts(
+    artifacts_dir: str, archive_dir: Optional[str] = None
+) -> List[Path]:
+    """Find all artifact folders, and packed artifacts if archive_dir."""
     artifact_root_path = Path(artifacts_dir)
     artifact_folders = [
         path
         for path in artifact_root_path.glob("**")
         if (path / "stdout").is_file()
     ]
+    if archive_dir:
+        artifact_folders.extend(find_packed_artifacts(archive_dir))
     return artifact_folders
 
 
+def find_packed_artifacts(archive_dir: str) -> List[Path]:
+    """Find all packed artifact archives in the archive directory."""
+    return [
+        path
+        for path in Path(archive_dir).glob(f"*{PACKED_ARTIFACT_SUFFIX}")
+        if path.is_file()
+    ]
+
+
+def is_packed_artifact(artifact_path: Path) -> bool:
+    """Check if an artifact path is a packed artifact archive."""
+    return (
+        artifact_path.suffix == PACKED_ARTIFACT_SUFFIX
+        and artifact_path.is_file()
+    )
+
+
+def read_packed_summary(archive_path: Path) -> Dict[str, Any]:
+    """Read the summary stored inside a packed artifact archive.
+
+    Only the summary member is decompressed, not the whole archive.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        summary: Dict[str, Any] = json.loads(
+            archive.read(PACKED_SUMMARY_MEMBER)
+        )
+    return summary
+
+
 def sort_and_limit_artifacts(
     artifact_folders: List[Path], last: Optional[int]
 ) -> List[Path]:
@@ -135,28 +206,57 @@ def extract_playbook_name_from_file(file_path: str) -> Optional[str]:
     return None
 
 
+def get_artifact_playbook(artifact_path: Path) -> Optional[str]:
+    """Get the playbook name of an artifact folder or archive."""
+    if is_packed_artifact(artifact_path):
+        playbook_name: Optional[str] = read_packed_summary(artifact_path)[
+            "playbook"
+        ]
+        return playbook_name
+    return extract_playbook_name_from_file(str(artifact_path / "command"))
+
+
 def display_artifact_report(artifact_path: Path) -> None:
     """Display the report for a single artifact folder."""
-    stdout_path: Path = artifact_path / "stdout"
+    if is_packed_artifact(artifact_path):
+        summary = read_packed_summary(artifact_path)
+        echo_artifact_report(
+            str(artifact_path),
+            summary["playbook"],
+            summary["timestamp"],
+            summary["recaps"],
+        )
+        return
 
-    with stdout_path.open("r", encoding="utf-8") as stdout_file:
-        content = stdout_file.read()
+    stdout_path: Path = artifact_path / "stdout"
 
-    play_recaps = extract_play_recaps(content)
+    recaps = extract_artifact_recaps(artifact_path)
     timestamp = get_artifact_timestamp(stdout_path)
     playbook_name = extract_playbook_name_from_file(
         str(artifact_path / "command")
     )
 
-    click.echo(f"Report for {artifact_path}:")
-    click.echo(f"{playbook_name or 'Playbook'} executed at: {timestamp}")
-    click.echo("-------------------------")
+    echo_artifact_report(str(artifact_path), playbook_name, timestamp, recaps)
+
+
+def echo_artifact_report(
+    artifact_path: str,
+    playbook_name: Optional[str],
+    timestamp: str,
+    recaps: List[HostStats],
+    err: bool = False,
+) -> None:
+    """Print an artifact report from already parsed recap host stats."""
+    click.echo(f"Report for {artifact_path}:", err=err)
+    click.echo(
+        f"{playbook_name or 'Playbook'} executed at: {timestamp}", err=err
+    )
+    click.echo("-------------------------", err=err)
 
-    for recap in play_recaps:
-        host_stats = extract_host_stats(recap)
+    for host_stats in recaps:
         for host, stats in host_stats.items():
-            click.echo(f"{host}: {stats}")
-    click.echo("")
+            click.echo(f"{host}: {stats}", err=err)
+    click.echo("", err=err)
 
 
 def extract_play_recaps(content: str) -> List[str]:
@@ -180,6 +280,8 @@ def extract_host_stats(recap: str) -> dict[str, dict[str, int]]:
     host_stats = {}
 
     for line in lines:
+        if ":" not in line:
+            continue
         host, stats = line.strip().split(":", 1)
         stats_dict = {}
         for stat in stats.strip().split(" "):
@@ -191,6 +293,129 @@ def extract_host_stats(recap: str) -> dict[str, dict[str, int]]:
     return host_stats
 
 
+def extract_artifact_recaps(artifact_path: Path) -> List[HostStats]:
+    """Extract the recap host stats of an artifact folder.
+
+    The final playbook_on_stats event is used when the artifact has job
+    events, otherwise the recaps are read from the stdout file.
+    Packed artifacts carry their recaps in the archive summary.
+    """
+    if is_packed_artifact(artifact_path):
+        recaps: List[HostStats] = read_packed_summary(artifact_path)["recaps"]
+        return recaps
+
+    stats = read_stats_event(artifact_path / "job_events")
+    if stats is not None:
+        return [stats]
+
+    with (artifact_path / "stdout").open("rb") as stdout_file:
+        play_recaps = tail_play_recaps(stdout_file)
+    return [extract_host_stats(recap) for recap in play_recaps]
+
+
+def tail_play_recaps(
+    stdout_file: BinaryIO, block_size: int = RECAP_BLOCK_SIZE
+) -> List[str]:
+    """Extract the play recaps at the end of stdout.
+
+    The file is read backwards in blocks only until the last PLAY RECAP
+    header, then every recap from there on is read in one forward pass,
+    so memory stays bounded however large stdout is.
+    """
+    offset = find_last_recap_offset(stdout_file, block_size)
+    if offset is None:
+        return []
+
+    stdout_file.seek(offset)
+    play_recaps: List[str] = []
+    recap_lines: Optional[List[str]] = None
+    for raw_line in stdout_file:
+        if RECAP_HEADER_LINE.match(raw_line):
+            recap_lines = []
+            continue
+        if recap_lines is None:
+            continue
+        line = raw_line.decode("utf-8", errors="replace")
+        if line.strip():
+            recap_lines.append(line)
+        elif recap_lines:
+            play_recaps.append("".join(recap_lines))
+            recap_lines = None
+    if recap_lines:
+        play_recaps.append("".join(recap_lines))
+    return play_recaps
+
+
+def is_recap_header(stdout_file: BinaryIO, offset: int) -> bool:
+    """Check if a PLAY RECAP match starts a line of PLAY RECAP ****."""
+    if offset > 0:
+        stdout_file.seek(offset - 1)
+        if stdout_file.read(1) != b"\n":
+            return False
+    stdout_file.seek(offset)
+    return bool(RECAP_HEADER_LINE.match(stdout_file.readline()))
+
+
+def find_last_recap_offset(
+    stdout_file: BinaryIO, block_size: int = RECAP_BLOCK_SIZE
+) -> Optional[int]:
+    """Find the byte offset of the last PLAY RECAP header line.
+
+    Text that merely mentions PLAY RECAP, such as task output, is skipped.
+    """
+    position = stdout_file.seek(0, os.SEEK_END)
+    # Bytes carried over so a header split across two blocks is found.
+    carry = b""
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        stdout_file.seek(position)
+        block = stdout_file.read(read_size) + carry
+        end = len(block)
+        found = block.rfind(RECAP_HEADER, 0, end)
+        while found != -1:
+            if is_recap_header(stdout_file, position + found):
+                return position + found
+            end = found
+            found = block.rfind(RECAP_HEADER, 0, end)
+        carry = block[: min(len(RECAP_HEADER) - 1, end)]
+    return None
+
+
+def read_stats_event(job_events_dir: Path) -> Optional[HostStats]:
+    """Read the host stats of the final playbook_on_stats job event."""
+    try:
+        event_files = [
+            entry.name
+            for entry in os.scandir(job_events_dir)
+            if entry.name.endswith(".json")
+            and not entry.name.endswith("-partial.json")
+        ]
+    except OSError:
+        return None
+
+    # Event files are named <counter>-<uuid>.json; the stats come last.
+    event_files.sort(key=lambda name: int(name.split("-", 1)[0]), reverse=True)
+    for event_file in event_files:
+        with (job_events_dir / event_file).open(encoding="utf-8") as file_:
+            event = json.load(file_)
+        if event.get("event") != "playbook_on_stats":
+            continue
+
+        event_data = event.get("event_data", {})
+        hosts: Dict[str, None] = {}
+        for key in ("processed", *STATS_EVENT_FIELDS.values()):
+            hosts.update(dict.fromkeys(event_data.get(key) or {}))
+        return {
+            host: {
+                field: int((event_data.get(key) or {}).get(host, 0))
+                for field, key in STATS_EVENT_FIELDS.items()
+            }
+            for host in hosts
+        }
+    return None
+
+
 def validate_playbook(
     # Callback function. ctx and param are required even if unused!
     ctx: click.Context,  # pylint: disable=unused-argument